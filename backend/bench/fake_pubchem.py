@@ -0,0 +1,283 @@
+"""A local stand-in for the PubChem REST API, for benchmarks.
+
+Serves the endpoints the MCP server uses (autocomplete, name to properties
+and POSTed identifiers to properties) from a generated catalog, after a
+configurable delay. A share of requests can fail with 500 or be throttled
+with 503 PUGREST.ServerBusy, like PubChem does under load.
+
+The catalog holds a set of common lab compounds plus any name of the form
+``synthine-<n>``, so benchmarks can ask for as many distinct, uncached
+compounds as they need.
+
+Usage:
+  uv run python -m bench.fake_pubchem --port 8766 --latency-ms 150 --throttle-rate 0.05
+"""
+
+import argparse
+import asyncio
+import hashlib
+import random
+import re
+from collections import Counter
+from dataclasses import dataclass
+from urllib.parse import parse_qs
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+# (name, CID, molecular formula, molecular weight) of the named compounds
+_KNOWN_COMPOUNDS = (
+    ("ethanol", 702, "C2H6O", 46.07),
+    ("acetone", 180, "C3H6O", 58.08),
+    ("isopropanol", 3776, "C3H8O", 60.10),
+    ("toluene", 1140, "C7H8", 92.14),
+    ("sodium chloride", 5234, "ClNa", 58.44),
+    ("hydrochloric acid", 313, "ClH", 36.46),
+    ("sulfuric acid", 1118, "H2O4S", 98.08),
+    ("hydrogen peroxide", 784, "H2O2", 34.015),
+    ("potassium permanganate", 516875, "KMnO4", 158.03),
+    ("dimethyl sulfoxide", 679, "C2H6OS", 78.14),
+    ("acetonitrile", 6342, "C2H3N", 41.05),
+    ("methanol", 887, "CH4O", 32.04),
+    ("tetrahydrofuran", 8028, "C4H8O", 72.11),
+    ("caffeine", 2519, "C8H10N4O2", 194.19),
+    ("aspirin", 2244, "C9H8O4", 180.16),
+    ("glucose", 5793, "C6H12O6", 180.16),
+    ("edta", 6049, "C10H16N2O8", 292.24),
+    ("tris", 6503, "C4H11NO3", 121.14),
+    ("chloroform", 6212, "CHCl3", 119.37),
+    ("benzene", 241, "C6H6", 78.11),
+)
+_SYNTHETIC_NAME = re.compile(r"synthine-(\d+)")
+_SYNTHETIC_CID_BASE = 100_000_000
+
+
+@dataclass(frozen=True)
+class FakeCompound:
+    cid: int
+    name: str
+    formula: str
+    weight: float
+
+    @property
+    def inchikey(self) -> str:
+        """A made-up standard InChIKey, e.g. ``XXXXXXXXXXXXXX-YYYYYYYYSA-N``."""
+        letters = "".join(
+            chr(ord("A") + byte % 26)
+            for byte in hashlib.sha256(self.name.encode()).digest()[:22]
+        )
+        return f"{letters[:14]}-{letters[14:]}SA-N"
+
+    def properties(self, names: list[str]) -> dict:
+        """The compound's record in a PubChem property table."""
+        digest = hashlib.sha256(str(self.cid).encode()).digest()
+        values = {
+            "Title": self.name,
+            "IUPACName": self.name,
+            "MolecularFormula": self.formula,
+            "MolecularWeight": str(self.weight),
+            "ExactMass": str(round(self.weight - 0.01, 3)),
+            "SMILES": "C" * (1 + digest[0] % 12),
+            "InChIKey": self.inchikey,
+            "XLogP": round(digest[1] / 64 - 1, 1),
+            "TPSA": float(digest[2] % 120),
+            "HBondDonorCount": digest[3] % 5,
+            "HBondAcceptorCount": digest[4] % 8,
+            "RotatableBondCount": digest[5] % 10,
+            "HeavyAtomCount": 1 + digest[6] % 40,
+            "Charge": 0,
+            "Complexity": float(digest[7] * 2),
+        }
+        return {"CID": self.cid} | {
+            name: values[name] for name in names if name in values
+        }
+
+
+class Catalog:
+    """Compounds by name, CID and InChIKey."""
+
+    def __init__(self) -> None:
+        self.by_name = {
+            name: FakeCompound(cid, name, formula, weight)
+            for name, cid, formula, weight in _KNOWN_COMPOUNDS
+        }
+        self.by_cid = {c.cid: c for c in self.by_name.values()}
+        self.by_inchikey = {c.inchikey: c for c in self.by_name.values()}
+
+    def _synthetic(self, n: int) -> FakeCompound:
+        return FakeCompound(
+            _SYNTHETIC_CID_BASE + n, f"synthine-{n}", "C10H12N2O", 176.22 + n % 100
+        )
+
+    def find_name(self, name: str) -> FakeCompound | None:
+        name = name.strip().lower()
+        if match := _SYNTHETIC_NAME.fullmatch(name):
+            return self._synthetic(int(match.group(1)))
+        return self.by_name.get(name)
+
+    def find_cid(self, cid: int) -> FakeCompound | None:
+        if cid >= _SYNTHETIC_CID_BASE:
+            return self._synthetic(cid - _SYNTHETIC_CID_BASE)
+        return self.by_cid.get(cid)
+
+    def suggest(self, term: str, limit: int) -> list[str]:
+        """Names starting with the term's first three letters, like autocomplete."""
+        prefix = term.strip().lower()[:3]
+        if prefix == "syn" and (match := re.search(r"\d+", term)):
+            return [f"synthine-{match.group()}"]
+        return [name for name in self.by_name if name.startswith(prefix)][:limit]
+
+
+@dataclass
+class FaultConfig:
+    latency_ms: float = 100.0
+    jitter_ms: float = 50.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+
+
+def _fault(code: str, message: str, status_code: int) -> JSONResponse:
+    return JSONResponse(
+        {"Fault": {"Code": code, "Message": message}}, status_code=status_code
+    )
+
+
+def _not_found() -> JSONResponse:
+    return _fault("PUGREST.NotFound", "No CID found", 404)
+
+
+def _property_table(compounds: list[FakeCompound], props: str) -> JSONResponse:
+    if not compounds:
+        return _not_found()
+    names = props.split(",")
+    return JSONResponse(
+        {"PropertyTable": {"Properties": [c.properties(names) for c in compounds]}}
+    )
+
+
+def create_app(config: FaultConfig, catalog: Catalog | None = None) -> Starlette:
+    """The fake PubChem app; ``/stats`` counts requests by endpoint and status."""
+    catalog = catalog or Catalog()
+    counts: Counter[str] = Counter()
+
+    async def respond(endpoint: str, handler) -> JSONResponse:
+        delay = config.latency_ms + random.uniform(0, config.jitter_ms)
+        await asyncio.sleep(delay / 1000)
+        roll = random.random()
+        if roll < config.throttle_rate:
+            response = _fault(
+                "PUGREST.ServerBusy", "Too many requests or server too busy", 503
+            )
+        elif roll < config.throttle_rate + config.error_rate:
+            response = _fault("PUGREST.ServerError", "Internal server error", 500)
+        else:
+            response = await handler()
+        counts[f"{endpoint} {response.status_code}"] += 1
+        return response
+
+    async def autocomplete(request: Request) -> JSONResponse:
+        async def handler():
+            limit = int(request.query_params.get("limit", 10))
+            suggestions = catalog.suggest(request.path_params["term"], limit)
+            return JSONResponse(
+                {
+                    "status": {"code": 0},
+                    "total": len(suggestions),
+                    "dictionary_terms": {"compound": suggestions},
+                }
+            )
+
+        return await respond("autocomplete", handler)
+
+    async def name_property(request: Request) -> JSONResponse:
+        async def handler():
+            compound = catalog.find_name(request.path_params["name"])
+            return _property_table(
+                [compound] if compound else [], request.path_params["props"]
+            )
+
+        return await respond("name_property", handler)
+
+    async def posted_property(request: Request) -> JSONResponse:
+        namespace = request.path_params["namespace"]
+
+        async def handler():
+            # Parsed by hand; Starlette's form parser needs python-multipart
+            form = parse_qs((await request.body()).decode())
+            value = form.get(namespace, [""])[0]
+            if namespace == "cid":
+                try:
+                    cids = [int(cid) for cid in value.split(",")]
+                except ValueError:
+                    return _fault("PUGREST.BadRequest", "Invalid CID", 400)
+                found = [catalog.find_cid(cid) for cid in cids]
+            elif namespace == "name":
+                found = [catalog.find_name(value)]
+            elif namespace == "inchikey":
+                found = [catalog.by_inchikey.get(value)]
+            else:
+                return _fault("PUGREST.BadRequest", "Unsupported namespace", 400)
+            return _property_table(
+                [c for c in found if c is not None], request.path_params["props"]
+            )
+
+        return await respond(f"{namespace}_property", handler)
+
+    async def stats(request: Request) -> JSONResponse:
+        return JSONResponse(dict(counts))
+
+    return Starlette(
+        routes=[
+            Route(
+                "/rest/autocomplete/compound/{term:path}/json",
+                autocomplete,
+                methods=["GET"],
+            ),
+            Route(
+                "/rest/pug/compound/name/{name:path}/property/{props}/JSON",
+                name_property,
+                methods=["GET"],
+            ),
+            Route(
+                "/rest/pug/compound/{namespace}/property/{props}/JSON",
+                posted_property,
+                methods=["POST"],
+            ),
+            Route("/stats", stats, methods=["GET"]),
+        ]
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument(
+        "--jitter-ms", type=float, default=50.0, help="Uniform extra delay, 0 to this"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of requests failing 500"
+    )
+    parser.add_argument(
+        "--throttle-rate",
+        type=float,
+        default=0.0,
+        help="Share of requests throttled 503",
+    )
+    args = parser.parse_args()
+
+    config = FaultConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
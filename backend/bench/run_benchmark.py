@@ -0,0 +1,565 @@
+"""End-to-end benchmark of the MCP tools against a local fake PubChem.
+
+Starts the fake PubChem server (fake_pubchem.py) and mcp_server.py as
+subprocesses, creates a benchmark project in the database DATABASE_URL
+points at (migrating it first), and runs concurrent MCP clients calling
+search_compound, note and todo in a weighted mix for a fixed duration.
+Reports throughput and p50/p95/p99 latency per tool and per operation, and
+writes them with the run's configuration, the commit and both servers'
+/stats to a JSON file, to compare runs across commits:
+
+  uv run python -m bench.run_benchmark --clients 16 --duration 60
+  uv run python -m bench.run_benchmark --compare bench/results/baseline.json
+
+With --compare, exits with status 1 if any operation's p95 latency or
+throughput regressed by more than --tolerance.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from uuid import UUID
+
+import httpx
+from fastmcp import Client
+from fastmcp.client.transports import StreamableHttpTransport
+from sqlalchemy import delete
+
+from db import (
+    Project,
+    SyntheticDataset,
+    analyze_tables,
+    copy_records,
+    get_session,
+    init_db,
+)
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = BACKEND_DIR / "bench" / "results"
+
+# Operation weights of the default mix: mostly lookups and reads, as in a
+# voice session, with the occasional dictated list
+DEFAULT_MIX = {
+    "search_compound": 40,
+    "note.show": 10,
+    "note.add": 10,
+    "note.edit": 5,
+    "todo.show": 15,
+    "todo.add": 10,
+    "todo.edit": 5,
+    "todo.batch": 5,
+}
+# Names PubChem and the local caches have seen before
+_HOT_NAMES = ("aspirin", "caffeine", "ethanol", "acetone", "glucose", "toluene")
+_MISSPELLED_NAMES = ("asprin", "cafeine", "acetonne", "tolune")
+_NOTE_LINES = (
+    "- Dose {n} uC/cm2 gave clean features",
+    "- Spin coated at {n} rpm for 60 s",
+    "- Yield {n}% after purification",
+    "- Sample {n} looked underexposed at the edges",
+)
+_TODOS = (
+    "Order more reagent batch {n}",
+    "Book the SEM for sample {n}",
+    "Repeat run {n} with fresh resist",
+    "Write up the results of run {n}",
+)
+
+
+def _parse_mix(value: str) -> dict[str, int]:
+    """Parse ``op=weight,op=weight``; operations not listed get weight 0."""
+    mix = {}
+    for part in value.split(","):
+        op, _, weight = part.partition("=")
+        if op.strip() not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown operation: {op.strip()}")
+        mix[op.strip()] = int(weight)
+    return mix
+
+
+# =============================================================================
+# Workload
+# =============================================================================
+
+
+@dataclass
+class Workload:
+    """Generates the arguments of each operation; shared by all clients."""
+
+    cold_share: float
+    rng: random.Random = field(default_factory=random.Random)
+    # Fresh per run, so the names are not in the caches of previous runs
+    cold_base: int = field(default_factory=lambda: random.randrange(10**9))
+    cold_count: int = 0
+    note_ids: list[str] = field(default_factory=list)
+    todo_ids: list[str] = field(default_factory=list)
+
+    def compound_names(self) -> list[str]:
+        roll = self.rng.random()
+        if roll < self.cold_share:
+            self.cold_count += 1
+            return [f"synthine-{self.cold_base + self.cold_count}"]
+        if roll < self.cold_share + 0.1:
+            return [self.rng.choice(_MISSPELLED_NAMES)]
+        return [self.rng.choice(_HOT_NAMES)]
+
+    def note_content(self) -> str:
+        lines = self.rng.sample(_NOTE_LINES, 2)
+        return "\n".join(line.format(n=self.rng.randint(1, 10**6)) for line in lines)
+
+    def todo_content(self) -> str:
+        return self.rng.choice(_TODOS).format(n=self.rng.randint(1, 10**6))
+
+    def can_run(self, op: str) -> bool:
+        """False for edits while there is no note or todo to edit."""
+        match op:
+            case "note.edit":
+                return bool(self.note_ids)
+            case "todo.edit":
+                return bool(self.todo_ids)
+        return True
+
+    def arguments(self, op: str) -> tuple[str, dict]:
+        """The tool to call for ``op`` and its arguments."""
+        match op:
+            case "search_compound":
+                return op, {"names": self.compound_names()}
+            case "note.show" | "todo.show":
+                return op.split(".")[0], {"operation": "show"}
+            case "note.edit":
+                note_id = self.rng.choice(self.note_ids)
+                return "note", {
+                    "operation": "edit",
+                    "note_id": note_id,
+                    "content": self.note_content(),
+                }
+            case "todo.edit":
+                todo_id = self.rng.choice(self.todo_ids)
+                status = self.rng.choice(("open", "done"))
+                return "todo", {
+                    "operation": "edit",
+                    "todo_id": todo_id,
+                    "status": status,
+                }
+            case "note.add":
+                return "note", {
+                    "operation": "add",
+                    "title": f"Run {self.rng.randint(1, 10**6)}",
+                    "content": self.note_content(),
+                }
+            case "todo.add":
+                return "todo", {"operation": "add", "content": self.todo_content()}
+            case "todo.batch":
+                items = [{"content": self.todo_content()} for _ in range(5)]
+                return "todo", {"operation": "batch", "items": items}
+        raise ValueError(f"Unknown operation: {op}")
+
+    def record(self, op: str, result: dict | None) -> None:
+        """Remember the IDs of added items, to edit them later."""
+        if not result:
+            return
+        if op == "note.add" and result.get("note_id"):
+            self.note_ids.append(result["note_id"])
+        elif op == "todo.add" and result.get("todo_id"):
+            self.todo_ids.append(result["todo_id"])
+
+
+# =============================================================================
+# Measurement
+# =============================================================================
+
+
+@dataclass
+class Samples:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile of a sorted list."""
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, round(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: Samples, duration: float) -> dict:
+    """Count, error count, throughput and latency percentiles in milliseconds."""
+    ordered = sorted(samples.latencies)
+    return {
+        "count": len(ordered),
+        "errors": samples.errors,
+        "throughput_per_s": round(len(ordered) / duration, 2),
+        "mean_ms": round(1000 * sum(ordered) / len(ordered), 2) if ordered else 0.0,
+        "p50_ms": round(1000 * _percentile(ordered, 0.50), 2),
+        "p95_ms": round(1000 * _percentile(ordered, 0.95), 2),
+        "p99_ms": round(1000 * _percentile(ordered, 0.99), 2),
+        "max_ms": round(1000 * ordered[-1], 2) if ordered else 0.0,
+    }
+
+
+async def run_client(
+    url: str,
+    project_id: UUID,
+    workload: Workload,
+    mix: dict[str, int],
+    stop_at: float,
+    measure_from: float,
+    samples: dict[str, Samples],
+) -> None:
+    """Call operations back to back until ``stop_at``; record those started
+    after ``measure_from``."""
+    transport = StreamableHttpTransport(url, headers={"X-Project-ID": str(project_id)})
+    ops, weights = zip(*mix.items(), strict=True)
+    loop = asyncio.get_running_loop()
+    async with Client(transport, timeout=60) as client:
+        while (started := loop.time()) < stop_at:
+            op = workload.rng.choices(ops, weights)[0]
+            if not workload.can_run(op):
+                # Yield, so other clients' adds can create something to edit
+                await asyncio.sleep(0)
+                continue
+            tool, arguments = workload.arguments(op)
+            try:
+                result = await client.call_tool(tool, arguments, raise_on_error=False)
+                failed = result.is_error
+                workload.record(op, result.structured_content)
+            except Exception:
+                failed = True
+            if started >= measure_from:
+                sample = samples[op]
+                sample.latencies.append(loop.time() - started)
+                sample.errors += failed
+
+
+async def run_load(
+    url: str,
+    project_id: UUID,
+    workload: Workload,
+    mix: dict[str, int],
+    clients: int,
+    duration: float,
+    warmup: float,
+) -> dict[str, Samples]:
+    samples: dict[str, Samples] = defaultdict(Samples)
+    loop = asyncio.get_running_loop()
+    measure_from = loop.time() + warmup
+    stop_at = measure_from + duration
+    await asyncio.gather(
+        *(
+            run_client(url, project_id, workload, mix, stop_at, measure_from, samples)
+            for _ in range(clients)
+        )
+    )
+    return samples
+
+
+def build_report(samples: dict[str, Samples], duration: float) -> dict:
+    """Per-operation and per-tool summaries (a tool merges its operations)."""
+    by_tool: dict[str, Samples] = defaultdict(Samples)
+    for op, sample in samples.items():
+        merged = by_tool[op.split(".")[0]]
+        merged.latencies.extend(sample.latencies)
+        merged.errors += sample.errors
+    return {
+        "operations": {op: summarize(samples[op], duration) for op in sorted(samples)},
+        "tools": {tool: summarize(by_tool[tool], duration) for tool in sorted(by_tool)},
+    }
+
+
+# =============================================================================
+# Servers and database
+# =============================================================================
+
+
+async def create_project(workload: Workload, notes: int, todos: int) -> UUID:
+    """Migrate the database and add a project with existing notes and todos.
+
+    Their IDs go to the workload, for edits.
+    """
+    await init_db(seed=False)
+    dataset = SyntheticDataset(
+        projects=1,
+        sessions_per_project=0,
+        notes_per_project=notes,
+        revisions_per_note=1,
+        todos_per_project=todos,
+        seed=random.randrange(2**31),
+    )
+    async with get_session() as session:
+        tables = dataset.tables()
+        for table in ("projects", "notes", "note_revisions", "todos"):
+            await copy_records(session, table, tables[table])
+        await analyze_tables(session, ("notes", "todos"))
+        await session.commit()
+    workload.note_ids = [str(note["id"]) for note in dataset.note_records()]
+    workload.todo_ids = [str(todo["id"]) for todo in dataset.todo_records()]
+    return next(dataset.project_records())["id"]
+
+
+async def delete_project(project_id: UUID) -> None:
+    async with get_session() as session:
+        # Notes, todos and their revisions go with it (ON DELETE CASCADE)
+        await session.execute(delete(Project).where(Project.id == project_id))
+        await session.commit()
+
+
+def start_process(args: list[str], env: dict[str, str], log) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, *args],
+        cwd=BACKEND_DIR,
+        env=os.environ | env,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+
+
+async def wait_for(url: str, process: subprocess.Popen, timeout: float = 30) -> None:
+    """Wait until ``url`` answers, failing early if the process exits."""
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"{process.args} exited with {process.returncode}")
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise TimeoutError(f"{url} did not answer within {timeout:.0f}s")
+
+
+async def get_json(url: str) -> dict:
+    async with httpx.AsyncClient() as client:
+        response = await client.get(url)
+        response.raise_for_status()
+        return response.json()
+
+
+def git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    dirty = subprocess.run(
+        ["git", "diff", "--quiet", "HEAD"], cwd=BACKEND_DIR
+    ).returncode
+    return result.stdout.strip() + ("-dirty" if dirty else "")
+
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"\n{'operation':<18}{'count':>8}{'errors':>8}{'req/s':>9}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    )
+    for section in ("operations", "tools"):
+        for name, row in report[section].items():
+            print(
+                f"{name:<18}{row['count']:>8}{row['errors']:>8}"
+                f"{row['throughput_per_s']:>9.1f}{row['p50_ms']:>10.1f}"
+                f"{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}"
+            )
+        print()
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Print changes against a baseline run; return the regressions."""
+    regressions = []
+    print(f"Compared with {baseline.get('commit')} ({baseline.get('started_at')}):")
+    for op, row in report["operations"].items():
+        before = baseline["results"]["operations"].get(op)
+        if not before or not before["count"]:
+            continue
+        p95 = row["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+        rate = (
+            row["throughput_per_s"] / before["throughput_per_s"] - 1
+            if before["throughput_per_s"]
+            else 0.0
+        )
+        flag = ""
+        if p95 > tolerance or rate < -tolerance:
+            flag = "  REGRESSION"
+            regressions.append(op)
+        print(f"  {op:<18} p95 {p95:+7.1%}   throughput {rate:+7.1%}{flag}")
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> int:
+    pubchem_url = f"http://127.0.0.1:{args.pubchem_port}"
+    mcp_url = f"http://127.0.0.1:{args.mcp_port}"
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    started_at = datetime.now(UTC)
+    log = tempfile.NamedTemporaryFile("w", prefix="bench-", suffix=".log", delete=False)
+
+    workload = Workload(cold_share=args.cold_share)
+    project_id = await create_project(workload, args.notes, args.todos)
+    processes = []
+    try:
+        processes.append(
+            start_process(
+                [
+                    "-m",
+                    "bench.fake_pubchem",
+                    f"--port={args.pubchem_port}",
+                    f"--latency-ms={args.latency_ms}",
+                    f"--jitter-ms={args.jitter_ms}",
+                    f"--error-rate={args.error_rate}",
+                    f"--throttle-rate={args.throttle_rate}",
+                ],
+                {},
+                log,
+            )
+        )
+        processes.append(
+            start_process(
+                ["mcp_server.py"],
+                {
+                    "MCP_HOST": "127.0.0.1",
+                    "MCP_PORT": str(args.mcp_port),
+                    "PUBCHEM_BASE_URL": f"{pubchem_url}/rest/pug",
+                    "PUBCHEM_AUTOCOMPLETE_URL": f"{pubchem_url}/rest/autocomplete",
+                },
+                log,
+            )
+        )
+        await wait_for(f"{pubchem_url}/stats", processes[0])
+        await wait_for(f"{mcp_url}/stats", processes[1])
+
+        print(
+            f"Running {args.clients} clients for {args.duration:.0f}s "
+            f"(+{args.warmup:.0f}s warmup); server log: {log.name}"
+        )
+        samples = await run_load(
+            f"{mcp_url}/mcp",
+            project_id,
+            workload,
+            args.mix,
+            args.clients,
+            args.duration,
+            args.warmup,
+        )
+        report = build_report(samples, args.duration)
+        server_stats = {
+            "mcp_server": await get_json(f"{mcp_url}/stats"),
+            "fake_pubchem": await get_json(f"{pubchem_url}/stats"),
+        }
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+        log.close()
+        if not args.keep_data:
+            await delete_project(project_id)
+
+    commit = git_commit()
+    result = {
+        "commit": commit,
+        "started_at": started_at.isoformat(),
+        "config": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("out", "compare")
+        },
+        "results": report,
+        "server_stats": server_stats,
+    }
+    out = args.out or RESULTS_DIR / (
+        f"{started_at:%Y%m%dT%H%M%S}-{commit or 'unknown'}.json"
+    )
+    out.write_text(json.dumps(result, indent=2, default=str) + "\n")
+
+    print_report(report)
+    print(f"Results written to {out}")
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if compare(report, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds")
+    parser.add_argument(
+        "--warmup", type=float, default=5.0, help="Seconds run before measuring"
+    )
+    parser.add_argument(
+        "--mix",
+        type=_parse_mix,
+        default=DEFAULT_MIX,
+        help="Operation weights, e.g. search_compound=3,todo.show=1 "
+        f"(operations: {', '.join(DEFAULT_MIX)})",
+    )
+    parser.add_argument(
+        "--cold-share",
+        type=float,
+        default=0.3,
+        help="Share of searches for names no cache has seen",
+    )
+    parser.add_argument(
+        "--notes", type=int, default=200, help="Notes in the project to start with"
+    )
+    parser.add_argument(
+        "--todos", type=int, default=500, help="Todos in the project to start with"
+    )
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--mcp-port", type=int, default=8765)
+    parser.add_argument("--pubchem-port", type=int, default=8766)
+    parser.add_argument(
+        "--keep-data", action="store_true", help="Keep the benchmark project"
+    )
+    parser.add_argument(
+        "--out", type=Path, help="Result file (default: bench/results/)"
+    )
+    parser.add_argument("--compare", type=Path, help="Baseline result file")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="Relative p95 or throughput change counted as a regression",
+    )
+
+    args = parser.parse_args()
+    for kind, count in (("note", args.notes), ("todo", args.todos)):
+        if count < 0:
+            parser.error(f"--{kind}s must not be negative")
+        # Without items to start with, edits wait for adds; with neither they never run
+        if (
+            count == 0
+            and args.mix.get(f"{kind}.edit")
+            and not args.mix.get(f"{kind}.add")
+        ):
+            parser.error(f"{kind}.edit needs --{kind}s above 0 or {kind}.add in --mix")
+
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,78 @@
-from .engine import get_session, init_db
+from .bulk import analyze_tables, copy_records, load_fixtures
+from .engine import check_schema, get_pool_stats, get_session, init_db
+from .migrations import SCHEMA_VERSION, get_schema_version
 from .models import (
+    CompoundCacheEntry,
+    CompoundIndexEntry,
+    CompoundProperties,
+    CompoundSynonym,
     ConversationMessage,
     ConversationSession,
     MessageSource,
     Note,
+    NoteRevision,
     Project,
+    SearchVariationStat,
     Todo,
+    TodoRevision,
     TodoStatus,
 )
+from .projects import ProjectOverview, get_project_overview
+from .search import (
+    SearchHit,
+    SimilarItem,
+    find_similar_note,
+    find_similar_todo,
+    full_text_search,
+)
 from .seed import seed_demo_data
+from .synthetic import SyntheticDataset
+from .writes import (
+    insert_notes,
+    insert_todos,
+    update_note,
+    update_notes,
+    update_todo,
+    update_todos,
+)
 
 __all__ = [
+    "SCHEMA_VERSION",
+    "CompoundCacheEntry",
+    "CompoundIndexEntry",
+    "CompoundProperties",
+    "CompoundSynonym",
     "ConversationMessage",
     "ConversationSession",
     "MessageSource",
     "Note",
+    "NoteRevision",
     "Project",
+    "ProjectOverview",
+    "SearchHit",
+    "SearchVariationStat",
+    "SimilarItem",
+    "SyntheticDataset",
     "Todo",
+    "TodoRevision",
     "TodoStatus",
+    "analyze_tables",
+    "check_schema",
+    "copy_records",
+    "find_similar_note",
+    "find_similar_todo",
+    "full_text_search",
+    "get_pool_stats",
+    "get_project_overview",
+    "get_schema_version",
     "get_session",
     "init_db",
+    "insert_notes",
+    "insert_todos",
+    "load_fixtures",
     "seed_demo_data",
+    "update_note",
+    "update_notes",
+    "update_todo",
+    "update_todos",
 ]
@@ -0,0 +1,205 @@
+"""Bulk loading of projects, conversations, notes and todos with COPY.
+
+Rows are streamed to Postgres with asyncpg's binary COPY, so loading costs
+one round trip per table rather than one INSERT per row. Fixtures are JSON
+arrays or NDJSON files (optionally gzipped) named after their table, e.g.
+``projects.json`` or ``conversation_messages.ndjson.gz``; the demo data and
+the synthetic data generator both use this format.
+"""
+
+import gzip
+import json
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def _uuid(value: str | UUID | None) -> UUID | None:
+    if value is None or isinstance(value, UUID):
+        return value
+    return UUID(value)
+
+
+def _timestamp(value: str | datetime | None) -> datetime | None:
+    """Parse an ISO timestamp into a naive UTC datetime, like the models use."""
+    if value is None or isinstance(value, datetime):
+        return value
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return dt.replace(tzinfo=None)
+
+
+@dataclass(frozen=True)
+class FixtureTable:
+    """A table that can be bulk loaded: its COPY columns and row converter.
+
+    ``convert`` turns a fixture record (parsed JSON, or a generated dict
+    with the same keys) into a tuple in ``columns`` order. Missing
+    timestamps default to the time of loading.
+    """
+
+    name: str
+    columns: tuple[str, ...]
+    convert: Callable[[dict, datetime], tuple]
+
+
+# In foreign-key order. The ``modified`` columns are legacy (see
+# revisions.py); the codec of SQLAlchemy's asyncpg dialect takes JSONB as text.
+FIXTURE_TABLES = (
+    FixtureTable(
+        "projects",
+        ("id", "name", "description", "created_at", "updated_at"),
+        lambda r, now: (
+            _uuid(r["id"]),
+            r["name"],
+            r.get("description"),
+            _timestamp(r.get("created_at")) or now,
+            _timestamp(r.get("updated_at")) or now,
+        ),
+    ),
+    FixtureTable(
+        "conversation_sessions",
+        ("id", "project_id", "agent_id", "started_at", "ended_at"),
+        lambda r, now: (
+            _uuid(r["id"]),
+            _uuid(r["project_id"]),
+            r["agent_id"],
+            _timestamp(r.get("started_at")) or now,
+            _timestamp(r.get("ended_at")),
+        ),
+    ),
+    FixtureTable(
+        "conversation_messages",
+        ("id", "session_id", "content", "source", "timestamp"),
+        lambda r, now: (
+            _uuid(r["id"]),
+            _uuid(r["session_id"]),
+            r["content"],
+            r["source"],
+            _timestamp(r.get("timestamp")) or now,
+        ),
+    ),
+    FixtureTable(
+        "notes",
+        ("id", "project_id", "title", "content", "created_at", "modified"),
+        lambda r, now: (
+            _uuid(r["id"]),
+            _uuid(r["project_id"]),
+            r["title"],
+            r["content"],
+            _timestamp(r.get("created_at")) or now,
+            "[]",
+        ),
+    ),
+    FixtureTable(
+        "note_revisions",
+        ("id", "item_id", "title", "content", "modified_at"),
+        lambda r, now: (
+            _uuid(r["id"]),
+            _uuid(r["item_id"]),
+            r["title"],
+            r["content"],
+            _timestamp(r.get("modified_at")) or now,
+        ),
+    ),
+    FixtureTable(
+        "todos",
+        ("id", "project_id", "content", "status", "created_at", "modified"),
+        lambda r, now: (
+            _uuid(r["id"]),
+            _uuid(r["project_id"]),
+            r["content"],
+            r.get("status", "open"),
+            _timestamp(r.get("created_at")) or now,
+            "[]",
+        ),
+    ),
+    FixtureTable(
+        "todo_revisions",
+        ("id", "item_id", "content", "status", "modified_at"),
+        lambda r, now: (
+            _uuid(r["id"]),
+            _uuid(r["item_id"]),
+            r["content"],
+            r["status"],
+            _timestamp(r.get("modified_at")) or now,
+        ),
+    ),
+)
+FIXTURE_TABLES_BY_NAME = {table.name: table for table in FIXTURE_TABLES}
+# Older fixture file names, as used by demo_data/
+_FIXTURE_ALIASES = {
+    "conversation_sessions": ("sessions",),
+    "conversation_messages": ("messages",),
+}
+_FIXTURE_SUFFIXES = (".ndjson", ".jsonl", ".json")
+
+
+def find_fixture(directory: Path, table: str) -> Path | None:
+    """Return the fixture file for ``table`` in ``directory``, if there is one."""
+    for stem in (table, *_FIXTURE_ALIASES.get(table, ())):
+        for suffix in _FIXTURE_SUFFIXES:
+            for path in (
+                directory / f"{stem}{suffix}",
+                directory / f"{stem}{suffix}.gz",
+            ):
+                if path.exists():
+                    return path
+    return None
+
+
+def read_fixture(path: Path) -> Iterator[dict]:
+    """Yield the records of a JSON array or NDJSON file (gzip by ``.gz`` suffix).
+
+    NDJSON is streamed line by line; a JSON array is parsed whole.
+    """
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        if path.name.removesuffix(".gz").endswith(".json"):
+            yield from json.load(f)
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+async def copy_records(
+    session: AsyncSession, table: str, records: Iterable[dict]
+) -> int:
+    """COPY fixture records into ``table`` in the session's transaction.
+
+    Returns the number of rows copied.
+    """
+    spec = FIXTURE_TABLES_BY_NAME[table]
+    now = datetime.utcnow()
+    connection = await session.connection()
+    raw = await connection.get_raw_connection()
+    status = await raw.driver_connection.copy_records_to_table(
+        table,
+        records=(spec.convert(record, now) for record in records),
+        columns=list(spec.columns),
+    )
+    # asyncpg returns the command tag, "COPY <rows>"
+    return int(status.split()[-1])
+
+
+async def load_fixtures(session: AsyncSession, directory: Path) -> dict[str, int]:
+    """Load every fixture found in ``directory``; return rows copied per table."""
+    counts = {}
+    for spec in FIXTURE_TABLES:
+        path = find_fixture(directory, spec.name)
+        if path is not None:
+            counts[spec.name] = await copy_records(
+                session, spec.name, read_fixture(path)
+            )
+    return counts
+
+
+async def analyze_tables(session: AsyncSession, tables: Iterable[str]) -> None:
+    """Refresh planner statistics after a bulk load."""
+    for table in tables:
+        await session.execute(text(f"ANALYZE {FIXTURE_TABLES_BY_NAME[table].name}"))
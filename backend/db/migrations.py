@@ -0,0 +1,304 @@
+"""Versioned schema migrations for the backend database.
+
+Each migration has a version number and is applied once, in order; the
+versions applied are recorded in ``schema_version``. The server only checks
+the recorded version on startup; ``migrate_db.py`` applies migrations.
+Migrations are written to be idempotent, so databases created before
+versioning (by the old startup ``create_all`` or the frontend's DDL) are
+brought to the same schema by running them all.
+
+Schema changes go into a new migration at the end of ``MIGRATIONS``;
+editing the models alone does not change any database. Migration 1 is the
+schema as it was when versioning was introduced, written out as DDL, so it
+does not follow later model changes.
+"""
+
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from .revisions import migrate_revision_history
+from .search import migrate_search_columns
+
+# Serializes migration runs started at the same time
+_MIGRATION_LOCK_ID = 72_614_002
+
+_SCHEMA_VERSION_DDL = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version integer PRIMARY KEY,
+        description text NOT NULL,
+        applied_at timestamptz NOT NULL DEFAULT now()
+    )
+"""
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[AsyncConnection], Awaitable[None]]
+
+
+def _statements(*statements: str) -> Callable[[AsyncConnection], Awaitable[None]]:
+    async def apply(conn: AsyncConnection) -> None:
+        for statement in statements:
+            await conn.execute(text(statement))
+
+    return apply
+
+
+# The schema as the models created it when versioning was introduced. Frozen:
+# later schema changes are later migrations, not edits here.
+_BASELINE_DDL = (
+    # Trigram indexes on compound synonyms need pg_trgm
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    *(
+        f"""
+        DO $$ BEGIN
+            CREATE TYPE {name} AS ENUM ({values});
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END $$
+        """
+        for name, values in (
+            ("todostatus", "'open', 'done'"),
+            ("messagesource", "'user', 'assistant'"),
+        )
+    ),
+    """
+    CREATE TABLE IF NOT EXISTS compound_cache (
+        kind VARCHAR(32) NOT NULL,
+        key VARCHAR(512) NOT NULL,
+        value JSONB NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (kind, key)
+    )
+    """,
+    """CREATE INDEX IF NOT EXISTS ix_compound_cache_expires_at
+       ON compound_cache (expires_at)""",
+    """
+    CREATE TABLE IF NOT EXISTS compound_index (
+        cid INTEGER NOT NULL,
+        title VARCHAR,
+        iupac_name VARCHAR,
+        molecular_formula VARCHAR(255),
+        molecular_weight FLOAT,
+        inchi_key VARCHAR(27),
+        PRIMARY KEY (cid)
+    )
+    """,
+    """CREATE INDEX IF NOT EXISTS ix_compound_index_inchi_key
+       ON compound_index (inchi_key)""",
+    """
+    CREATE TABLE IF NOT EXISTS compound_properties (
+        cid INTEGER NOT NULL,
+        properties JSONB NOT NULL,
+        fetched_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (cid)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS compound_synonyms (
+        name VARCHAR(255) NOT NULL,
+        cid INTEGER NOT NULL,
+        display_name VARCHAR(255) NOT NULL,
+        PRIMARY KEY (name, cid)
+    )
+    """,
+    """CREATE INDEX IF NOT EXISTS ix_compound_synonyms_cid
+       ON compound_synonyms (cid)""",
+    """CREATE INDEX IF NOT EXISTS ix_compound_synonyms_name_prefix
+       ON compound_synonyms (name text_pattern_ops)""",
+    """CREATE INDEX IF NOT EXISTS ix_compound_synonyms_name_trgm
+       ON compound_synonyms USING gin (name gin_trgm_ops)""",
+    """
+    CREATE TABLE IF NOT EXISTS projects (
+        id UUID NOT NULL,
+        name VARCHAR(255) NOT NULL,
+        description VARCHAR,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS search_variation_stats (
+        kind VARCHAR(32) NOT NULL,
+        attempts INTEGER NOT NULL,
+        hits INTEGER NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (kind)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS conversation_sessions (
+        id UUID NOT NULL,
+        project_id UUID NOT NULL,
+        agent_id VARCHAR NOT NULL,
+        started_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        ended_at TIMESTAMP WITH TIME ZONE,
+        PRIMARY KEY (id),
+        FOREIGN KEY(project_id) REFERENCES projects (id) ON DELETE CASCADE
+    )
+    """,
+    """CREATE INDEX IF NOT EXISTS ix_conversation_sessions_agent_id
+       ON conversation_sessions (agent_id)""",
+    """CREATE INDEX IF NOT EXISTS ix_conversation_sessions_project_id
+       ON conversation_sessions (project_id)""",
+    """
+    CREATE TABLE IF NOT EXISTS notes (
+        id UUID NOT NULL,
+        project_id UUID NOT NULL,
+        title VARCHAR(255) NOT NULL,
+        content VARCHAR NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        modified JSONB,
+        PRIMARY KEY (id),
+        FOREIGN KEY(project_id) REFERENCES projects (id) ON DELETE CASCADE
+    )
+    """,
+    """CREATE INDEX IF NOT EXISTS ix_notes_project_id
+       ON notes (project_id)""",
+    """
+    CREATE TABLE IF NOT EXISTS todos (
+        id UUID NOT NULL,
+        project_id UUID NOT NULL,
+        content VARCHAR NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        modified JSONB,
+        status todostatus NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(project_id) REFERENCES projects (id) ON DELETE CASCADE
+    )
+    """,
+    """CREATE INDEX IF NOT EXISTS ix_todos_project_id
+       ON todos (project_id)""",
+    """
+    CREATE TABLE IF NOT EXISTS conversation_messages (
+        id UUID NOT NULL,
+        session_id UUID NOT NULL,
+        content VARCHAR NOT NULL,
+        source messagesource NOT NULL,
+        timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(session_id) REFERENCES conversation_sessions (id) ON DELETE CASCADE
+    )
+    """,
+    """CREATE INDEX IF NOT EXISTS ix_conversation_messages_session_id
+       ON conversation_messages (session_id)""",
+    """
+    CREATE TABLE IF NOT EXISTS note_revisions (
+        id UUID NOT NULL,
+        item_id UUID NOT NULL,
+        title VARCHAR(255) NOT NULL,
+        content VARCHAR NOT NULL,
+        modified_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(item_id) REFERENCES notes (id) ON DELETE CASCADE
+    )
+    """,
+    """CREATE INDEX IF NOT EXISTS ix_note_revisions_item_id_modified_at
+       ON note_revisions (item_id, modified_at)""",
+    """
+    CREATE TABLE IF NOT EXISTS todo_revisions (
+        id UUID NOT NULL,
+        item_id UUID NOT NULL,
+        content VARCHAR NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        modified_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(item_id) REFERENCES todos (id) ON DELETE CASCADE
+    )
+    """,
+    """CREATE INDEX IF NOT EXISTS ix_todo_revisions_item_id_modified_at
+       ON todo_revisions (item_id, modified_at)""",
+)
+
+
+MIGRATIONS = [
+    Migration(1, "Create tables", _statements(*_BASELINE_DDL)),
+    Migration(2, "Move edit history to revision tables", migrate_revision_history),
+    Migration(3, "Add full-text search columns", migrate_search_columns),
+    Migration(
+        4,
+        "Add composite indexes for project lists and transcripts",
+        _statements(
+            # Keyset pages of a project's notes/todos, newest first (a btree
+            # is scanned backwards for DESC), and todos filtered by status
+            """CREATE INDEX IF NOT EXISTS ix_notes_project_id_created_at
+               ON notes (project_id, created_at, id)""",
+            """CREATE INDEX IF NOT EXISTS ix_todos_project_id_created_at
+               ON todos (project_id, created_at, id)""",
+            """CREATE INDEX IF NOT EXISTS ix_todos_project_id_status_created_at
+               ON todos (project_id, status, created_at, id)""",
+            # A session's messages in order
+            """CREATE INDEX IF NOT EXISTS ix_conversation_messages_session_id_timestamp
+               ON conversation_messages (session_id, timestamp)""",
+            # Prefixes of the indexes above, from create_all and the frontend
+            "DROP INDEX IF EXISTS ix_notes_project_id",
+            "DROP INDEX IF EXISTS idx_notes_project_id",
+            "DROP INDEX IF EXISTS ix_todos_project_id",
+            "DROP INDEX IF EXISTS idx_todos_project_id",
+            "DROP INDEX IF EXISTS idx_todos_status",
+            "DROP INDEX IF EXISTS ix_conversation_messages_session_id",
+            "DROP INDEX IF EXISTS idx_conversation_messages_session_id",
+        ),
+    ),
+    Migration(
+        5,
+        "Cascade deletes from projects and sessions",
+        _statements(
+            *(
+                f"""ALTER TABLE {table}
+                    DROP CONSTRAINT IF EXISTS {table}_{column}_fkey,
+                    ADD CONSTRAINT {table}_{column}_fkey FOREIGN KEY ({column})
+                        REFERENCES {parent} (id) ON DELETE CASCADE"""
+                for table, column, parent in (
+                    ("notes", "project_id", "projects"),
+                    ("todos", "project_id", "projects"),
+                    ("conversation_sessions", "project_id", "projects"),
+                    ("conversation_messages", "session_id", "conversation_sessions"),
+                )
+            )
+        ),
+    ),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+async def get_schema_version(conn: AsyncConnection) -> int:
+    """Return the database's schema version; 0 if it was never migrated."""
+    result = await conn.execute(text("SELECT to_regclass('schema_version')"))
+    if result.scalar() is None:
+        return 0
+    result = await conn.execute(text("SELECT max(version) FROM schema_version"))
+    return result.scalar() or 0
+
+
+async def apply_migrations(conn: AsyncConnection) -> list[Migration]:
+    """Apply the migrations the database is missing; return those applied.
+
+    Run inside one transaction, so a failed migration leaves the schema as
+    it was.
+    """
+    await conn.execute(text(f"SELECT pg_advisory_xact_lock({_MIGRATION_LOCK_ID})"))
+    await conn.execute(text(_SCHEMA_VERSION_DDL))
+    current = await get_schema_version(conn)
+
+    applied = []
+    for migration in MIGRATIONS:
+        if migration.version <= current:
+            continue
+        await migration.apply(conn)
+        await conn.execute(
+            text(
+                "INSERT INTO schema_version (version, description) "
+                "VALUES (:version, :description)"
+            ),
+            {"version": migration.version, "description": migration.description},
+        )
+        applied.append(migration)
+    return applied
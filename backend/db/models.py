@@ -1,8 +1,9 @@
 from datetime import datetime
 from enum import Enum
+from typing import Any
 from uuid import UUID, uuid4
 
-from sqlalchemy import Column
+from sqlalchemy import Column, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import Field, Relationship, SQLModel
 
@@ -21,38 +22,98 @@ class TodoStatus(str, Enum):
     done = "done"
 
 
+# Relationships never load implicitly: a project can hold tens of thousands
+# of messages, so touching one must not pull them all. Load them explicitly
+# when needed, e.g. select(Project).options(selectinload(Project.notes)).
+# Deleting a parent relies on the foreign keys' ON DELETE CASCADE instead
+# of loading the children to delete them.
+_CHILDREN = {"cascade": "all, delete-orphan", "lazy": "raise", "passive_deletes": True}
+_PARENT = {"lazy": "raise"}
+
+
 class Note(SQLModel, table=True):
     """A note associated with a project."""
 
     __tablename__ = "notes"
+    __table_args__ = (
+        Index("ix_notes_project_id_created_at", "project_id", "created_at", "id"),
+    )
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
-    project_id: UUID = Field(foreign_key="projects.id", index=True)
+    project_id: UUID = Field(foreign_key="projects.id", ondelete="CASCADE")
     title: str = Field(max_length=255)
     content: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Legacy edit history, moved to note_revisions once by migration 2 and
+    # empty since. Read the history through the notes_with_history view.
     modified: list[dict] = Field(
         default_factory=list, sa_column=Column(JSONB, default=[])
     )
 
-    project: "Project" = Relationship(back_populates="notes")
+    project: "Project" = Relationship(
+        back_populates="notes", sa_relationship_kwargs=_PARENT
+    )
 
 
 class Todo(SQLModel, table=True):
     """A todo item associated with a project."""
 
     __tablename__ = "todos"
+    __table_args__ = (
+        Index("ix_todos_project_id_created_at", "project_id", "created_at", "id"),
+        Index(
+            "ix_todos_project_id_status_created_at",
+            "project_id",
+            "status",
+            "created_at",
+            "id",
+        ),
+    )
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
-    project_id: UUID = Field(foreign_key="projects.id", index=True)
+    project_id: UUID = Field(foreign_key="projects.id", ondelete="CASCADE")
     content: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Legacy edit history, moved to todo_revisions once by migration 2 and
+    # empty since. Read the history through the todos_with_history view.
     modified: list[dict] = Field(
         default_factory=list, sa_column=Column(JSONB, default=[])
     )
     status: TodoStatus = Field(default=TodoStatus.open)
 
-    project: "Project" = Relationship(back_populates="todos")
+    project: "Project" = Relationship(
+        back_populates="todos", sa_relationship_kwargs=_PARENT
+    )
+
+
+class NoteRevision(SQLModel, table=True):
+    """A snapshot of a note taken before it was edited (append-only)."""
+
+    __tablename__ = "note_revisions"
+    __table_args__ = (
+        Index("ix_note_revisions_item_id_modified_at", "item_id", "modified_at"),
+    )
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    item_id: UUID = Field(foreign_key="notes.id", ondelete="CASCADE")
+    title: str = Field(max_length=255)
+    content: str
+    modified_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TodoRevision(SQLModel, table=True):
+    """A snapshot of a todo taken before it was edited (append-only)."""
+
+    __tablename__ = "todo_revisions"
+    __table_args__ = (
+        Index("ix_todo_revisions_item_id_modified_at", "item_id", "modified_at"),
+    )
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    item_id: UUID = Field(foreign_key="todos.id", ondelete="CASCADE")
+    content: str
+    status: str = Field(max_length=20)
+    modified_at: datetime = Field(default_factory=datetime.utcnow)
 
 
 class Project(SQLModel, table=True):
@@ -68,15 +129,15 @@ class Project(SQLModel, table=True):
 
     sessions: list["ConversationSession"] = Relationship(
         back_populates="project",
-        sa_relationship_kwargs={"cascade": "all, delete-orphan", "lazy": "selectin"},
+        sa_relationship_kwargs=_CHILDREN,
     )
     notes: list["Note"] = Relationship(
         back_populates="project",
-        sa_relationship_kwargs={"cascade": "all, delete-orphan", "lazy": "selectin"},
+        sa_relationship_kwargs=_CHILDREN,
     )
     todos: list["Todo"] = Relationship(
         back_populates="project",
-        sa_relationship_kwargs={"cascade": "all, delete-orphan", "lazy": "selectin"},
+        sa_relationship_kwargs=_CHILDREN,
     )
 
 
@@ -84,14 +145,21 @@ class ConversationMessage(SQLModel, table=True):
     """Individual message within a conversation session."""
 
     __tablename__ = "conversation_messages"
+    __table_args__ = (
+        Index(
+            "ix_conversation_messages_session_id_timestamp", "session_id", "timestamp"
+        ),
+    )
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
-    session_id: UUID = Field(foreign_key="conversation_sessions.id", index=True)
+    session_id: UUID = Field(foreign_key="conversation_sessions.id", ondelete="CASCADE")
     content: str
     source: MessageSource
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
-    session: "ConversationSession" = Relationship(back_populates="messages")
+    session: "ConversationSession" = Relationship(
+        back_populates="messages", sa_relationship_kwargs=_PARENT
+    )
 
 
 class ConversationSession(SQLModel, table=True):
@@ -100,13 +168,97 @@ class ConversationSession(SQLModel, table=True):
     __tablename__ = "conversation_sessions"
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
-    project_id: UUID = Field(foreign_key="projects.id", index=True)
+    project_id: UUID = Field(foreign_key="projects.id", ondelete="CASCADE", index=True)
     agent_id: str = Field(index=True)
     started_at: datetime = Field(default_factory=datetime.utcnow)
     ended_at: datetime | None = None
 
-    project: Project = Relationship(back_populates="sessions")
+    project: Project = Relationship(
+        back_populates="sessions", sa_relationship_kwargs=_PARENT
+    )
     messages: list[ConversationMessage] = Relationship(
         back_populates="session",
-        sa_relationship_kwargs={"cascade": "all, delete-orphan", "lazy": "selectin"},
+        sa_relationship_kwargs=_CHILDREN,
+    )
+
+
+class CompoundCacheEntry(SQLModel, table=True):
+    """A cached PubChem lookup, keyed by lookup kind and normalized key."""
+
+    __tablename__ = "compound_cache"
+
+    kind: str = Field(primary_key=True, max_length=32)
+    key: str = Field(primary_key=True, max_length=512)
+    value: Any = Field(sa_column=Column(JSONB, nullable=False))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(index=True)
+
+
+class CompoundProperties(SQLModel, table=True):
+    """The full PubChem property record of a compound, kept per CID."""
+
+    __tablename__ = "compound_properties"
+
+    cid: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    properties: dict = Field(sa_column=Column(JSONB, nullable=False))
+    fetched_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class CompoundIndexEntry(SQLModel, table=True):
+    """A compound in the offline compound index, with PubChem-style properties."""
+
+    __tablename__ = "compound_index"
+
+    cid: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    title: str | None = None
+    iupac_name: str | None = None
+    molecular_formula: str | None = Field(default=None, max_length=255)
+    molecular_weight: float | None = None
+    inchi_key: str | None = Field(default=None, max_length=27, index=True)
+
+    def to_properties(self) -> dict:
+        """Return the properties keyed like a PubChem property table record."""
+        properties = {
+            "CID": self.cid,
+            "Title": self.title,
+            "IUPACName": self.iupac_name,
+            "MolecularFormula": self.molecular_formula,
+            "MolecularWeight": self.molecular_weight,
+            "InChIKey": self.inchi_key,
+        }
+        return {key: value for key, value in properties.items() if value is not None}
+
+
+class CompoundSynonym(SQLModel, table=True):
+    """A name or synonym of a compound in the offline compound index."""
+
+    __tablename__ = "compound_synonyms"
+    __table_args__ = (
+        Index(
+            "ix_compound_synonyms_name_prefix",
+            "name",
+            postgresql_ops={"name": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_compound_synonyms_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
     )
+
+    # Normalized (lowercased, whitespace-collapsed) name used for matching
+    name: str = Field(primary_key=True, max_length=255)
+    cid: int = Field(primary_key=True, index=True)
+    display_name: str = Field(max_length=255)
+
+
+class SearchVariationStat(SQLModel, table=True):
+    """How often a kind of search-term variation resolved to a PubChem CID."""
+
+    __tablename__ = "search_variation_stats"
+
+    kind: str = Field(primary_key=True, max_length=32)
+    attempts: int = 0
+    hits: int = 0
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
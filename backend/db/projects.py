@@ -0,0 +1,79 @@
+"""A project's overview: item counts, latest activity and recent items.
+
+Computed in one query from aggregates and small LIMITed subqueries. Messages
+are not counted; the latest one per session is read from the
+(session_id, timestamp) index, so the cost does not grow with the number of
+messages the project has accumulated. The project's relationships are never
+loaded.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+_OVERVIEW_QUERY = text(
+    """
+    SELECT
+        p.id, p.name, p.description,
+        (SELECT count(*) FROM notes WHERE project_id = p.id) AS note_count,
+        (SELECT count(*) FROM todos WHERE project_id = p.id AND status = 'open')
+            AS open_todo_count,
+        (SELECT count(*) FROM todos WHERE project_id = p.id AND status = 'done')
+            AS done_todo_count,
+        (SELECT count(*) FROM conversation_sessions WHERE project_id = p.id)
+            AS session_count,
+        greatest(
+            (SELECT max(created_at) FROM notes WHERE project_id = p.id),
+            (SELECT max(r.modified_at) FROM note_revisions r
+             JOIN notes n ON n.id = r.item_id WHERE n.project_id = p.id),
+            (SELECT max(created_at) FROM todos WHERE project_id = p.id),
+            (SELECT max(r.modified_at) FROM todo_revisions r
+             JOIN todos t ON t.id = r.item_id WHERE t.project_id = p.id),
+            (SELECT max(m.timestamp) FROM conversation_messages m
+             JOIN conversation_sessions s ON s.id = m.session_id
+             WHERE s.project_id = p.id)
+        ) AS last_activity_at,
+        (SELECT coalesce(jsonb_agg(jsonb_build_object(
+                    'id', n.id, 'title', n.title, 'created_at', n.created_at)), '[]')
+         FROM (SELECT id, title, created_at FROM notes WHERE project_id = p.id
+               ORDER BY created_at DESC, id DESC LIMIT :recent) n) AS recent_notes,
+        (SELECT coalesce(jsonb_agg(jsonb_build_object(
+                    'id', t.id, 'content', t.content, 'created_at', t.created_at)), '[]')
+         FROM (SELECT id, content, created_at FROM todos
+               WHERE project_id = p.id AND status = 'open'
+               ORDER BY created_at DESC, id DESC LIMIT :recent) t) AS recent_open_todos
+    FROM projects p
+    WHERE p.id = :project_id
+    """
+).columns(recent_notes=JSONB, recent_open_todos=JSONB)
+
+
+@dataclass
+class ProjectOverview:
+    """Counts, latest activity and the newest notes and open todos of a project."""
+
+    id: UUID
+    name: str
+    description: str | None
+    note_count: int
+    open_todo_count: int
+    done_todo_count: int
+    session_count: int
+    last_activity_at: datetime | None
+    recent_notes: list[dict]
+    recent_open_todos: list[dict]
+
+
+async def get_project_overview(
+    session: AsyncSession, project_id: UUID, recent: int = 5
+) -> ProjectOverview | None:
+    """Return the project's overview, or None if there is no such project."""
+    result = await session.execute(
+        _OVERVIEW_QUERY, {"project_id": project_id, "recent": recent}
+    )
+    row = result.mappings().first()
+    return ProjectOverview(**row) if row else None
@@ -0,0 +1,91 @@
+"""Edit history of notes and todos in append-only revision tables.
+
+Each edit inserts one row into ``note_revisions`` or ``todo_revisions``
+instead of rewriting the item's whole JSONB ``modified`` array, so an edit
+costs the same however often the item was edited before. The
+``notes_with_history`` and ``todos_with_history`` views rebuild the old
+``modified`` array from the revisions for readers that expect it.
+"""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# Serializes the backfill if two migration runs overlap
+_BACKFILL_LOCK_ID = 72_614_001
+
+_TIMESTAMP_FORMAT = """'YYYY-MM-DD"T"HH24:MI:SS.MS"Z"'"""
+
+BACKFILL_STATEMENTS = [
+    f"SELECT pg_advisory_xact_lock({_BACKFILL_LOCK_ID})",
+    """
+    INSERT INTO note_revisions (id, item_id, title, content, modified_at)
+    SELECT gen_random_uuid(), n.id,
+           COALESCE(e->>'title', n.title), COALESCE(e->>'content', n.content),
+           COALESCE((e->>'modifiedAt')::timestamptz AT TIME ZONE 'UTC', n.created_at)
+    FROM notes n,
+         jsonb_array_elements(
+             CASE WHEN jsonb_typeof(n.modified) = 'array' THEN n.modified END
+         ) AS e
+    """,
+    """
+    UPDATE notes SET modified = '[]'::jsonb
+    WHERE jsonb_typeof(modified) = 'array' AND modified <> '[]'::jsonb
+    """,
+    """
+    INSERT INTO todo_revisions (id, item_id, content, status, modified_at)
+    SELECT gen_random_uuid(), t.id,
+           COALESCE(e->>'content', t.content), COALESCE(e->>'status', t.status::text),
+           COALESCE((e->>'modifiedAt')::timestamptz AT TIME ZONE 'UTC', t.created_at)
+    FROM todos t,
+         jsonb_array_elements(
+             CASE WHEN jsonb_typeof(t.modified) = 'array' THEN t.modified END
+         ) AS e
+    """,
+    """
+    UPDATE todos SET modified = '[]'::jsonb
+    WHERE jsonb_typeof(modified) = 'array' AND modified <> '[]'::jsonb
+    """,
+]
+
+VIEW_STATEMENTS = [
+    f"""
+    CREATE OR REPLACE VIEW notes_with_history AS
+    SELECT n.id, n.project_id, n.title, n.content, n.created_at,
+           COALESCE(
+               (SELECT jsonb_agg(jsonb_build_object(
+                           'title', r.title,
+                           'content', r.content,
+                           'modifiedAt', to_char(r.modified_at, {_TIMESTAMP_FORMAT})
+                       ) ORDER BY r.modified_at)
+                FROM note_revisions r WHERE r.item_id = n.id),
+               '[]'::jsonb
+           ) AS modified
+    FROM notes n
+    """,
+    f"""
+    CREATE OR REPLACE VIEW todos_with_history AS
+    SELECT t.id, t.project_id, t.content, t.created_at, t.status,
+           COALESCE(
+               (SELECT jsonb_agg(jsonb_build_object(
+                           'content', r.content,
+                           'status', r.status,
+                           'modifiedAt', to_char(r.modified_at, {_TIMESTAMP_FORMAT})
+                       ) ORDER BY r.modified_at)
+                FROM todo_revisions r WHERE r.item_id = t.id),
+               '[]'::jsonb
+           ) AS modified
+    FROM todos t
+    """,
+]
+
+
+async def migrate_revision_history(conn: AsyncConnection) -> None:
+    """Move JSONB ``modified`` histories into the revision tables; create the views.
+
+    Runs once, as schema migration 2 from ``migrate_db.py``. Moved histories
+    are emptied, so a run that stops partway can be repeated without
+    duplicating revisions. Entries appended to the JSONB column after the
+    migration are not moved.
+    """
+    for statement in BACKFILL_STATEMENTS + VIEW_STATEMENTS:
+        await conn.execute(text(statement))
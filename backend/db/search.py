@@ -0,0 +1,190 @@
+"""Full-text and similarity search over a project's notes, todos and messages.
+
+Each searchable table gets a generated ``search_vector`` tsvector column
+with a GIN index, so Postgres keeps it up to date on every insert and
+update, whichever client writes the row. The columns are not part of the
+SQLModel models, so ordinary ORM queries do not load them. Note titles and
+note and todo contents also get pg_trgm indexes, used to find existing
+items similar to one that is about to be added.
+"""
+
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+SEARCH_CONFIG = "english"
+# Minimum pg_trgm similarity (0-1) for an existing item to count as a duplicate
+DUPLICATE_SIMILARITY_THRESHOLD = float(
+    os.getenv("DUPLICATE_SIMILARITY_THRESHOLD", "0.6")
+)
+
+_SEARCH_COLUMNS = {
+    "notes": "coalesce(title, '') || ' ' || coalesce(content, '')",
+    "todos": "coalesce(content, '')",
+    "conversation_messages": "coalesce(content, '')",
+}
+
+SEARCH_DDL = [
+    statement
+    for table, document in _SEARCH_COLUMNS.items()
+    for statement in (
+        f"""
+        ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('{SEARCH_CONFIG}', {document})) STORED
+        """,
+        f"""
+        CREATE INDEX IF NOT EXISTS ix_{table}_search_vector
+        ON {table} USING gin (search_vector)
+        """,
+    )
+] + [
+    f"""
+    CREATE INDEX IF NOT EXISTS ix_{table}_{column}_trgm
+    ON {table} USING gin ({column} gin_trgm_ops)
+    """
+    for table, column in (
+        ("notes", "title"),
+        ("notes", "content"),
+        ("todos", "content"),
+    )
+]
+
+# Words are OR-ed rather than AND-ed: a spoken question ("what dose did I use
+# for the bowtie antennas") rarely has every word in the text it refers to.
+# ts_rank_cd ranks items matching more of the words higher. Snippets are only
+# built for the rows that are returned.
+_SEARCH_QUERY = text(
+    f"""
+    WITH q AS (
+        SELECT replace(
+            plainto_tsquery('{SEARCH_CONFIG}', :query)::text, ' & ', ' | '
+        )::tsquery AS query
+    ),
+    hits AS (
+        SELECT 'note' AS kind, n.id, n.title, n.content AS body, n.created_at,
+               ts_rank_cd(n.search_vector, q.query) AS rank
+        FROM notes n, q
+        WHERE n.project_id = :project_id AND n.search_vector @@ q.query
+        UNION ALL
+        SELECT 'todo', t.id, NULL, t.content, t.created_at,
+               ts_rank_cd(t.search_vector, q.query)
+        FROM todos t, q
+        WHERE t.project_id = :project_id AND t.search_vector @@ q.query
+        UNION ALL
+        SELECT 'message', m.id, NULL, m.content, m.timestamp,
+               ts_rank_cd(m.search_vector, q.query)
+        FROM conversation_messages m
+        JOIN conversation_sessions s ON s.id = m.session_id, q
+        WHERE s.project_id = :project_id AND m.search_vector @@ q.query
+        ORDER BY rank DESC, created_at DESC
+        LIMIT :limit
+    )
+    SELECT hits.kind, hits.id, hits.title, hits.created_at, hits.rank,
+           ts_headline('{SEARCH_CONFIG}', hits.body, q.query,
+                       'MaxFragments=2, MaxWords=25, MinWords=8, '
+                       'StartSel=*, StopSel=*') AS snippet
+    FROM hits, q
+    ORDER BY hits.rank DESC, hits.created_at DESC
+    """
+)
+
+
+@dataclass
+class SearchHit:
+    """A note, todo or message matching a search, with a highlighted snippet."""
+
+    kind: str
+    id: UUID
+    title: str | None
+    created_at: datetime
+    rank: float
+    snippet: str
+
+
+# "%" selects candidates through the trigram indexes (at pg_trgm's default
+# 0.3 threshold); the stricter duplicate threshold is applied to the result
+_SIMILAR_NOTE_QUERY = text(
+    """
+    SELECT id, title, content,
+           greatest(similarity(title, :title), similarity(content, :content))
+               AS score
+    FROM notes
+    WHERE project_id = :project_id AND (title % :title OR content % :content)
+    ORDER BY score DESC
+    LIMIT 1
+    """
+)
+
+_SIMILAR_TODO_QUERY = text(
+    """
+    SELECT id, NULL AS title, content, similarity(content, :content) AS score
+    FROM todos
+    WHERE project_id = :project_id AND status = 'open' AND content % :content
+    ORDER BY score DESC
+    LIMIT 1
+    """
+)
+
+
+@dataclass
+class SimilarItem:
+    """An existing note or todo similar to a new one."""
+
+    id: UUID
+    title: str | None
+    content: str
+    score: float
+
+
+async def _most_similar(
+    session: AsyncSession, query, params: dict
+) -> SimilarItem | None:
+    result = await session.execute(query, params)
+    row = result.mappings().first()
+    if row is None or row["score"] < DUPLICATE_SIMILARITY_THRESHOLD:
+        return None
+    return SimilarItem(**row)
+
+
+async def find_similar_note(
+    session: AsyncSession, project_id: UUID, title: str, content: str
+) -> SimilarItem | None:
+    """Return the project's note most similar to a new note by title or content."""
+    return await _most_similar(
+        session,
+        _SIMILAR_NOTE_QUERY,
+        {"project_id": project_id, "title": title, "content": content},
+    )
+
+
+async def find_similar_todo(
+    session: AsyncSession, project_id: UUID, content: str
+) -> SimilarItem | None:
+    """Return the project's open todo most similar to a new todo.
+
+    Done todos are not duplicates: adding a finished task again means it
+    has to be done again.
+    """
+    return await _most_similar(
+        session, _SIMILAR_TODO_QUERY, {"project_id": project_id, "content": content}
+    )
+
+
+async def migrate_search_columns(conn: AsyncConnection) -> None:
+    """Add the generated search columns and the GIN indexes if missing."""
+    for statement in SEARCH_DDL:
+        await conn.execute(text(statement))
+
+
+async def full_text_search(
+    session: AsyncSession, project_id: UUID, query: str, limit: int = 10
+) -> list[SearchHit]:
+    """Return the project's best-matching notes, todos and messages, best first."""
+    result = await session.execute(
+        _SEARCH_QUERY, {"project_id": project_id, "query": query, "limit": limit}
+    )
+    return [SearchHit(**row) for row in result.mappings()]
@@ -0,0 +1,318 @@
+"""Synthetic lab projects at production scale, for query plans and benchmarks.
+
+Generates projects with conversation sessions and messages, notes with edit
+histories and todos, as fixture records in the format ``bulk.py`` loads.
+Every table is generated lazily and independently: IDs and timestamps are
+derived from the record's position and the dataset seed, so children can
+reference their parents without keeping them in memory, and millions of
+messages stream straight into COPY.
+"""
+
+import random
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import cached_property
+from uuid import UUID, uuid5
+
+_COMPOUNDS = (
+    "ethanol",
+    "acetone",
+    "isopropanol",
+    "PMMA",
+    "toluene",
+    "sodium chloride",
+    "hydrochloric acid",
+    "sulfuric acid",
+    "hydrogen peroxide",
+    "potassium permanganate",
+    "dimethyl sulfoxide",
+    "acetonitrile",
+    "methanol",
+    "tetrahydrofuran",
+    "caffeine",
+    "aspirin",
+    "glucose",
+    "EDTA",
+    "Tris buffer",
+    "agarose",
+)
+_INSTRUMENTS = (
+    "SEM",
+    "e-beam writer",
+    "spin coater",
+    "plasma asher",
+    "balance",
+    "pH meter",
+    "centrifuge",
+    "rotary evaporator",
+    "UV-Vis spectrometer",
+    "fume hood",
+    "glovebox",
+    "PCR machine",
+)
+_TOPICS = (
+    "bowtie antennas",
+    "gold nanorods",
+    "resist calibration",
+    "buffer preparation",
+    "cell culture",
+    "thin film deposition",
+    "titration series",
+    "enzyme kinetics",
+    "crystal growth",
+    "waveguide loss",
+)
+_USER_MESSAGES = (
+    "What dose did I use for the {topic} last time?",
+    "Look up {compound} for me.",
+    "What's the molecular weight of {compound}?",
+    "Remember that the {instrument} needs recalibrating.",
+    "Note that the {topic} run took {minutes} minutes at {temp} degrees.",
+    "Add a todo to order more {compound}.",
+    "Mark the {instrument} booking as done.",
+    "What are my open todos?",
+    "How many hydrogen bond donors does {compound} have?",
+    "The {topic} sample looked underexposed at {dose} microcoulombs.",
+)
+_ASSISTANT_MESSAGES = (
+    "Got it, noted.",
+    "Added to your todos.",
+    "{compound} has a molecular weight of about {weight} grams per mole.",
+    "Last time you used {dose} microcoulombs per square centimeter for the {topic}.",
+    "Done, the {instrument} item is checked off.",
+    "You have {count} open todos; the most urgent is booking the {instrument}.",
+    "I couldn't find that in your notes. Want me to add it?",
+)
+_NOTE_TITLES = (
+    "{topic} - run {run}",
+    "{instrument} settings",
+    "{compound} handling",
+    "{topic} observations",
+)
+_NOTE_LINES = (
+    "- Dose {dose} uC/cm2 gave clean features",
+    "- {compound} solution at {concentration} mM",
+    "- {instrument} at {temp} C for {minutes} min",
+    "- Yield {percent}% after purification",
+    "- Repeat with fresh {compound} next time",
+    "- Sample {run} looked underexposed at the edges",
+)
+_TODOS = (
+    "Order more {compound}",
+    "Book the {instrument} for {topic}",
+    "Recalibrate the {instrument}",
+    "Repeat {topic} run {run}",
+    "Write up {topic} results",
+    "Dispose of old {compound} waste",
+)
+
+
+# Record kinds, numbered in generated IDs
+_KINDS = (
+    "project",
+    "session",
+    "message",
+    "note",
+    "note_revision",
+    "todo",
+    "todo_revision",
+)
+
+_PLACEHOLDERS = {
+    "compound": lambda rng: rng.choice(_COMPOUNDS),
+    "instrument": lambda rng: rng.choice(_INSTRUMENTS),
+    "topic": lambda rng: rng.choice(_TOPICS),
+    "minutes": lambda rng: rng.randint(5, 120),
+    "temp": lambda rng: rng.choice((4, 20, 37, 60, 80, 180)),
+    "dose": lambda rng: rng.randrange(200, 600, 10),
+    "weight": lambda rng: rng.randint(30, 500),
+    "count": lambda rng: rng.randint(1, 12),
+    "run": lambda rng: rng.randint(1, 40),
+    "concentration": lambda rng: rng.choice((1, 5, 10, 50, 100)),
+    "percent": lambda rng: rng.randint(20, 98),
+}
+
+
+class _Placeholders(dict):
+    """Draws a value only for the placeholders a template uses."""
+
+    def __init__(self, rng: random.Random) -> None:
+        super().__init__()
+        self.rng = rng
+
+    def __missing__(self, key: str):
+        return _PLACEHOLDERS[key](self.rng)
+
+
+def _fill(template: str, rng: random.Random) -> str:
+    return template.format_map(_Placeholders(rng))
+
+
+@dataclass(frozen=True)
+class SyntheticDataset:
+    """Sizes of a synthetic dataset; the same seed gives the same data.
+
+    Use different seeds to load several datasets into one database.
+    """
+
+    projects: int = 10
+    sessions_per_project: int = 20
+    messages_per_session: int = 30
+    notes_per_project: int = 50
+    revisions_per_note: int = 2
+    todos_per_project: int = 100
+    days: int = 365
+    seed: int = 0
+
+    @cached_property
+    def _namespace(self) -> UUID:
+        return uuid5(UUID(int=0), f"labasi-synthetic-{self.seed}")
+
+    def _id(self, kind: str, *position: int) -> UUID:
+        # The kind and position packed into the low bits of a per-seed base
+        # are unique and much cheaper than hashing each name
+        value = _KINDS.index(kind)
+        for index in position:
+            value = (value << 32) | index
+        return UUID(int=self._namespace.int ^ value)
+
+    def _rng(self, *position: int) -> random.Random:
+        # Integer seeds are cheap; mix in the dataset seed and the position
+        seed = self.seed
+        for index in position:
+            seed = seed * 1_000_003 + index
+        return random.Random(seed)
+
+    @property
+    def _start(self) -> datetime:
+        return datetime(2026, 1, 1) - timedelta(days=self.days)
+
+    def _session_start(self, project: int, session: int) -> datetime:
+        spacing = self.days * 86400 / max(self.sessions_per_project, 1)
+        jitter = self._rng(project, session, 0).random() * spacing
+        return self._start + timedelta(seconds=session * spacing + jitter)
+
+    def _item_created(self, project: int, index: int, count: int) -> datetime:
+        spacing = self.days * 86400 / max(count, 1)
+        return self._start + timedelta(seconds=index * spacing)
+
+    @property
+    def message_count(self) -> int:
+        return self.projects * self.sessions_per_project * self.messages_per_session
+
+    def tables(self) -> dict[str, Iterator[dict]]:
+        """Record generators per table, in foreign-key order."""
+        return {
+            "projects": self.project_records(),
+            "conversation_sessions": self.session_records(),
+            "conversation_messages": self.message_records(),
+            "notes": self.note_records(),
+            "note_revisions": self.note_revision_records(),
+            "todos": self.todo_records(),
+            "todo_revisions": self.todo_revision_records(),
+        }
+
+    def project_records(self) -> Iterator[dict]:
+        for p in range(self.projects):
+            rng = self._rng(p)
+            topic = rng.choice(_TOPICS)
+            yield {
+                "id": self._id("project", p),
+                "name": f"{topic.capitalize()} {p + 1}",
+                "description": f"Synthetic project on {topic}",
+                "created_at": self._start,
+                "updated_at": self._start,
+            }
+
+    def session_records(self) -> Iterator[dict]:
+        for p in range(self.projects):
+            for s in range(self.sessions_per_project):
+                started = self._session_start(p, s)
+                yield {
+                    "id": self._id("session", p, s),
+                    "project_id": self._id("project", p),
+                    "agent_id": "synthetic-agent",
+                    "started_at": started,
+                    "ended_at": started
+                    + timedelta(seconds=45 * self.messages_per_session),
+                }
+
+    def message_records(self) -> Iterator[dict]:
+        for p in range(self.projects):
+            for s in range(self.sessions_per_project):
+                rng = self._rng(p, s)
+                session_id = self._id("session", p, s)
+                timestamp = self._session_start(p, s)
+                for m in range(self.messages_per_session):
+                    user = m % 2 == 0
+                    templates = _USER_MESSAGES if user else _ASSISTANT_MESSAGES
+                    timestamp += timedelta(seconds=rng.randint(5, 90))
+                    yield {
+                        "id": self._id("message", p, s, m),
+                        "session_id": session_id,
+                        "content": _fill(rng.choice(templates), rng),
+                        "source": "user" if user else "assistant",
+                        "timestamp": timestamp,
+                    }
+
+    def _note(self, rng: random.Random) -> tuple[str, str]:
+        title = _fill(rng.choice(_NOTE_TITLES), rng)
+        lines = [_fill(rng.choice(_NOTE_LINES), rng) for _ in range(rng.randint(2, 6))]
+        return title[:255], "\n".join(lines)
+
+    def note_records(self) -> Iterator[dict]:
+        for p in range(self.projects):
+            for n in range(self.notes_per_project):
+                title, content = self._note(self._rng(p, n, 1))
+                yield {
+                    "id": self._id("note", p, n),
+                    "project_id": self._id("project", p),
+                    "title": title,
+                    "content": content,
+                    "created_at": self._item_created(p, n, self.notes_per_project),
+                }
+
+    def note_revision_records(self) -> Iterator[dict]:
+        for p in range(self.projects):
+            for n in range(self.notes_per_project):
+                rng = self._rng(p, n, 2)
+                modified_at = self._item_created(p, n, self.notes_per_project)
+                for r in range(self.revisions_per_note):
+                    title, content = self._note(rng)
+                    modified_at += timedelta(hours=rng.randint(1, 72))
+                    yield {
+                        "id": self._id("note_revision", p, n, r),
+                        "item_id": self._id("note", p, n),
+                        "title": title,
+                        "content": content,
+                        "modified_at": modified_at,
+                    }
+
+    def todo_records(self) -> Iterator[dict]:
+        for p in range(self.projects):
+            for t in range(self.todos_per_project):
+                rng = self._rng(p, t, 3)
+                # Older todos are more likely to be done
+                done = rng.random() < 0.8 * (1 - t / max(self.todos_per_project, 1))
+                yield {
+                    "id": self._id("todo", p, t),
+                    "project_id": self._id("project", p),
+                    "content": _fill(rng.choice(_TODOS), rng),
+                    "status": "done" if done else "open",
+                    "created_at": self._item_created(p, t, self.todos_per_project),
+                }
+
+    def todo_revision_records(self) -> Iterator[dict]:
+        # A done todo was open before it was checked off
+        todos_per_project = max(self.todos_per_project, 1)
+        for index, todo in enumerate(self.todo_records()):
+            if todo["status"] == "done":
+                p, t = divmod(index, todos_per_project)
+                yield {
+                    "id": self._id("todo_revision", p, t),
+                    "item_id": todo["id"],
+                    "content": todo["content"],
+                    "status": "open",
+                    "modified_at": todo["created_at"] + timedelta(days=1),
+                }
@@ -0,0 +1,249 @@
+"""Single-statement writes for notes and todos.
+
+Each add is one multi-row INSERT; its IDs and timestamps are generated in
+Python, so nothing has to be read back. Each edit is one UPDATE ...
+RETURNING that also inserts the item's previous state into its revision
+table, in a CTE that locks the row first, and a batch of edits is one
+UPDATE ... FROM (VALUES ...) built the same way. Concurrent edits of the
+same item are therefore serialized and each records the state it replaced.
+"""
+
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import (
+    String,
+    Uuid,
+    case,
+    cast,
+    column,
+    func,
+    insert,
+    literal,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Note, NoteRevision, Todo, TodoRevision, TodoStatus
+
+_notes = Note.__table__
+_todos = Todo.__table__
+
+
+def _now(revision_model: type[NoteRevision] | type[TodoRevision]):
+    """The edit time, typed like the revision table's modified_at column."""
+    modified_at = revision_model.__table__.c.modified_at
+    return literal(datetime.utcnow(), modified_at.type)
+
+
+def _locked_notes(project_id: UUID, note_ids: list[UUID]):
+    """The current state of a project's notes, locked for the edit."""
+    return (
+        select(_notes.c.id, _notes.c.title, _notes.c.content)
+        .where(_notes.c.id.in_(note_ids), _notes.c.project_id == project_id)
+        .with_for_update()
+        .cte("old")
+    )
+
+
+def _note_revisions(old):
+    """Insert the locked notes' current state into note_revisions."""
+    return (
+        insert(NoteRevision.__table__)
+        .from_select(
+            ["id", "item_id", "title", "content", "modified_at"],
+            select(
+                func.gen_random_uuid(),
+                old.c.id,
+                old.c.title,
+                old.c.content,
+                _now(NoteRevision),
+            ),
+        )
+        .cte("revision")
+    )
+
+
+def _locked_todos(project_id: UUID, todo_ids: list[UUID]):
+    """The current state of a project's todos, locked for the edit."""
+    return (
+        select(_todos.c.id, _todos.c.content, _todos.c.status)
+        .where(_todos.c.id.in_(todo_ids), _todos.c.project_id == project_id)
+        .with_for_update()
+        .cte("old")
+    )
+
+
+def _todo_revisions(old):
+    """Insert the locked todos' current state into todo_revisions."""
+    return (
+        insert(TodoRevision.__table__)
+        .from_select(
+            ["id", "item_id", "content", "status", "modified_at"],
+            select(
+                func.gen_random_uuid(),
+                old.c.id,
+                old.c.content,
+                cast(old.c.status, String),
+                _now(TodoRevision),
+            ),
+        )
+        .cte("revision")
+    )
+
+
+async def insert_notes(session: AsyncSession, notes: list[Note]) -> None:
+    """Insert new notes with one statement."""
+    if notes:
+        await session.execute(
+            insert(_notes).values([note.model_dump() for note in notes])
+        )
+
+
+async def insert_todos(session: AsyncSession, todos: list[Todo]) -> None:
+    """Insert new todos with one statement."""
+    if todos:
+        await session.execute(
+            insert(_todos).values([todo.model_dump() for todo in todos])
+        )
+
+
+async def update_note(
+    session: AsyncSession,
+    project_id: UUID,
+    note_id: UUID,
+    title: str | None = None,
+    content: str | None = None,
+    append: bool = False,
+) -> RowMapping | None:
+    """Edit a project's note, keeping its previous state as a revision.
+
+    With ``append``, ``content`` is added to the note's content unless it
+    is already part of it. Returns the note's id, title and content, or
+    None if the project has no such note.
+    """
+    old = _locked_notes(project_id, [note_id])
+    revision = _note_revisions(old)
+
+    values = {"title": title} if title else {"title": _notes.c.title}
+    if content and append:
+        values["content"] = case(
+            (func.strpos(_notes.c.content, content) > 0, _notes.c.content),
+            else_=_notes.c.content + "\n" + content,
+        )
+    elif content:
+        values["content"] = content
+
+    result = await session.execute(
+        update(_notes)
+        .where(_notes.c.id == old.c.id)
+        .values(values)
+        .add_cte(revision)
+        .returning(_notes.c.id, _notes.c.title, _notes.c.content)
+    )
+    return result.mappings().first()
+
+
+async def update_todo(
+    session: AsyncSession,
+    project_id: UUID,
+    todo_id: UUID,
+    content: str | None = None,
+    status: TodoStatus | None = None,
+) -> RowMapping | None:
+    """Edit a project's todo, keeping its previous state as a revision.
+
+    Returns the todo's id, content and status, or None if the project has
+    no such todo.
+    """
+    old = _locked_todos(project_id, [todo_id])
+    revision = _todo_revisions(old)
+
+    values = {"content": content} if content else {"content": _todos.c.content}
+    if status:
+        values["status"] = status
+
+    result = await session.execute(
+        update(_todos)
+        .where(_todos.c.id == old.c.id)
+        .values(values)
+        .add_cte(revision)
+        .returning(_todos.c.id, _todos.c.content, _todos.c.status)
+    )
+    return result.mappings().first()
+
+
+async def update_notes(
+    session: AsyncSession,
+    project_id: UUID,
+    edits: list[tuple[UUID, str | None, str | None]],
+) -> dict[UUID, RowMapping]:
+    """Edit several of a project's notes with one statement, keeping revisions.
+
+    ``edits`` holds distinct (note_id, title, content); a missing title or
+    content is left as it is. Returns the edited notes' id, title and
+    content by id, without the IDs the project has no note for.
+    """
+    if not edits:
+        return {}
+    new = values(
+        column("id", Uuid),
+        column("title", String),
+        column("content", String),
+        name="new",
+    ).data(
+        [(note_id, title or None, content or None) for note_id, title, content in edits]
+    )
+    old = _locked_notes(project_id, [note_id for note_id, _, _ in edits])
+
+    result = await session.execute(
+        update(_notes)
+        .where(_notes.c.id == old.c.id, _notes.c.id == new.c.id)
+        .values(
+            title=func.coalesce(new.c.title, _notes.c.title),
+            content=func.coalesce(new.c.content, _notes.c.content),
+        )
+        .add_cte(_note_revisions(old))
+        .returning(_notes.c.id, _notes.c.title, _notes.c.content)
+    )
+    return {row["id"]: row for row in result.mappings()}
+
+
+async def update_todos(
+    session: AsyncSession,
+    project_id: UUID,
+    edits: list[tuple[UUID, str | None, TodoStatus | None]],
+) -> dict[UUID, RowMapping]:
+    """Edit several of a project's todos with one statement, keeping revisions.
+
+    ``edits`` holds distinct (todo_id, content, status); a missing content
+    or status is left as it is. Returns the edited todos' id, content and
+    status by id, without the IDs the project has no todo for.
+    """
+    if not edits:
+        return {}
+    new = values(
+        column("id", Uuid),
+        column("content", String),
+        column("status", _todos.c.status.type),
+        name="new",
+    ).data([(todo_id, content or None, status) for todo_id, content, status in edits])
+    old = _locked_todos(project_id, [todo_id for todo_id, _, _ in edits])
+
+    result = await session.execute(
+        update(_todos)
+        .where(_todos.c.id == old.c.id, _todos.c.id == new.c.id)
+        .values(
+            content=func.coalesce(new.c.content, _todos.c.content),
+            # An all-NULL VALUES column is text, so cast it back to the enum
+            status=func.coalesce(
+                cast(new.c.status, _todos.c.status.type), _todos.c.status
+            ),
+        )
+        .add_cte(_todo_revisions(old))
+        .returning(_todos.c.id, _todos.c.content, _todos.c.status)
+    )
+    return {row["id"]: row for row in result.mappings()}
@@ -0,0 +1,224 @@
+"""Bulk-load the offline compound index from PubChem dumps or a reagent list.
+
+Input files are streamed line by line (gzip is detected from the ``.gz``
+suffix) and written in batches, so full PubChem dumps can be loaded without
+holding them in memory. Files can be loaded in any order and re-imported;
+later files fill in missing columns without erasing existing ones.
+
+Supported inputs (from https://ftp.ncbi.nlm.nih.gov/pubchem/Compound/Extras/):
+  --synonyms   CID-Synonym-filtered   "<cid>\\t<synonym>" per line
+  --titles     CID-Title              "<cid>\\t<title>" per line
+  --inchikeys  CID-InChI-Key          "<cid>\\t<inchi>\\t<inchikey>" per line
+  --properties CSV with a header of PubChem property names (CID, Title,
+               IUPACName, MolecularFormula, MolecularWeight, InChIKey) and an
+               optional Synonyms column separated by "|" or ";". This is the
+               format of PubChem's CSV downloads and of a curated reagent list.
+
+Usage:
+  uv run python import_compounds.py --titles CID-Title.gz --synonyms CID-Synonym-filtered.gz
+  uv run python import_compounds.py --properties lab_reagents.csv
+"""
+
+import argparse
+import asyncio
+import csv
+import gzip
+import io
+import time
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+
+from db import CompoundIndexEntry, CompoundSynonym, get_session, init_db
+from pubchem import normalize_term
+
+BATCH_SIZE = 5000
+MAX_NAME_LENGTH = 255
+
+PROPERTY_COLUMNS = {
+    "Title": "title",
+    "IUPACName": "iupac_name",
+    "MolecularFormula": "molecular_formula",
+    "MolecularWeight": "molecular_weight",
+    "InChIKey": "inchi_key",
+}
+
+
+def _open_text(path: Path) -> io.TextIOBase:
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return path.open(encoding="utf-8", errors="replace")
+
+
+def _tab_rows(path: Path) -> Iterator[list[str]]:
+    with _open_text(path) as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) >= 2 and fields[0].isdigit():
+                yield fields
+
+
+def _batched(rows: Iterable[dict], size: int = BATCH_SIZE) -> Iterator[list[dict]]:
+    batch: list[dict] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _synonym_row(cid: int, name: str) -> dict | None:
+    name = " ".join(name.split())
+    if not name or len(name) > MAX_NAME_LENGTH:
+        return None
+    return {"name": normalize_term(name), "cid": cid, "display_name": name}
+
+
+async def _upsert_compounds(rows: Iterable[dict]) -> int:
+    """Insert compounds, filling in only the columns present in each batch."""
+    table = CompoundIndexEntry.__table__
+    count = 0
+    for batch in _batched(rows):
+        # A batch may have duplicate CIDs, which ON CONFLICT cannot handle
+        merged: dict[int, dict] = {}
+        for row in batch:
+            merged.setdefault(row["cid"], {}).update(row)
+        columns = sorted({key for row in merged.values() for key in row} - {"cid"})
+        values = [
+            {"cid": cid, **{c: row.get(c) for c in columns}}
+            for cid, row in merged.items()
+        ]
+        statement = insert(table).values(values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.cid],
+            set_={c: func.coalesce(statement.excluded[c], table.c[c]) for c in columns},
+        )
+        async with get_session() as session:
+            await session.execute(statement)
+        count += len(values)
+        print(f"  {count} compounds", end="\r", flush=True)
+    print()
+    return count
+
+
+async def _insert_synonyms(rows: Iterable[dict]) -> int:
+    table = CompoundSynonym.__table__
+    count = 0
+    for batch in _batched(rows):
+        unique = list({(r["name"], r["cid"]): r for r in batch}.values())
+        statement = insert(table).values(unique).on_conflict_do_nothing()
+        async with get_session() as session:
+            await session.execute(statement)
+        count += len(unique)
+        print(f"  {count} synonyms", end="\r", flush=True)
+    print()
+    return count
+
+
+def _synonyms(path: Path, max_per_cid: int) -> Iterator[dict]:
+    """Stream synonyms, keeping the first ``max_per_cid`` per CID (most common first)."""
+    current_cid, seen = None, 0
+    for cid_field, name, *_ in _tab_rows(path):
+        cid = int(cid_field)
+        if cid != current_cid:
+            current_cid, seen = cid, 0
+        if seen >= max_per_cid:
+            continue
+        row = _synonym_row(cid, name)
+        if row:
+            seen += 1
+            yield row
+
+
+def _titles(path: Path) -> Iterator[dict]:
+    for cid_field, title, *_ in _tab_rows(path):
+        yield {"cid": int(cid_field), "title": title}
+
+
+def _inchikeys(path: Path) -> Iterator[dict]:
+    for fields in _tab_rows(path):
+        if len(fields) >= 3:
+            yield {"cid": int(fields[0]), "inchi_key": fields[2].strip().upper()}
+
+
+def _property_rows(path: Path) -> Iterator[tuple[dict, list[str]]]:
+    with _open_text(path) as f:
+        for record in csv.DictReader(f):
+            cid_field = (record.get("CID") or "").strip()
+            if not cid_field.isdigit():
+                continue
+            row: dict = {"cid": int(cid_field)}
+            for source, column in PROPERTY_COLUMNS.items():
+                value = (record.get(source) or "").strip()
+                if value:
+                    row[column] = value
+            if "molecular_weight" in row:
+                try:
+                    row["molecular_weight"] = float(row["molecular_weight"])
+                except ValueError:
+                    del row["molecular_weight"]
+            synonyms = (record.get("Synonyms") or "").replace(";", "|").split("|")
+            yield row, [s for s in synonyms if s.strip()]
+
+
+async def import_index(args: argparse.Namespace) -> None:
+    await init_db(seed=False)
+    started = time.perf_counter()
+
+    if args.properties:
+        print(f"Importing properties from {args.properties}...")
+        await _upsert_compounds(row for row, _ in _property_rows(args.properties))
+        print(f"Importing names from {args.properties}...")
+        await _insert_synonyms(
+            synonym
+            for row, synonyms in _property_rows(args.properties)
+            for name in [row.get("title", ""), *synonyms]
+            if (synonym := _synonym_row(row["cid"], name))
+        )
+
+    if args.titles:
+        print(f"Importing titles from {args.titles}...")
+        await _upsert_compounds(_titles(args.titles))
+        await _insert_synonyms(
+            synonym
+            for row in _titles(args.titles)
+            if (synonym := _synonym_row(row["cid"], row["title"]))
+        )
+
+    if args.inchikeys:
+        print(f"Importing InChIKeys from {args.inchikeys}...")
+        await _upsert_compounds(_inchikeys(args.inchikeys))
+
+    if args.synonyms:
+        print(f"Importing synonyms from {args.synonyms}...")
+        await _insert_synonyms(_synonyms(args.synonyms, args.max_synonyms))
+
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Bulk-load the offline compound index used by search_compound."
+    )
+    parser.add_argument("--properties", type=Path, help="CSV of PubChem properties")
+    parser.add_argument("--titles", type=Path, help="CID-Title dump")
+    parser.add_argument("--inchikeys", type=Path, help="CID-InChI-Key dump")
+    parser.add_argument("--synonyms", type=Path, help="CID-Synonym-filtered dump")
+    parser.add_argument(
+        "--max-synonyms",
+        type=int,
+        default=20,
+        help="Synonyms to keep per CID from the synonym dump (default: 20)",
+    )
+    args = parser.parse_args()
+    if not any([args.properties, args.titles, args.inchikeys, args.synonyms]):
+        parser.error("Provide at least one input file.")
+    asyncio.run(import_index(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,99 @@
+import asyncio
+import os
+import time
+from collections.abc import Callable
 from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Annotated, Literal
 from urllib.parse import quote
 from uuid import UUID
 
-import httpx
 from fastmcp import FastMCP
 from fastmcp.server.dependencies import get_http_headers
 from pydantic import BaseModel, Field
+from sqlalchemy import func, tuple_
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
-
-from db import Note, Todo, TodoStatus, get_session, init_db
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+
+from db import (
+    Note,
+    Todo,
+    TodoStatus,
+    check_schema,
+    find_similar_note,
+    find_similar_todo,
+    full_text_search,
+    get_pool_stats,
+    get_project_overview,
+    get_session,
+    insert_notes,
+    insert_todos,
+    update_note,
+    update_notes,
+    update_todo,
+    update_todos,
+)
+from pubchem import (
+    AUTOCOMPLETE,
+    CAS_IDENTIFIER,
+    CID_IDENTIFIER,
+    IDENTIFIER,
+    INCHIKEY_IDENTIFIER,
+    PROPERTY_NAMES,
+    TERM,
+    LRUCache,
+    Priority,
+    close_client,
+    compound_cache,
+    compound_property_store,
+    has_full_properties,
+    local_compound_index,
+    may_be_name,
+    normalize_term,
+    open_client,
+    parse_identifier,
+    pubchem_scheduler,
+    pubchem_singleflight,
+    variation_stats,
+)
+from telemetry import (
+    ToolMetricsMiddleware,
+    TracingMiddleware,
+    metrics_registry,
+    pubchem_lookup_errors,
+    span,
+    traced,
+    traced_handler,
+    tracer,
+)
 
 
 @asynccontextmanager
 async def lifespan(app):
-    """Initialize the database on server startup."""
-    await init_db()
-    yield
+    """Check the database schema and open the shared PubChem client for the server's lifetime."""
+    await check_schema()
+    compound_cache.start()
+    await variation_stats.load()
+    await open_client()
+    pubchem_scheduler.start()
+    try:
+        yield
+    finally:
+        await pubchem_scheduler.stop()
+        await compound_cache.stop()
+        await close_client()
+        await variation_stats.flush()
 
 
-mcp = FastMCP("Labasi Server", lifespan=lifespan)
+mcp = FastMCP(
+    "Labasi Server",
+    lifespan=lifespan,
+    # Tracing outermost, so a traced call's time includes the other middleware
+    middleware=[TracingMiddleware(), ToolMetricsMiddleware()],
+)
 
 
 # =============================================================================
@@ -43,13 +116,39 @@ def get_project_id() -> str | None:
     return headers.get(PROJECT_ID_HEADER)
 
 
-PUBCHEM_BASE_URL = "https://pubchem.ncbi.nlm.nih.gov/rest/pug"
+def require_project_id() -> UUID:
+    """Get the project ID from the HTTP request headers, or raise ValueError."""
+    project_id_str = get_project_id()
+    if not project_id_str:
+        raise ValueError(
+            "Project ID not found in request headers. Ensure X-Project-ID header is set."
+        )
 
+    try:
+        return UUID(project_id_str)
+    except ValueError:
+        raise ValueError(f"Invalid project ID format: {project_id_str}") from None
 
-class CompoundMatch(BaseModel):
-    """A single compound match with its properties and the search term that found it."""
 
-    search_term: str = Field(description="The search term that found this compound.")
+# PubChem endpoints; overridable to point at a mirror or the benchmark's fake
+PUBCHEM_BASE_URL = os.getenv(
+    "PUBCHEM_BASE_URL", "https://pubchem.ncbi.nlm.nih.gov/rest/pug"
+)
+PUBCHEM_AUTOCOMPLETE_URL = os.getenv(
+    "PUBCHEM_AUTOCOMPLETE_URL", "https://pubchem.ncbi.nlm.nih.gov/rest/autocomplete"
+)
+PUBCHEM_PROPERTIES = ",".join(PROPERTY_NAMES)
+# Default time budget for search_compound in seconds (unset: wait for all lookups)
+SEARCH_DEADLINE_SECONDS = (
+    float(os.environ["PUBCHEM_SEARCH_DEADLINE"])
+    if os.getenv("PUBCHEM_SEARCH_DEADLINE")
+    else None
+)
+
+
+class CompoundInfo(BaseModel):
+    """A compound's PubChem properties."""
+
     cid: int = Field(description="The PubChem Compound ID.")
     title: str | None = Field(default=None, description="Common name of the compound.")
     iupac_name: str | None = Field(default=None, description="IUPAC systematic name.")
@@ -59,7 +158,74 @@ class CompoundMatch(BaseModel):
     molecular_weight: float | None = Field(
         default=None, description="Molecular weight in g/mol."
     )
+    exact_mass: float | None = Field(
+        default=None, description="Monoisotopic exact mass in Da."
+    )
+    smiles: str | None = Field(default=None, description="SMILES string.")
     inchi_key: str | None = Field(default=None, description="InChIKey identifier.")
+    xlogp: float | None = Field(
+        default=None, description="Computed octanol-water partition coefficient."
+    )
+    tpsa: float | None = Field(
+        default=None, description="Topological polar surface area in square angstroms."
+    )
+    h_bond_donor_count: int | None = Field(
+        default=None, description="Number of hydrogen bond donors."
+    )
+    h_bond_acceptor_count: int | None = Field(
+        default=None, description="Number of hydrogen bond acceptors."
+    )
+    rotatable_bond_count: int | None = Field(
+        default=None, description="Number of rotatable bonds."
+    )
+    heavy_atom_count: int | None = Field(
+        default=None, description="Number of non-hydrogen atoms."
+    )
+    charge: int | None = Field(default=None, description="Formal charge.")
+    complexity: float | None = Field(
+        default=None, description="PubChem molecular complexity score."
+    )
+
+    @classmethod
+    def from_properties(cls, cid: int, props: dict, **extra) -> "CompoundInfo":
+        """Build from a PubChem property table record (missing keys become None)."""
+        return cls(
+            cid=cid,
+            title=props.get("Title"),
+            iupac_name=props.get("IUPACName"),
+            molecular_formula=props.get("MolecularFormula"),
+            molecular_weight=props.get("MolecularWeight"),
+            exact_mass=props.get("ExactMass"),
+            smiles=props.get("SMILES"),
+            inchi_key=props.get("InChIKey"),
+            xlogp=props.get("XLogP"),
+            tpsa=props.get("TPSA"),
+            h_bond_donor_count=props.get("HBondDonorCount"),
+            h_bond_acceptor_count=props.get("HBondAcceptorCount"),
+            rotatable_bond_count=props.get("RotatableBondCount"),
+            heavy_atom_count=props.get("HeavyAtomCount"),
+            charge=props.get("Charge"),
+            complexity=props.get("Complexity"),
+            **extra,
+        )
+
+
+class CompoundMatch(CompoundInfo):
+    """A single compound match with its properties and the search term that found it."""
+
+    search_term: str = Field(description="The search term that found this compound.")
+
+
+class CompoundPropertiesResult(BaseModel):
+    """Properties of compounds requested by CID."""
+
+    compounds: list[CompoundInfo] = Field(
+        description="The compounds that were found, in the order requested."
+    )
+    not_found: list[int] = Field(
+        default_factory=list,
+        description="CIDs whose properties could not be retrieved.",
+    )
 
 
 class CompoundLookupResult(BaseModel):
@@ -76,44 +242,50 @@ class CompoundLookupResult(BaseModel):
     recommendation: str = Field(
         description="A note about which match is likely the intended compound, if determinable."
     )
+    partial: bool = Field(
+        default=False,
+        description="True if the time budget ran out before all lookups finished, "
+        "so matches may be incomplete or missing properties.",
+    )
 
 
-def _generate_search_variations(query: str) -> list[str]:
+def _generate_search_variations(query: str) -> list[tuple[str, str]]:
     """Generate multiple search term variations for a compound query.
 
     Creates variations by:
     - Case changes (lower, title, upper)
-    - Removing/adding common suffixes (dye, reagent, solution, etc.)
     - Hyphenation variants (spaces <-> hyphens)
     - Individual word extraction for multi-word queries
     - Stereochemistry prefix removal (D-, L-, etc.)
-    - Common chemical synonyms
+
+    Returns (term, kind) pairs, where kind names the rule that produced the
+    term so its hit rate can be tracked.
     """
     variations = []
     seen = set()
 
-    def add_variation(v: str) -> None:
+    def add_variation(v: str, kind: str) -> None:
         v = v.strip()
         if v and v.lower() not in seen:
-            variations.append(v)
+            variations.append((v, kind))
             seen.add(v.lower())
 
     # Original query
-    add_variation(query)
+    add_variation(query, "original")
 
     # Case variations
-    add_variation(query.lower())
-    add_variation(query.upper())
-    add_variation(query.title())
+    add_variation(query.lower(), "lower")
+    add_variation(query.upper(), "upper")
+    add_variation(query.title(), "title")
 
     # Hyphenation variants: "CY5 dye" <-> "CY5-dye"
     lower_query = query.lower()
     if " " in query:
-        add_variation(query.replace(" ", "-"))
-        add_variation(query.replace(" ", ""))
+        add_variation(query.replace(" ", "-"), "hyphenated")
+        add_variation(query.replace(" ", ""), "joined")
     if "-" in query:
-        add_variation(query.replace("-", " "))
-        add_variation(query.replace("-", ""))
+        add_variation(query.replace("-", " "), "unhyphenated")
+        add_variation(query.replace("-", ""), "joined")
 
     # Extract individual words for multi-word queries
     words = query.replace("-", " ").split()
@@ -121,46 +293,71 @@ def _generate_search_variations(query: str) -> list[str]:
         # Add each significant word (skip very short ones)
         for word in words:
             if len(word) >= 2:
-                add_variation(word)
-                add_variation(word.upper())
-                add_variation(word.title())
+                add_variation(word, "word")
+                add_variation(word.upper(), "word_upper")
+                add_variation(word.title(), "word_title")
 
     # Stereochemistry prefix removal
     for prefix in ["dl-", "d-", "l-", "(+)-", "(-)-", "(±)-", "r-", "s-"]:
         if lower_query.startswith(prefix):
             without_prefix = query[len(prefix) :]
-            add_variation(without_prefix)
+            add_variation(without_prefix, "no_stereo_prefix")
 
     return variations
 
 
-async def _get_autocomplete_suggestions(
-    client: httpx.AsyncClient, term: str
-) -> list[str]:
-    """Use PubChem's autocomplete API to get fuzzy-matched compound name suggestions."""
-    url = f"https://pubchem.ncbi.nlm.nih.gov/rest/autocomplete/compound/{quote(term, safe='')}/json?limit=5"
+@pubchem_singleflight.coalesce(lambda term: normalize_term(term))
+@traced("autocomplete", lambda term: {"term": term})
+async def _get_autocomplete_suggestions(term: str) -> list[str] | None:
+    """Use PubChem's autocomplete API to get fuzzy-matched compound name suggestions.
+
+    Returns None if PubChem could not be reached, so the failure is not cached.
+    """
+    url = f"{PUBCHEM_AUTOCOMPLETE_URL}/compound/{quote(term, safe='')}/json?limit=5"
 
     try:
-        response = await client.get(url, timeout=10.0)
+        response = await pubchem_scheduler.get(
+            url, priority=Priority.AUTOCOMPLETE, endpoint="autocomplete", timeout=10.0
+        )
         if response.status_code != 200:
-            return []
+            return None
         data = response.json()
 
         # Autocomplete returns {"dictionary_terms": {"compound": ["name1", "name2", ...]}}
         dictionary_terms = data.get("dictionary_terms", {})
         suggestions = dictionary_terms.get("compound", [])
         return suggestions if isinstance(suggestions, list) else []
-    except Exception:
-        return []
+    except Exception as exc:
+        pubchem_lookup_errors.inc(endpoint="autocomplete", error=type(exc).__name__)
+        return None
+
+
+def _parse_property_table(data: dict) -> list[dict]:
+    """Extract the property records (each with a CID) from a PubChem response."""
+    property_table = data.get("PropertyTable", {})
+    records = property_table.get("Properties", [])
+    return [r for r in records if isinstance(r, dict) and "CID" in r]
 
 
-async def _search_single_term(client: httpx.AsyncClient, term: str) -> list[int]:
-    """Search PubChem for a single term and return CIDs."""
-    path = f"/compound/name/{quote(term, safe='')}/cids/JSON"
+@pubchem_singleflight.coalesce(lambda term, priority=None: normalize_term(term))
+@traced("name_lookup", lambda term, priority=None: {"term": term})
+async def _search_single_term(
+    term: str, priority: Priority = Priority.VARIATION
+) -> list[dict] | None:
+    """Search PubChem for a single term and return the matching compounds' properties.
+
+    Resolving the name straight to properties returns the CIDs and their
+    properties in one request, so found compounds need no separate property
+    round trip. Returns an empty list if the name is unknown and None if the
+    request failed.
+    """
+    path = f"/compound/name/{quote(term, safe='')}/property/{PUBCHEM_PROPERTIES}/JSON"
     url = f"{PUBCHEM_BASE_URL}{path}"
 
     try:
-        response = await client.get(url, timeout=15.0)
+        response = await pubchem_scheduler.get(
+            url, priority=priority, endpoint="name_property", timeout=15.0
+        )
         if response.status_code == 404:
             return []
         response.raise_for_status()
@@ -169,27 +366,34 @@ async def _search_single_term(client: httpx.AsyncClient, term: str) -> list[int]
         if "Fault" in data:
             return []
 
-        identifier_list = data.get("IdentifierList", {})
-        cids = identifier_list.get("CID", [])
-        return cids if isinstance(cids, list) else []
-    except Exception:
-        return []
+        return _parse_property_table(data)
+    except Exception as exc:
+        pubchem_lookup_errors.inc(endpoint="name_property", error=type(exc).__name__)
+        return None
+
 
+@pubchem_singleflight.coalesce(lambda cids: frozenset(cids))
+@traced("cid_properties", lambda cids: {"cids": len(cids)})
+async def _fetch_properties_for_cids(cids: list[int]) -> dict[int, dict] | None:
+    """Fetch properties for a list of CIDs in a single POST request.
 
-async def _fetch_properties_for_cids(
-    client: httpx.AsyncClient, cids: list[int]
-) -> dict[int, dict]:
-    """Fetch properties for a list of CIDs."""
+    Returns the records by CID, which leaves out unknown CIDs, and None if
+    the request failed.
+    """
     if not cids:
         return {}
 
-    cids_string = ",".join(str(cid) for cid in cids[:10])  # Limit to 10 CIDs
-    properties = "Title,IUPACName,MolecularFormula,MolecularWeight,InChIKey"
-    path = f"/compound/cid/{cids_string}/property/{properties}/JSON"
+    path = f"/compound/cid/property/{PUBCHEM_PROPERTIES}/JSON"
     url = f"{PUBCHEM_BASE_URL}{path}"
 
     try:
-        response = await client.get(url, timeout=15.0)
+        response = await pubchem_scheduler.post(
+            url,
+            data={"cid": ",".join(str(cid) for cid in cids)},
+            priority=Priority.PROPERTIES,
+            endpoint="cid_property",
+            timeout=15.0,
+        )
         if response.status_code == 404:
             return {}
         response.raise_for_status()
@@ -198,15 +402,255 @@ async def _fetch_properties_for_cids(
         if "Fault" in data:
             return {}
 
-        property_table = data.get("PropertyTable", {})
-        compound_properties = property_table.get("Properties", [])
+        return {props["CID"]: props for props in _parse_property_table(data)}
+    except Exception as exc:
+        pubchem_lookup_errors.inc(endpoint="cid_property", error=type(exc).__name__)
+        return None
 
-        return {props["CID"]: props for props in compound_properties}
-    except Exception:
-        return {}
+
+@pubchem_singleflight.coalesce(lambda kind, value: (kind, value))
+@traced("identifier_lookup", lambda kind, value: {kind: value})
+async def _resolve_identifier(kind: str, value: str) -> list[dict] | None:
+    """Resolve a structured identifier to its compounds' properties in one request.
+
+    CIDs are read from the property store (fetched if missing) and InChIKeys
+    are checked against the offline index first. Returns an empty list if
+    the identifier is unknown and None if the request failed.
+    """
+    if kind == CID_IDENTIFIER:
+        properties, _, failed = await _load_properties([int(value)])
+        if failed:
+            return None
+        return list(properties.values())
+    if kind == INCHIKEY_IDENTIFIER:
+        records = await local_compound_index.by_inchikey(value)
+        if records:
+            return records
+
+    # CAS numbers are registered in PubChem as compound synonyms
+    namespace = "name" if kind == CAS_IDENTIFIER else kind
+    path = f"/compound/{namespace}/property/{PUBCHEM_PROPERTIES}/JSON"
+    url = f"{PUBCHEM_BASE_URL}{path}"
+
+    try:
+        # POST, so SMILES characters like "/", "#" and "\\" need no URL escaping
+        response = await pubchem_scheduler.post(
+            url,
+            data={namespace: value},
+            priority=Priority.EXACT,
+            endpoint="identifier_property",
+            timeout=15.0,
+        )
+        if response.status_code in (400, 404):
+            return []
+        response.raise_for_status()
+        data = response.json()
+
+        if "Fault" in data:
+            return []
+
+        return _parse_property_table(data)
+    except Exception as exc:
+        pubchem_lookup_errors.inc(
+            endpoint="identifier_property", error=type(exc).__name__
+        )
+        return None
+
+
+async def _wait_until(
+    tasks: list[asyncio.Task],
+    deadline: float | None,
+    done_when: Callable[[], bool] | None = None,
+) -> bool:
+    """Wait for tasks until all finish, ``done_when()`` holds or the deadline passes.
+
+    Unfinished tasks are cancelled. Returns True if the deadline passed first.
+    """
+    loop = asyncio.get_running_loop()
+    pending = {task for task in tasks if not task.done()}
+    timed_out = False
+    while pending and not (done_when and done_when()):
+        timeout = None if deadline is None else deadline - loop.time()
+        if timeout is not None and timeout <= 0:
+            timed_out = True
+            break
+        _, pending = await asyncio.wait(
+            pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+        )
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    return timed_out
+
+
+def _task_result(task: asyncio.Task):
+    """The task's result, or None if it was cancelled."""
+    return None if task.cancelled() else task.result()
+
+
+async def _load_properties(
+    cids: list[int], deadline: float | None = None, fetch: bool = True
+) -> tuple[dict[int, dict], bool, bool]:
+    """Return full property records from the property store, fetching the rest.
+
+    Missing records are fetched from PubChem in one batch (unless ``fetch``
+    is false) and kept in the store. Returns the records, whether the
+    deadline cut the fetch short and whether the fetch failed, so a CID left
+    out may be unknown to PubChem only when neither is true.
+    """
+    properties = await compound_property_store.get_many(cids)
+    missing = [cid for cid in cids if cid not in properties]
+    if not missing or not fetch:
+        return properties, False, False
+
+    task = asyncio.ensure_future(_fetch_properties_for_cids(missing))
+    timed_out = await _wait_until([task], deadline)
+    fetched_properties = _task_result(task)
+    if fetched_properties is None:
+        return properties, timed_out, not timed_out
+    await compound_property_store.put_many(fetched_properties)
+    properties.update(fetched_properties)
+    return properties, timed_out, False
+
+
+async def _build_lookup_result(
+    query: str,
+    search_terms: list[str],
+    cid_to_terms: dict[int, list[str]],
+    properties: dict[int, dict],
+    recommendation: str | None = None,
+    deadline: float | None = None,
+    partial: bool = False,
+    fetch: bool = True,
+) -> CompoundLookupResult:
+    """Fill in missing properties and build the lookup result for the found CIDs.
+
+    Full records in ``properties`` are used as they are. The rest come from
+    the property store, or are fetched from PubChem in one batch (limit to
+    15 CIDs), within the deadline if there is one. Partial records, such as
+    those from the offline compound index, are only used for compounds
+    whose full record could not be retrieved.
+    """
+    all_cids = list(cid_to_terms)[:15]
+    known = properties
+    properties = {
+        cid: props for cid, props in known.items() if has_full_properties(props)
+    }
+    loaded, timed_out, _ = await _load_properties(
+        [cid for cid in all_cids if cid not in properties], deadline, fetch
+    )
+    properties.update(loaded)
+    partial = timed_out or partial
+
+    for cid in all_cids:
+        if cid not in properties and len(known.get(cid, {})) > 1:
+            properties[cid] = known[cid]
+    properties.update(
+        await local_compound_index.by_cids(
+            [cid for cid in all_cids if cid not in properties]
+        )
+    )
+
+    # Build matches, using the first search term that found each CID
+    matches = [
+        CompoundMatch.from_properties(
+            cid, properties.get(cid, {}), search_term=cid_to_terms[cid][0]
+        )
+        for cid in all_cids
+    ]
+
+    # Generate recommendation
+    if recommendation is None:
+        if len(matches) == 1:
+            recommendation = f"Found exactly one match: {matches[0].title or matches[0].iupac_name} (CID: {matches[0].cid})"
+        elif len(matches) <= 3:
+            recommendation = "Found multiple matches. Choose based on molecular weight and formula that fits your context."
+        else:
+            recommendation = f"Found {len(matches)} matches. The first few are most likely relevant. Choose based on your experimental context."
+        if partial:
+            recommendation = (
+                "Partial result: the time budget ran out before every lookup "
+                f"finished. {recommendation}"
+            )
+
+    return CompoundLookupResult(
+        query=query,
+        search_terms_tried=search_terms,
+        matches=matches,
+        recommendation=recommendation,
+        partial=partial,
+    )
+
+
+def _unavailable_result(
+    query: str, search_terms: list[str], partial: bool
+) -> CompoundLookupResult:
+    """The empty result for a lookup PubChem could not answer."""
+    reason = (
+        "PubChem did not answer within the time budget"
+        if partial
+        else "PubChem is busy or unreachable"
+    )
+    return CompoundLookupResult(
+        query=query,
+        search_terms_tried=search_terms,
+        matches=[],
+        recommendation=f"{reason}, so the lookup for '{query}' could not be "
+        "completed. Try again in a moment.",
+        partial=partial,
+    )
+
+
+async def _resolve_identifiers(
+    identifiers: dict[str, tuple[str, str]], deadline: float | None
+) -> tuple[dict[int, list[str]], dict[int, dict], bool, bool]:
+    """Resolve names that are structured identifiers, skipping name search.
+
+    ``identifiers`` maps each name to its (kind, canonical value). Resolved
+    identifiers are kept in the canonical-identifier cache. Returns the CIDs
+    with the names that found them, the records fetched on the way, whether
+    the deadline passed and whether a lookup failed.
+    """
+    keys = {name: f"{kind}:{value}" for name, (kind, value) in identifiers.items()}
+    cached_cids = await compound_cache.get_many(IDENTIFIER, list(keys.values()))
+    tasks = {
+        name: asyncio.ensure_future(_resolve_identifier(*identifier))
+        for name, identifier in identifiers.items()
+        if keys[name] not in cached_cids
+    }
+    partial = await _wait_until(list(tasks.values()), deadline)
+    resolved = {name: _task_result(task) for name, task in tasks.items()}
+
+    properties: dict[int, dict] = {}
+    for records in resolved.values():
+        for record in records or []:
+            properties.setdefault(record["CID"], record)
+    await compound_property_store.put_many(properties)
+    await compound_cache.set_many(
+        IDENTIFIER,
+        {
+            keys[name]: [record["CID"] for record in records]
+            for name, records in resolved.items()
+            # CIDs need no resolving; their properties are in the property store
+            if records is not None and identifiers[name][0] != CID_IDENTIFIER
+        },
+    )
+
+    cid_to_terms: dict[int, list[str]] = {}
+    for name in identifiers:
+        if keys[name] in cached_cids:
+            cids = cached_cids[keys[name]]
+        else:
+            cids = [record["CID"] for record in resolved[name] or []]
+        for cid in cids[:3]:
+            cid_to_terms.setdefault(cid, []).append(name)
+
+    failed = any(records is None for records in resolved.values())
+    return cid_to_terms, properties, partial, failed
 
 
 @mcp.tool
+@traced_handler
 async def search_compound(
     names: Annotated[
         list[str],
@@ -218,139 +662,442 @@ async def search_compound(
             "Example: ['Cy5', 'cyanine 5', 'Cy5 dye'] or ['aspirin', 'acetylsalicylic acid']",
         ),
     ],
+    deadline_seconds: Annotated[
+        float | None,
+        Field(
+            default=None,
+            gt=0,
+            le=30,
+            description="Optional time budget in seconds, e.g. 1.5. The search stops "
+            "as soon as it has a confident match, and returns the best partial "
+            "result (partial=true) when the budget runs out.",
+        ),
+    ] = SEARCH_DEADLINE_SECONDS,
 ) -> CompoundLookupResult:
     """
     Search for chemical compounds in PubChem using multiple name variations.
 
     Provide 1-4 possible names for the compound (common name, abbreviation, chemical name, etc.).
     Each name is processed with fuzzy matching to find the best results.
+    A CID, InChIKey, SMILES string or CAS number is recognized and looked up
+    directly instead.
 
     Returns all matching compounds with their properties (name, formula, molecular weight, etc.)
     so you can pick the most relevant one based on context.
     """
-    import asyncio
+    original_query = ", ".join(names)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + deadline_seconds if deadline_seconds else None
+
+    # Step 0: Resolve CIDs, InChIKeys, SMILES and CAS numbers directly, one
+    # request each. The other names go on to name search, and so do unresolved
+    # SMILES and bare numbers, which may have been names after all; other
+    # identifiers would only miss there. Matches of both are returned together.
+    identifiers = {name: parsed for name in names if (parsed := parse_identifier(name))}
+    identifier_cids: dict[int, list[str]] = {}
+    identifier_properties: dict[int, dict] = {}
+    partial = identifier_failed = False
+    if identifiers:
+        (
+            identifier_cids,
+            identifier_properties,
+            partial,
+            identifier_failed,
+        ) = await _resolve_identifiers(identifiers, deadline)
+        resolved_names = {name for terms in identifier_cids.values() for name in terms}
+        names = [
+            name
+            for name in names
+            if name not in identifiers
+            or (may_be_name(name) and name not in resolved_names)
+        ]
+        if not names:
+            if identifier_cids:
+                return await _build_lookup_result(
+                    original_query,
+                    list(identifiers),
+                    identifier_cids,
+                    identifier_properties,
+                    deadline=deadline,
+                    partial=partial,
+                )
+            if partial or identifier_failed:
+                return _unavailable_result(original_query, list(identifiers), partial)
+            return CompoundLookupResult(
+                query=original_query,
+                search_terms_tried=list(identifiers),
+                matches=[],
+                recommendation=f"No compound found for '{original_query}'. "
+                "Check the identifier, or search by name instead.",
+            )
+    identifier_terms = [name for name in identifiers if name not in names]
+
+    # Step 0b: Answer from the offline compound index when a name matches exactly.
+    # Stored full records are used, but nothing is fetched from PubChem, so the
+    # answer does not wait on the network; get_compound_properties fetches the
+    # full property set when it is asked for.
+    local_matches = await local_compound_index.find_exact(names)
+    if local_matches:
+        cid_to_terms = {cid: list(terms) for cid, terms in identifier_cids.items()}
+        properties = dict(identifier_properties)
+        for name, records in local_matches.items():
+            for record in records:
+                cid_to_terms.setdefault(record["CID"], []).append(name)
+                properties.setdefault(record["CID"], record)
+        return await _build_lookup_result(
+            original_query,
+            identifier_terms + list(local_matches),
+            cid_to_terms,
+            properties,
+            partial=partial,
+            fetch=False,
+        )
 
-    async with httpx.AsyncClient() as client:
-        # Step 1: Generate search variations from ALL provided names
-        all_variations = []
-        seen_variations = set()
+    # Step 1: Generate search variations from ALL provided names
+    all_variations = []
+    seen_variations = set()
+    with span("generate_variations"):
         for name in names:
-            for variation in _generate_search_variations(name):
+            for variation, kind in _generate_search_variations(name):
                 if variation.lower() not in seen_variations:
-                    all_variations.append(variation)
+                    all_variations.append((variation, kind))
                     seen_variations.add(variation.lower())
 
-        # Step 2: Run autocomplete on the original names for fuzzy matching
-        autocomplete_tasks = [
-            _get_autocomplete_suggestions(client, name) for name in names
-        ]
-        autocomplete_results = await asyncio.gather(*autocomplete_tasks)
-
-        # Step 3: Combine all search terms
-        all_search_terms = []
-        seen = set()
-
-        def add_term(term: str) -> None:
-            lower = term.lower().strip()
-            if lower and lower not in seen:
-                all_search_terms.append(term.strip())
-                seen.add(lower)
-
-        # Add autocomplete suggestions first (best fuzzy matches)
-        for suggestions in autocomplete_results:
-            for suggestion in suggestions[:3]:  # Top 3 from each autocomplete
-                add_term(suggestion)
-
-        # Add all variations
-        for term in all_variations:
-            add_term(term)
-
-        # Limit to reasonable number of searches
-        search_terms = all_search_terms[:12]
-
-        # Step 4: Search all terms in parallel
-        search_tasks = [_search_single_term(client, term) for term in search_terms]
-        search_results = await asyncio.gather(*search_tasks)
-
-        # Collect all unique CIDs with the search term that found them
-        cid_to_terms: dict[int, list[str]] = {}
-        for term, cids in zip(search_terms, search_results, strict=True):
-            for cid in cids[:3]:  # Limit results per term
-                if cid not in cid_to_terms:
-                    cid_to_terms[cid] = []
-                cid_to_terms[cid].append(term)
-
-        all_cids = list(cid_to_terms.keys())
-        original_query = ", ".join(names)
-
-        if not all_cids:
-            # Collect all autocomplete suggestions for the error message
-            all_suggestions = []
-            for suggestions in autocomplete_results:
-                all_suggestions.extend(suggestions[:2])
-
-            suggestion_note = ""
-            if all_suggestions:
-                unique_suggestions = list(dict.fromkeys(all_suggestions))[:5]
-                suggestion_note = f" PubChem suggested: {', '.join(unique_suggestions)}"
-
-            return CompoundLookupResult(
-                query=original_query,
-                search_terms_tried=search_terms,
-                matches=[],
-                recommendation=f"No compounds found for '{original_query}'.{suggestion_note} "
-                "Try different names or check the spelling.",
+    # Step 2: Run autocomplete on the original names for fuzzy matching,
+    # skipping names whose suggestions are already cached
+    name_keys = [normalize_term(name) for name in names]
+    cached_suggestions = await compound_cache.get_many(AUTOCOMPLETE, name_keys)
+    uncached_names = [
+        name
+        for name, key in zip(names, name_keys, strict=True)
+        if key not in cached_suggestions
+    ]
+    autocomplete_tasks = [
+        asyncio.ensure_future(_get_autocomplete_suggestions(name))
+        for name in uncached_names
+    ]
+    # Under a deadline, keep at least half of the remaining time for name lookups
+    autocomplete_deadline = (
+        None if deadline is None else loop.time() + (deadline - loop.time()) / 2
+    )
+    partial = await _wait_until(autocomplete_tasks, autocomplete_deadline) or partial
+    fetched_suggestions = [_task_result(task) for task in autocomplete_tasks]
+    await compound_cache.set_many(
+        AUTOCOMPLETE,
+        {
+            normalize_term(name): suggestions
+            for name, suggestions in zip(
+                uncached_names, fetched_suggestions, strict=True
             )
+            if suggestions is not None
+        },
+    )
+    fetched_by_key = {
+        normalize_term(name): suggestions or []
+        for name, suggestions in zip(uncached_names, fetched_suggestions, strict=True)
+    }
+    autocomplete_results = [
+        cached_suggestions.get(key, fetched_by_key.get(key, [])) for key in name_keys
+    ]
+
+    # Step 3: Combine all search terms
+    all_search_terms = []
+    seen = set()
 
-        # Fetch properties for all found CIDs (limit to 15)
-        properties = await _fetch_properties_for_cids(client, all_cids[:15])
-
-        # Build matches
-        matches = []
-        for cid in all_cids[:15]:
-            props = properties.get(cid, {})
-            # Use the first search term that found this CID
-            search_term = cid_to_terms[cid][0]
-            matches.append(
-                CompoundMatch(
-                    search_term=search_term,
-                    cid=cid,
-                    title=props.get("Title"),
-                    iupac_name=props.get("IUPACName"),
-                    molecular_formula=props.get("MolecularFormula"),
-                    molecular_weight=props.get("MolecularWeight"),
-                    inchi_key=props.get("InChIKey"),
-                )
+    def add_term(term: str, kind: str) -> None:
+        lower = term.lower().strip()
+        if lower and lower not in seen:
+            all_search_terms.append((term.strip(), kind))
+            seen.add(lower)
+
+    # Add autocomplete suggestions first (best fuzzy matches)
+    for suggestions in autocomplete_results:
+        for suggestion in suggestions[:3]:  # Top 3 from each autocomplete
+            add_term(suggestion, "autocomplete")
+
+    # Add all variations
+    for term, kind in all_variations:
+        add_term(term, kind)
+
+    # Keep the variations likely to hit, best first, within the term budget
+    planned_terms = variation_stats.plan(all_search_terms)
+    search_terms = [term for term, _ in planned_terms]
+    term_kinds = dict(planned_terms)
+
+    # Names as given and autocomplete hits are sent ahead of speculative variations
+    exact_keys = set(name_keys)
+    for suggestions in autocomplete_results:
+        exact_keys.update(normalize_term(suggestion) for suggestion in suggestions[:3])
+
+    # Step 4: Resolve all uncached terms to CIDs and properties in parallel
+    term_keys = [normalize_term(term) for term in search_terms]
+    cached_cids = await compound_cache.get_many(TERM, term_keys)
+    uncached_terms = [
+        term
+        for term, key in zip(search_terms, term_keys, strict=True)
+        if key not in cached_cids
+    ]
+    search_tasks = [
+        asyncio.ensure_future(
+            _search_single_term(
+                term,
+                Priority.EXACT
+                if normalize_term(term) in exact_keys
+                else Priority.VARIATION,
+            )
+        )
+        for term in uncached_terms
+    ]
+
+    def confident() -> bool:
+        """An exact title hit, or a CID found by several terms."""
+        term_counts: dict[int, int] = {}
+        found = list(cached_cids.values())
+        for task in search_tasks:
+            records = task.result() if task.done() and not task.cancelled() else None
+            for record in (records or [])[:3]:
+                if normalize_term(record.get("Title", "")) in exact_keys:
+                    return True
+            found.append([record["CID"] for record in records or []])
+        for cids in found:
+            for cid in cids[:3]:
+                term_counts[cid] = term_counts.get(cid, 0) + 1
+        return any(count > 1 for count in term_counts.values())
+
+    # With a deadline, stop at the first confident match instead of waiting
+    # for the slowest term
+    partial = (
+        await _wait_until(search_tasks, deadline, confident if deadline else None)
+        or partial
+    )
+    fetched_records = [_task_result(task) for task in search_tasks]
+    unfinished_terms = {
+        term
+        for term, task in zip(uncached_terms, search_tasks, strict=True)
+        if task.cancelled()
+    }
+    search_terms = [term for term in search_terms if term not in unfinished_terms]
+    term_keys = [normalize_term(term) for term in search_terms]
+    fetched_by_key = {
+        normalize_term(term): None if records is None else [r["CID"] for r in records]
+        for term, records in zip(uncached_terms, fetched_records, strict=True)
+    }
+    await compound_cache.set_many(
+        TERM,
+        {key: cids for key, cids in fetched_by_key.items() if cids is not None},
+    )
+    search_results = [
+        cached_cids.get(key, fetched_by_key.get(key)) or [] for key in term_keys
+    ]
+    failed_terms = [
+        term
+        for term, records in zip(uncached_terms, fetched_records, strict=True)
+        if records is None and term not in unfinished_terms
+    ]
+    for term, records in zip(uncached_terms, fetched_records, strict=True):
+        if records is not None:
+            variation_stats.record(term_kinds[term], bool(records))
+
+    # Properties that came back with the name lookups (top 3 per term)
+    properties = {}
+    for records in fetched_records:
+        for record in (records or [])[:3]:
+            properties.setdefault(record["CID"], record)
+    await compound_property_store.put_many(properties)
+    for cid, record in identifier_properties.items():
+        properties.setdefault(cid, record)
+
+    # Collect all unique CIDs with the search term that found them, after
+    # those found by identifier
+    cid_to_terms = {cid: list(terms) for cid, terms in identifier_cids.items()}
+    for term, cids in zip(search_terms, search_results, strict=True):
+        for cid in cids[:3]:  # Limit results per term
+            if cid not in cid_to_terms:
+                cid_to_terms[cid] = []
+            cid_to_terms[cid].append(term)
+    search_terms = identifier_terms + search_terms
+
+    all_cids = list(cid_to_terms.keys())
+
+    if not all_cids and (failed_terms or identifier_failed or partial):
+        # PubChem was throttling, unreachable or too slow, so "not found" would
+        # be a guess. Offer close names from the offline index if there are any.
+        reason = (
+            "PubChem did not answer within the time budget"
+            if partial
+            else "PubChem is busy or unreachable"
+        )
+        for name in names:
+            for matched_name, record in await local_compound_index.find_similar(name):
+                cid_to_terms.setdefault(record["CID"], []).append(matched_name)
+                properties.setdefault(record["CID"], record)
+        if cid_to_terms:
+            return await _build_lookup_result(
+                original_query,
+                search_terms,
+                cid_to_terms,
+                properties,
+                recommendation=f"{reason}. These are the closest names in the "
+                "local compound index, not exact matches.",
+                partial=partial,
+                fetch=False,
             )
+        return _unavailable_result(original_query, search_terms, partial)
 
-        # Generate recommendation
-        if len(matches) == 1:
-            recommendation = f"Found exactly one match: {matches[0].title or matches[0].iupac_name} (CID: {matches[0].cid})"
-        elif len(matches) <= 3:
-            recommendation = "Found multiple matches. Choose based on molecular weight and formula that fits your context."
-        else:
-            recommendation = f"Found {len(matches)} matches. The first few are most likely relevant. Choose based on your experimental context."
+    if not all_cids:
+        # Collect all autocomplete suggestions for the error message
+        all_suggestions = []
+        for suggestions in autocomplete_results:
+            all_suggestions.extend(suggestions[:2])
+
+        suggestion_note = ""
+        if all_suggestions:
+            unique_suggestions = list(dict.fromkeys(all_suggestions))[:5]
+            suggestion_note = f" PubChem suggested: {', '.join(unique_suggestions)}"
 
         return CompoundLookupResult(
             query=original_query,
             search_terms_tried=search_terms,
-            matches=matches,
-            recommendation=recommendation,
+            matches=[],
+            recommendation=f"No compounds found for '{original_query}'.{suggestion_note} "
+            "Try different names or check the spelling.",
         )
 
+    return await _build_lookup_result(
+        original_query,
+        search_terms,
+        cid_to_terms,
+        properties,
+        deadline=deadline,
+        partial=partial,
+    )
+
+
+@mcp.tool
+@traced_handler
+async def get_compound_properties(
+    cids: Annotated[
+        list[int],
+        Field(
+            min_length=1,
+            max_length=15,
+            description="PubChem CIDs of compounds, e.g. from search_compound results.",
+        ),
+    ],
+) -> CompoundPropertiesResult:
+    """
+    Get the full property set of compounds that were already identified by CID.
+
+    Use this for follow-up questions (XLogP, TPSA, hydrogen bond donors and
+    acceptors, exact mass, SMILES, ...) about a compound found earlier.
+    Compounds looked up before are answered from the local property store
+    without contacting PubChem.
+    """
+    cids = list(dict.fromkeys(cids))
+    properties, _, failed = await _load_properties(cids)
+    if failed and not properties:
+        raise ValueError("PubChem is busy or unreachable. Try again in a moment.")
+    return CompoundPropertiesResult(
+        compounds=[
+            CompoundInfo.from_properties(cid, properties[cid])
+            for cid in cids
+            if cid in properties
+        ],
+        not_found=[cid for cid in cids if cid not in properties],
+    )
+
 
 # =============================================================================
 # Note and Todo Tools
 # =============================================================================
 
-NoteOperation = Literal["add", "edit", "show"]
-TodoOperation = Literal["add", "edit", "show"]
+NoteOperation = Literal["add", "edit", "batch", "show"]
+TodoOperation = Literal["add", "edit", "batch", "show"]
+# What 'add' does when a similar item already exists
+IfSimilar = Literal["report", "merge", "add"]
+IF_SIMILAR_DESCRIPTION = (
+    "What 'add' does if a similar item already exists: 'report' (default) adds "
+    "nothing and returns the existing item, 'merge' updates the existing item "
+    "instead, 'add' adds a new item anyway."
+)
+
+# Seconds a rendered note/todo list is reused (0 disables the cache). Writes
+# through these tools invalidate it at once; the TTL only bounds how long
+# writes made elsewhere (the frontend, another replica) can go unseen.
+PROJECT_LIST_CACHE_TTL = float(os.getenv("PROJECT_LIST_CACHE_TTL", "30"))
+PROJECT_LIST_CACHE_MAX_ENTRIES = int(
+    os.getenv("PROJECT_LIST_CACHE_MAX_ENTRIES", "1000")
+)
+
+
+class ProjectListCache:
+    """Rendered 'show' results per project and list kind.
+
+    Each (kind, project) has a generation number that is part of the cache
+    key and is bumped on every write, so a write invalidates all cached
+    variants (e.g. todo status filters) at once. A 'show' that started
+    before the write stores its result under the old generation, where it
+    is never read.
+    """
+
+    def __init__(
+        self,
+        ttl: float = PROJECT_LIST_CACHE_TTL,
+        max_entries: int = PROJECT_LIST_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self.ttl = ttl
+        self.memory = LRUCache(max_entries)
+        self._generations: dict[tuple[str, UUID], int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(
+        self, kind: str, project_id: UUID, variant: str | None = None
+    ) -> tuple[tuple, BaseModel | None]:
+        """Return (key, cached result or None); pass the key to ``set``."""
+        generation = self._generations.get((kind, project_id), 0)
+        key = (kind, project_id, generation, variant)
+        if self.ttl <= 0:
+            return key, None
+        hit, value = self.memory.get(key)
+        if hit:
+            self.hits += 1
+            return key, value
+        self.misses += 1
+        return key, None
+
+    def set(self, key: tuple, value: BaseModel) -> None:
+        if self.ttl > 0:
+            self.memory.set(key, value, time.time() + self.ttl)
+
+    def invalidate(self, kind: str, project_id: UUID) -> None:
+        self._generations[(kind, project_id)] = (
+            self._generations.get((kind, project_id), 0) + 1
+        )
+        self.invalidations += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self.memory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+project_list_cache = ProjectListCache()
 
 
 class NoteResult(BaseModel):
     """Result of a note operation - designed for LLM consumption."""
 
     status: str = Field(description="Short confirmation of the action taken.")
+    note_id: str | None = Field(
+        default=None,
+        description="ID of the note that was added or updated, or of the similar "
+        "existing note. Use it as note_id to edit that note.",
+    )
     instruction: str = Field(
         description="Instruction for LLM: respond with forward-thinking advice and a helpful comment."
     )
@@ -361,6 +1108,10 @@ class NotesListResult(BaseModel):
 
     status: str = Field(description="Short confirmation of the action taken.")
     notes_summary: str = Field(description="Brief summary of notes for context.")
+    next_cursor: str | None = Field(
+        default=None,
+        description="Pass as cursor to 'show' to list older notes; null if there are none.",
+    )
     instruction: str = Field(
         description="Instruction for LLM: respond with forward-thinking advice and a helpful comment."
     )
@@ -370,6 +1121,11 @@ class TodoResult(BaseModel):
     """Result of a todo operation - designed for LLM consumption."""
 
     status: str = Field(description="Short confirmation of the action taken.")
+    todo_id: str | None = Field(
+        default=None,
+        description="ID of the todo that was added or updated, or of the similar "
+        "existing todo. Use it as todo_id to edit that todo.",
+    )
     instruction: str = Field(
         description="Instruction for LLM: respond with forward-thinking advice and a helpful comment."
     )
@@ -380,17 +1136,473 @@ class TodosListResult(BaseModel):
 
     status: str = Field(description="Short confirmation of the action taken.")
     todos_summary: str = Field(description="Brief summary of todos for context.")
+    next_cursor: str | None = Field(
+        default=None,
+        description="Pass as cursor to 'show' to list older todos; null if there are none.",
+    )
     instruction: str = Field(
         description="Instruction for LLM: respond with forward-thinking advice and a helpful comment."
     )
 
 
+class NoteItem(BaseModel):
+    """A note to add or, with a note_id, edit in a 'batch'."""
+
+    title: str | None = Field(
+        default=None, description="The title. Required to add, optional to edit."
+    )
+    content: str | None = Field(
+        default=None,
+        description="The content as bullet points. Required to add, optional to edit.",
+    )
+    note_id: str | None = Field(
+        default=None, description="The UUID of the note to edit; omit to add."
+    )
+
+
+class TodoItem(BaseModel):
+    """A todo to add or, with a todo_id, edit in a 'batch'."""
+
+    content: str | None = Field(
+        default=None, description="The content. Required to add, optional to edit."
+    )
+    status: Literal["open", "done"] | None = Field(
+        default=None, description="'done' to mark complete, 'open' to reopen."
+    )
+    todo_id: str | None = Field(
+        default=None, description="The UUID of the todo to edit; omit to add."
+    )
+
+
+class BatchItemResult(BaseModel):
+    """Outcome of one item of a 'batch'."""
+
+    status: str = Field(description="Short confirmation of the action taken.")
+    id: str | None = Field(
+        default=None,
+        description="ID of the item that was added or updated, or of the similar existing item.",
+    )
+
+
+class BatchResult(BaseModel):
+    """Result of a 'batch' of note or todo operations - designed for LLM consumption."""
+
+    status: str = Field(description="Short summary of the whole batch.")
+    items: list[BatchItemResult] = Field(description="One outcome per item, in order.")
+    instruction: str = Field(
+        description="Instruction for LLM: respond with forward-thinking advice and a helpful comment."
+    )
+
+
+# "show" lists newest first in pages of at most LIST_PAGE_MAX_SIZE items
+LIST_PAGE_SIZE = 50
+LIST_PAGE_MAX_SIZE = 200
+NOTE_PREVIEW_LENGTH = 100
+TODO_PREVIEW_LENGTH = 80
+
+
+def _encode_cursor(created_at: datetime, item_id: UUID) -> str:
+    return f"{created_at.isoformat()}|{item_id}"
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        created_at, item_id = cursor.split("|")
+        return datetime.fromisoformat(created_at), UUID(item_id)
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}") from None
+
+
+def _paginate(
+    statement, model: type[Note] | type[Todo], limit: int, cursor: str | None
+):
+    """Order newest first and continue after ``cursor`` (keyset pagination).
+
+    One extra row is selected so the caller can tell whether there is a
+    next page.
+    """
+    if cursor:
+        created_at, item_id = _decode_cursor(cursor)
+        statement = statement.where(
+            tuple_(model.created_at, model.id) < tuple_(created_at, item_id)
+        )
+    return statement.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+
+async def _stream_page(
+    session: AsyncSession, statement, limit: int, render: Callable
+) -> tuple[list[str], str | None]:
+    """Stream a page of rows, rendering each; returns the lines and next cursor."""
+    lines: list[str] = []
+    last_key: tuple[datetime, UUID] | None = None
+    next_cursor = None
+    result = await session.stream(statement)
+    async for row in result:
+        if len(lines) == limit and last_key:
+            next_cursor = _encode_cursor(*last_key)
+            break
+        lines.append(render(row))
+        last_key = (row.created_at, row.id)
+    await result.close()
+    return lines, next_cursor
+
+
+async def _list_notes(
+    session: AsyncSession, project_id: UUID, limit: int, cursor: str | None
+) -> NotesListResult:
+    """List notes with only the columns shown, truncated in SQL."""
+    total = await session.scalar(
+        select(func.count()).select_from(Note).where(Note.project_id == project_id)
+    )
+    statement = select(
+        Note.id,
+        Note.created_at,
+        Note.title,
+        func.left(Note.content, NOTE_PREVIEW_LENGTH).label("preview"),
+        (func.length(Note.content) > NOTE_PREVIEW_LENGTH).label("truncated"),
+    ).where(Note.project_id == project_id)
+    lines, next_cursor = await _stream_page(
+        session,
+        _paginate(statement, Note, limit, cursor),
+        limit,
+        lambda n: f"• {n.title}: {n.preview}{'...' if n.truncated else ''}",
+    )
+
+    status = f"✓ Found {total} note(s)"
+    if len(lines) < total:
+        status += f", showing {len(lines)}"
+    return NotesListResult(
+        status=status,
+        notes_summary="\n".join(lines) or "No notes found for this project.",
+        next_cursor=next_cursor,
+        instruction="Respond with forward-thinking advice based on these notes and a helpful comment.",
+    )
+
+
+async def _list_todos(
+    session: AsyncSession,
+    project_id: UUID,
+    filter_status: str | None,
+    limit: int,
+    cursor: str | None,
+) -> TodosListResult:
+    """List todos with only the columns shown; status counts come from SQL."""
+    conditions = [Todo.project_id == project_id]
+    if filter_status and filter_status != "all":
+        conditions.append(Todo.status == TodoStatus(filter_status))
+
+    counts_result = await session.execute(
+        select(Todo.status, func.count()).where(*conditions).group_by(Todo.status)
+    )
+    counts = dict(counts_result.all())
+    open_count = counts.get(TodoStatus.open, 0)
+    done_count = counts.get(TodoStatus.done, 0)
+
+    statement = select(
+        Todo.id,
+        Todo.created_at,
+        Todo.status,
+        func.left(Todo.content, TODO_PREVIEW_LENGTH).label("preview"),
+        (func.length(Todo.content) > TODO_PREVIEW_LENGTH).label("truncated"),
+    ).where(*conditions)
+    lines, next_cursor = await _stream_page(
+        session,
+        _paginate(statement, Todo, limit, cursor),
+        limit,
+        lambda t: (
+            f"{'✓' if t.status == TodoStatus.done else '○'} {t.preview}{'...' if t.truncated else ''}"
+        ),
+    )
+
+    total = open_count + done_count
+    status = f"✓ Found {total} todo(s) ({open_count} open, {done_count} done)"
+    if len(lines) < total:
+        status += f", showing {len(lines)}"
+    return TodosListResult(
+        status=status,
+        todos_summary="\n".join(lines) or "No todos found for this project.",
+        next_cursor=next_cursor,
+        instruction="Respond with forward-thinking advice about prioritizing these tasks and a helpful comment.",
+    )
+
+
+def _short(text: str, length: int = 50) -> str:
+    return f"{text[:length]}{'...' if len(text) > length else ''}"
+
+
+def _parse_item_id(item_id: str, kind: str) -> UUID:
+    try:
+        return UUID(item_id)
+    except ValueError:
+        raise ValueError(f"Invalid {kind} ID format: {item_id}") from None
+
+
+# The helpers below write through the session without committing and return
+# the result plus whether anything was written. New items are collected in
+# a list so the caller inserts them with one statement; the caller commits,
+# once per tool call.
+
+
+async def _edit_note(
+    session: AsyncSession,
+    project_id: UUID,
+    note_id: UUID,
+    title: str | None,
+    content: str | None,
+    append: bool = False,
+) -> RowMapping:
+    note = await update_note(session, project_id, note_id, title, content, append)
+    if note is None:
+        raise ValueError(f"Note with ID {note_id} not found in this project.")
+    return note
+
+
+async def _edit_todo(
+    session: AsyncSession,
+    project_id: UUID,
+    todo_id: UUID,
+    content: str | None,
+    status: str | None,
+) -> RowMapping:
+    todo = await update_todo(
+        session, project_id, todo_id, content, TodoStatus(status) if status else None
+    )
+    if todo is None:
+        raise ValueError(f"Todo with ID {todo_id} not found in this project.")
+    return todo
+
+
+def _note_updated(note: RowMapping) -> tuple[NoteResult, bool]:
+    return NoteResult(
+        status=f"✓ Updated: '{note['title']}'",
+        note_id=str(note["id"]),
+        instruction="Respond with forward-thinking advice about next steps and a helpful comment related to this update.",
+    ), True
+
+
+def _todo_updated(todo: RowMapping) -> tuple[TodoResult, bool]:
+    status_msg = "marked done" if todo["status"] == TodoStatus.done else "updated"
+    return TodoResult(
+        status=f"✓ Todo {status_msg}: '{_short(todo['content'])}'",
+        todo_id=str(todo["id"]),
+        instruction="Respond with forward-thinking advice about next steps and a helpful comment.",
+    ), True
+
+
+async def _add_note(
+    session: AsyncSession,
+    project_id: UUID,
+    title: str,
+    content: str,
+    if_similar: IfSimilar,
+    new_notes: list[Note],
+) -> tuple[NoteResult, bool]:
+    similar = None
+    if if_similar != "add":
+        similar = await find_similar_note(session, project_id, title, content)
+    if similar and if_similar == "report":
+        return NoteResult(
+            status=f"A similar note already exists: '{similar.title}'. Nothing was added.",
+            note_id=str(similar.id),
+            instruction="Tell the user about the existing note. To change it, use 'edit' with this note_id; if it really is a different note, repeat 'add' with if_similar='add'.",
+        ), False
+    if similar:
+        # Merging adds the new content to the existing note
+        note = await _edit_note(
+            session, project_id, similar.id, None, content, append=True
+        )
+        return NoteResult(
+            status=f"✓ Merged into existing note: '{note['title']}'",
+            note_id=str(note["id"]),
+            instruction="Respond with forward-thinking advice about next steps and a helpful comment related to this update.",
+        ), True
+
+    new_note = Note(project_id=project_id, title=title, content=content, modified=[])
+    new_notes.append(new_note)
+    return NoteResult(
+        status=f"✓ Noted: '{new_note.title}'",
+        note_id=str(new_note.id),
+        instruction="Respond with forward-thinking advice about next steps and a helpful comment related to this note.",
+    ), True
+
+
+async def _add_todo(
+    session: AsyncSession,
+    project_id: UUID,
+    content: str,
+    status: str | None,
+    if_similar: IfSimilar,
+    new_todos: list[Todo],
+) -> tuple[TodoResult, bool]:
+    similar = None
+    if if_similar != "add":
+        similar = await find_similar_todo(session, project_id, content)
+    if similar and if_similar == "report":
+        return TodoResult(
+            status=f"A similar open todo already exists: '{_short(similar.content)}'. Nothing was added.",
+            todo_id=str(similar.id),
+            instruction="Tell the user about the existing todo. To change it, use 'edit' with this todo_id; if it really is a different task, repeat 'add' with if_similar='add'.",
+        ), False
+    if similar:
+        # Merging rewords the existing todo with the new content
+        todo = await _edit_todo(session, project_id, similar.id, content, status)
+        return TodoResult(
+            status=f"✓ Merged into existing todo: '{_short(todo['content'])}'",
+            todo_id=str(todo["id"]),
+            instruction="Respond with forward-thinking advice about prioritizing this task and a helpful comment.",
+        ), True
+
+    new_todo = Todo(
+        project_id=project_id,
+        content=content,
+        status=TodoStatus(status) if status else TodoStatus.open,
+        modified=[],
+    )
+    new_todos.append(new_todo)
+    return TodoResult(
+        status=f"✓ Added todo: '{_short(new_todo.content)}'",
+        todo_id=str(new_todo.id),
+        instruction="Respond with forward-thinking advice about prioritizing this task and a helpful comment.",
+    ), True
+
+
+def _batch_edit_ids(item_ids: list[str | None], kind: str) -> dict[int, UUID]:
+    """The parsed IDs of a batch's edits by item index; an ID may appear once."""
+    edit_ids: dict[int, UUID] = {}
+    for index, item_id in enumerate(item_ids):
+        if not item_id:
+            continue
+        parsed = _parse_item_id(item_id, kind)
+        if parsed in edit_ids.values():
+            raise ValueError(
+                f"The {kind} with ID {item_id} is edited more than once in this "
+                "batch. Combine its changes into one item."
+            )
+        edit_ids[index] = parsed
+    return edit_ids
+
+
+async def _note_batch(
+    session: AsyncSession,
+    project_id: UUID,
+    items: list[NoteItem],
+    if_similar: IfSimilar,
+) -> tuple[BatchResult, bool]:
+    edit_ids = _batch_edit_ids([item.note_id for item in items], "note")
+    for index, item in enumerate(items):
+        if index not in edit_ids and not (item.title and item.content):
+            raise ValueError("Every note to add needs a title and content.")
+
+    # All edits are one statement; adds follow with their similarity checks
+    edited = await update_notes(
+        session,
+        project_id,
+        [
+            (note_id, items[index].title, items[index].content)
+            for index, note_id in edit_ids.items()
+        ],
+    )
+    results: list[tuple[NoteResult, bool]] = []
+    new_notes: list[Note] = []
+    for index, item in enumerate(items):
+        if index in edit_ids:
+            note = edited.get(edit_ids[index])
+            if note is None:
+                raise ValueError(
+                    f"Note with ID {edit_ids[index]} not found in this project."
+                )
+            results.append(_note_updated(note))
+        else:
+            results.append(
+                await _add_note(
+                    session,
+                    project_id,
+                    item.title,
+                    item.content,
+                    if_similar,
+                    new_notes,
+                )
+            )
+    await insert_notes(session, new_notes)
+    return _batch_result("notes", results), any(changed for _, changed in results)
+
+
+async def _todo_batch(
+    session: AsyncSession,
+    project_id: UUID,
+    items: list[TodoItem],
+    if_similar: IfSimilar,
+) -> tuple[BatchResult, bool]:
+    edit_ids = _batch_edit_ids([item.todo_id for item in items], "todo")
+    for index, item in enumerate(items):
+        if index not in edit_ids and not item.content:
+            raise ValueError("Every todo to add needs content.")
+
+    # All edits are one statement; adds follow with their similarity checks
+    edited = await update_todos(
+        session,
+        project_id,
+        [
+            (
+                todo_id,
+                items[index].content,
+                TodoStatus(items[index].status) if items[index].status else None,
+            )
+            for index, todo_id in edit_ids.items()
+        ],
+    )
+    results: list[tuple[TodoResult, bool]] = []
+    new_todos: list[Todo] = []
+    for index, item in enumerate(items):
+        if index in edit_ids:
+            todo = edited.get(edit_ids[index])
+            if todo is None:
+                raise ValueError(
+                    f"Todo with ID {edit_ids[index]} not found in this project."
+                )
+            results.append(_todo_updated(todo))
+        else:
+            results.append(
+                await _add_todo(
+                    session,
+                    project_id,
+                    item.content,
+                    item.status,
+                    if_similar,
+                    new_todos,
+                )
+            )
+    await insert_todos(session, new_todos)
+    return _batch_result("todos", results), any(changed for _, changed in results)
+
+
+def _batch_result(
+    kind: str, results: list[tuple[NoteResult | TodoResult, bool]]
+) -> BatchResult:
+    saved = sum(changed for _, changed in results)
+    items = [
+        BatchItemResult(
+            status=result.status,
+            id=result.note_id if isinstance(result, NoteResult) else result.todo_id,
+        )
+        for result, _ in results
+    ]
+    skipped = len(results) - saved
+    return BatchResult(
+        status=f"✓ Saved {saved} of {len(results)} {kind}"
+        + (f"; {skipped} already existed" if skipped else ""),
+        items=items,
+        instruction="Respond with one short summary of what was saved, mention any items that already existed, and give forward-thinking advice.",
+    )
+
+
 @mcp.tool
+@traced_handler
 async def note(
     operation: Annotated[
         NoteOperation,
         Field(
-            description="The operation to perform: 'add' to create a new note, 'edit' to modify an existing note, 'show' to list notes."
+            description="The operation to perform: 'add' to create a new note, 'edit' to modify an existing note, 'batch' to add and edit several notes at once, 'show' to list notes."
         ),
     ],
     title: Annotated[
@@ -414,23 +1626,48 @@ async def note(
             description="The UUID of the note to edit. Required for 'edit' operation.",
         ),
     ] = None,
-) -> NoteResult | NotesListResult:
+    items: Annotated[
+        list[NoteItem] | None,
+        Field(
+            default=None,
+            description="The notes to save with 'batch', in one transaction. Items with a note_id are edited, the others added.",
+        ),
+    ] = None,
+    if_similar: Annotated[
+        IfSimilar, Field(default="report", description=IF_SIMILAR_DESCRIPTION)
+    ] = "report",
+    limit: Annotated[
+        int,
+        Field(
+            default=LIST_PAGE_SIZE,
+            ge=1,
+            le=LIST_PAGE_MAX_SIZE,
+            description="Maximum number of notes to list with 'show', newest first.",
+        ),
+    ] = LIST_PAGE_SIZE,
+    cursor: Annotated[
+        str | None,
+        Field(
+            default=None,
+            description="The next_cursor of a previous 'show' to list older notes.",
+        ),
+    ] = None,
+) -> NoteResult | BatchResult | NotesListResult:
     """
     Manage notes for a project. Use this to add, edit, or show notes.
     Compress user information into sensible bullet points with a clear title.
+    When the user dictates several notes at once, save them with one 'batch'.
 
     The project_id is automatically retrieved from the HTTP headers (X-Project-ID).
     """
-    project_id_str = get_project_id()
-    if not project_id_str:
-        raise ValueError(
-            "Project ID not found in request headers. Ensure X-Project-ID header is set."
-        )
+    project_id = require_project_id()
 
-    try:
-        project_id = UUID(project_id_str)
-    except ValueError:
-        raise ValueError(f"Invalid project ID format: {project_id_str}") from None
+    if operation == "show":
+        cache_key, cached = project_list_cache.get(
+            "notes", project_id, f"{limit}:{cursor}"
+        )
+        if cached is not None:
+            return cached
 
     async with get_session() as session:
         if operation == "add":
@@ -438,95 +1675,45 @@ async def note(
                 raise ValueError("Title is required for 'add' operation.")
             if not content:
                 raise ValueError("Content is required for 'add' operation.")
-
-            new_note = Note(
-                project_id=project_id,
-                title=title,
-                content=content,
-                modified=[],
-            )
-            session.add(new_note)
-            await session.flush()
-            await session.refresh(new_note)
-
-            return NoteResult(
-                status=f"✓ Noted: '{new_note.title}'",
-                instruction="Respond with forward-thinking advice about next steps and a helpful comment related to this note.",
+            new_notes: list[Note] = []
+            result, changed = await _add_note(
+                session, project_id, title, content, if_similar, new_notes
             )
+            await insert_notes(session, new_notes)
 
         elif operation == "edit":
             if not note_id:
                 raise ValueError("note_id is required for 'edit' operation.")
-
-            try:
-                note_uuid = UUID(note_id)
-            except ValueError:
-                raise ValueError(f"Invalid note ID format: {note_id}") from None
-
-            statement = select(Note).where(
-                Note.id == note_uuid, Note.project_id == project_id
+            note_uuid = _parse_item_id(note_id, "note")
+            result, changed = _note_updated(
+                await _edit_note(session, project_id, note_uuid, title, content)
             )
-            result = await session.execute(statement)
-            existing_note = result.scalar_one_or_none()
-
-            if not existing_note:
-                raise ValueError(f"Note with ID {note_id} not found in this project.")
-
-            # Add current state to modification history
-            modified_history = existing_note.modified or []
-            modified_history.append(
-                {
-                    "title": existing_note.title,
-                    "content": existing_note.content,
-                    "modifiedAt": datetime.utcnow().isoformat() + "Z",
-                }
-            )
-
-            if title:
-                existing_note.title = title
-            if content:
-                existing_note.content = content
-            existing_note.modified = modified_history
 
-            await session.flush()
-            await session.refresh(existing_note)
-
-            return NoteResult(
-                status=f"✓ Updated: '{existing_note.title}'",
-                instruction="Respond with forward-thinking advice about next steps and a helpful comment related to this update.",
-            )
+        elif operation == "batch":
+            if not items:
+                raise ValueError("items is required for 'batch' operation.")
+            result, changed = await _note_batch(session, project_id, items, if_similar)
 
         elif operation == "show":
-            statement = (
-                select(Note)
-                .where(Note.project_id == project_id)
-                .order_by(Note.created_at.desc())
-            )
-            result = await session.execute(statement)
-            notes = result.scalars().all()
-
-            if not notes:
-                notes_summary = "No notes found for this project."
-            else:
-                notes_summary = "\n".join(
-                    f"• {n.title}: {n.content[:100]}{'...' if len(n.content) > 100 else ''}"
-                    for n in notes
-                )
-            return NotesListResult(
-                status=f"✓ Found {len(notes)} note(s)",
-                notes_summary=notes_summary,
-                instruction="Respond with forward-thinking advice based on these notes and a helpful comment.",
-            )
+            result = await _list_notes(session, project_id, limit, cursor)
+            project_list_cache.set(cache_key, result)
+            return result
 
-        raise ValueError(f"Invalid operation: {operation}")
+        else:
+            raise ValueError(f"Invalid operation: {operation}")
+
+    if changed:
+        project_list_cache.invalidate("notes", project_id)
+    return result
 
 
 @mcp.tool
+@traced_handler
 async def todo(
     operation: Annotated[
         TodoOperation,
         Field(
-            description="The operation to perform: 'add' to create a new todo, 'edit' to modify an existing todo (content or status), 'show' to list todos."
+            description="The operation to perform: 'add' to create a new todo, 'edit' to modify an existing todo (content or status), 'batch' to add and edit several todos at once, 'show' to list todos."
         ),
     ],
     content: Annotated[
@@ -550,6 +1737,16 @@ async def todo(
             description="The UUID of the todo to edit. Required for 'edit' operation.",
         ),
     ] = None,
+    items: Annotated[
+        list[TodoItem] | None,
+        Field(
+            default=None,
+            description="The todos to save with 'batch', in one transaction. Items with a todo_id are edited, the others added.",
+        ),
+    ] = None,
+    if_similar: Annotated[
+        IfSimilar, Field(default="report", description=IF_SIMILAR_DESCRIPTION)
+    ] = "report",
     filter_status: Annotated[
         Literal["open", "done", "all"] | None,
         Field(
@@ -557,116 +1754,246 @@ async def todo(
             description="Filter todos by status when using 'show'. Default shows all.",
         ),
     ] = None,
-) -> TodoResult | TodosListResult:
+    limit: Annotated[
+        int,
+        Field(
+            default=LIST_PAGE_SIZE,
+            ge=1,
+            le=LIST_PAGE_MAX_SIZE,
+            description="Maximum number of todos to list with 'show', newest first.",
+        ),
+    ] = LIST_PAGE_SIZE,
+    cursor: Annotated[
+        str | None,
+        Field(
+            default=None,
+            description="The next_cursor of a previous 'show' to list older todos.",
+        ),
+    ] = None,
+) -> TodoResult | BatchResult | TodosListResult:
     """
     Manage todos for a project. Use this to add, edit, or show todos.
     You can mark todos as done/open or edit their content.
+    When the user dictates several todos at once, save them with one 'batch'.
 
     The project_id is automatically retrieved from the HTTP headers (X-Project-ID).
     """
-    project_id_str = get_project_id()
-    if not project_id_str:
-        raise ValueError(
-            "Project ID not found in request headers. Ensure X-Project-ID header is set."
-        )
+    project_id = require_project_id()
 
-    try:
-        project_id = UUID(project_id_str)
-    except ValueError:
-        raise ValueError(f"Invalid project ID format: {project_id_str}") from None
+    if operation == "show":
+        cache_key, cached = project_list_cache.get(
+            "todos", project_id, f"{filter_status or 'all'}:{limit}:{cursor}"
+        )
+        if cached is not None:
+            return cached
 
     async with get_session() as session:
         if operation == "add":
             if not content:
                 raise ValueError("Content is required for 'add' operation.")
-
-            new_todo = Todo(
-                project_id=project_id,
-                content=content,
-                status=TodoStatus(status) if status else TodoStatus.open,
-                modified=[],
-            )
-            session.add(new_todo)
-            await session.flush()
-            await session.refresh(new_todo)
-
-            return TodoResult(
-                status=f"✓ Added todo: '{new_todo.content[:50]}{'...' if len(new_todo.content) > 50 else ''}'",
-                instruction="Respond with forward-thinking advice about prioritizing this task and a helpful comment.",
+            new_todos: list[Todo] = []
+            result, changed = await _add_todo(
+                session, project_id, content, status, if_similar, new_todos
             )
+            await insert_todos(session, new_todos)
 
         elif operation == "edit":
             if not todo_id:
                 raise ValueError("todo_id is required for 'edit' operation.")
+            todo_uuid = _parse_item_id(todo_id, "todo")
+            result, changed = _todo_updated(
+                await _edit_todo(session, project_id, todo_uuid, content, status)
+            )
 
-            try:
-                todo_uuid = UUID(todo_id)
-            except ValueError:
-                raise ValueError(f"Invalid todo ID format: {todo_id}") from None
+        elif operation == "batch":
+            if not items:
+                raise ValueError("items is required for 'batch' operation.")
+            result, changed = await _todo_batch(session, project_id, items, if_similar)
 
-            statement = select(Todo).where(
-                Todo.id == todo_uuid, Todo.project_id == project_id
-            )
-            result = await session.execute(statement)
-            existing_todo = result.scalar_one_or_none()
-
-            if not existing_todo:
-                raise ValueError(f"Todo with ID {todo_id} not found in this project.")
-
-            # Add current state to modification history
-            modified_history = existing_todo.modified or []
-            modified_history.append(
-                {
-                    "content": existing_todo.content,
-                    "status": existing_todo.status.value,
-                    "modifiedAt": datetime.utcnow().isoformat() + "Z",
-                }
+        elif operation == "show":
+            result = await _list_todos(
+                session, project_id, filter_status, limit, cursor
             )
+            project_list_cache.set(cache_key, result)
+            return result
 
-            if content:
-                existing_todo.content = content
-            if status:
-                existing_todo.status = TodoStatus(status)
-            existing_todo.modified = modified_history
+        else:
+            raise ValueError(f"Invalid operation: {operation}")
 
-            await session.flush()
-            await session.refresh(existing_todo)
+    if changed:
+        project_list_cache.invalidate("todos", project_id)
+    return result
 
-            status_msg = (
-                "marked done" if existing_todo.status == TodoStatus.done else "updated"
-            )
-            return TodoResult(
-                status=f"✓ Todo {status_msg}: '{existing_todo.content[:50]}{'...' if len(existing_todo.content) > 50 else ''}'",
-                instruction="Respond with forward-thinking advice about next steps and a helpful comment.",
-            )
 
-        elif operation == "show":
-            statement = select(Todo).where(Todo.project_id == project_id)
+# =============================================================================
+# Project Search
+# =============================================================================
 
-            if filter_status and filter_status != "all":
-                statement = statement.where(Todo.status == TodoStatus(filter_status))
 
-            statement = statement.order_by(Todo.created_at.desc())
-            result = await session.execute(statement)
-            todos = result.scalars().all()
+class ProjectSearchHit(BaseModel):
+    """A note, todo or conversation message matching a search."""
 
-            if not todos:
-                todos_summary = "No todos found for this project."
-            else:
-                todos_summary = "\n".join(
-                    f"{'✓' if t.status == TodoStatus.done else '○'} {t.content[:80]}{'...' if len(t.content) > 80 else ''}"
-                    for t in todos
-                )
-            open_count = sum(1 for t in todos if t.status == TodoStatus.open)
-            done_count = sum(1 for t in todos if t.status == TodoStatus.done)
-            return TodosListResult(
-                status=f"✓ Found {len(todos)} todo(s) ({open_count} open, {done_count} done)",
-                todos_summary=todos_summary,
-                instruction="Respond with forward-thinking advice about prioritizing these tasks and a helpful comment.",
+    kind: Literal["note", "todo", "message"] = Field(
+        description="What kind of item matched."
+    )
+    id: str = Field(description="The UUID of the note, todo or message.")
+    title: str | None = Field(default=None, description="The note title, if a note.")
+    snippet: str = Field(description="Matching excerpt, search words marked with *.")
+    created_at: datetime = Field(description="When the item was created or said.")
+
+
+class ProjectSearchResult(BaseModel):
+    """Result of a project search - designed for LLM consumption."""
+
+    status: str = Field(description="Short confirmation of the action taken.")
+    results: list[ProjectSearchHit] = Field(description="Matches, best first.")
+    instruction: str = Field(
+        description="Instruction for LLM: answer the user's question from these results."
+    )
+
+
+@mcp.tool
+@traced_handler
+async def search_project(
+    query: Annotated[
+        str,
+        Field(
+            min_length=1,
+            description="What to look for, in plain words, e.g. 'bowtie antenna dose'.",
+        ),
+    ],
+    limit: Annotated[
+        int,
+        Field(default=5, ge=1, le=20, description="Maximum number of results."),
+    ] = 5,
+) -> ProjectSearchResult:
+    """
+    Search the project's notes, todos and past conversations for a question or topic.
+
+    Use this to recall specific information ("what dose did I use last time?")
+    instead of listing every note or todo. Returns the best-matching excerpts.
+
+    The project_id is automatically retrieved from the HTTP headers (X-Project-ID).
+    """
+    project_id = require_project_id()
+
+    async with get_session() as session:
+        hits = await full_text_search(session, project_id, query, limit)
+
+    return ProjectSearchResult(
+        status=f"✓ Found {len(hits)} match(es)" if hits else "No matches found.",
+        results=[
+            ProjectSearchHit(
+                kind=hit.kind,
+                id=str(hit.id),
+                title=hit.title,
+                snippet=hit.snippet,
+                created_at=hit.created_at,
             )
+            for hit in hits
+        ],
+        instruction="Answer the user's question briefly from the best match. "
+        "If nothing fits, say you couldn't find it."
+        if hits
+        else "Tell the user you couldn't find anything about this in the project.",
+    )
+
+
+# =============================================================================
+# Project Overview
+# =============================================================================
+
+
+class ProjectOverviewResult(BaseModel):
+    """A project's overview - designed for LLM consumption."""
+
+    status: str = Field(description="Short confirmation of the action taken.")
+    name: str = Field(description="The project name.")
+    note_count: int = Field(description="Number of notes.")
+    open_todo_count: int = Field(description="Number of open todos.")
+    done_todo_count: int = Field(description="Number of completed todos.")
+    session_count: int = Field(description="Number of past conversations.")
+    last_activity_at: datetime | None = Field(
+        default=None, description="When anything in the project last changed."
+    )
+    recent_summary: str = Field(description="The newest notes and open todos.")
+    instruction: str = Field(
+        description="Instruction for LLM: respond with forward-thinking advice and a helpful comment."
+    )
+
+
+@mcp.tool
+@traced_handler
+async def project_overview() -> ProjectOverviewResult:
+    """
+    Get an overview of the project: how many notes and todos it has, when it
+    was last active, and its newest notes and open todos.
+
+    Use this at the start of a conversation or when the user asks where they are.
+
+    The project_id is automatically retrieved from the HTTP headers (X-Project-ID).
+    """
+    project_id = require_project_id()
+
+    async with get_session() as session:
+        overview = await get_project_overview(session, project_id)
+    if overview is None:
+        raise ValueError(f"Project {project_id} not found.")
+
+    lines = [f"Note: {note['title']}" for note in overview.recent_notes]
+    lines += [
+        f"Open todo: {_short(todo['content'], TODO_PREVIEW_LENGTH)}"
+        for todo in overview.recent_open_todos
+    ]
+    return ProjectOverviewResult(
+        status=f"✓ Project '{overview.name}'",
+        name=overview.name,
+        note_count=overview.note_count,
+        open_todo_count=overview.open_todo_count,
+        done_todo_count=overview.done_todo_count,
+        session_count=overview.session_count,
+        last_activity_at=overview.last_activity_at,
+        recent_summary="\n".join(lines)
+        or "The project has no notes or open todos yet.",
+        instruction="Give a one or two sentence summary of where the project stands and suggest what to do next.",
+    )
+
+
+# =============================================================================
+# Operational Stats
+# =============================================================================
 
-        raise ValueError(f"Invalid operation: {operation}")
+
+@mcp.custom_route("/stats", methods=["GET"])
+async def stats(request: Request) -> JSONResponse:
+    """Counters for the PubChem caches and scheduler, the project list cache, the database pool and tracing."""
+    return JSONResponse(
+        {
+            "compound_cache": compound_cache.stats(),
+            "db_pool": get_pool_stats(),
+            "compound_property_store": compound_property_store.stats(),
+            "local_compound_index": local_compound_index.stats(),
+            "pubchem_latency": pubchem_scheduler.latency.stats(),
+            "pubchem_scheduler": pubchem_scheduler.stats(),
+            "pubchem_singleflight": pubchem_singleflight.stats(),
+            "project_list_cache": project_list_cache.stats(),
+            "search_variations": variation_stats.stats(),
+            "tracing": tracer.stats(),
+        }
+    )
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request) -> PlainTextResponse:
+    """Prometheus metrics: tool, PubChem and SQL timings and the database pool."""
+    return PlainTextResponse(
+        metrics_registry.render(), media_type="text/plain; version=0.0.4"
+    )
 
 
 if __name__ == "__main__":
-    mcp.run(transport="http", host="0.0.0.0", port=8000)
+    mcp.run(
+        transport="http",
+        host=os.getenv("MCP_HOST", "0.0.0.0"),
+        port=int(os.getenv("MCP_PORT", "8000")),
+    )
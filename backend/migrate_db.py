@@ -0,0 +1,45 @@
+"""Apply the backend's schema migrations, and optionally seed demo data.
+
+The server refuses to start on a database older than its schema version,
+so run this before starting a new version (docker compose runs it in the
+``migrate`` service). Safe to run repeatedly and from several hosts at once.
+
+Usage:
+  uv run python migrate_db.py           # apply pending migrations
+  uv run python migrate_db.py --seed    # ...and load demo data into an empty database
+  uv run python migrate_db.py --status  # print the schema version only
+"""
+
+import argparse
+import asyncio
+
+from db import SCHEMA_VERSION, get_schema_version, init_db
+from db.engine import engine
+
+
+async def run(args: argparse.Namespace) -> None:
+    if args.status:
+        async with engine.connect() as conn:
+            version = await get_schema_version(conn)
+        print(f"Schema version {version} (latest {SCHEMA_VERSION})")
+        return
+
+    applied = await init_db(seed=args.seed)
+    for migration in applied:
+        print(f"Applied migration {migration.version}: {migration.description}")
+    print(f"Schema is at version {SCHEMA_VERSION}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply database schema migrations.")
+    parser.add_argument(
+        "--seed", action="store_true", help="Load demo data if the database is empty"
+    )
+    parser.add_argument(
+        "--status", action="store_true", help="Print the schema version and exit"
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
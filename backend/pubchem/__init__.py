@@ -0,0 +1,72 @@
+from .cache import (
+    AUTOCOMPLETE,
+    IDENTIFIER,
+    TERM,
+    CompoundCache,
+    LRUCache,
+    compound_cache,
+    normalize_term,
+)
+from .http import close_client, get_client, open_client
+from .identifiers import (
+    CAS_IDENTIFIER,
+    CID_IDENTIFIER,
+    INCHIKEY_IDENTIFIER,
+    SMILES_IDENTIFIER,
+    may_be_name,
+    parse_identifier,
+)
+from .latency import LatencyTracker
+from .local_index import LocalCompoundIndex, local_compound_index
+from .property_store import (
+    PROPERTY_NAMES,
+    PropertyStore,
+    compound_property_store,
+    has_full_properties,
+)
+from .scheduler import (
+    Priority,
+    PubChemError,
+    PubChemThrottledError,
+    RequestScheduler,
+    TokenBucket,
+    pubchem_scheduler,
+)
+from .singleflight import SingleFlight, pubchem_singleflight
+from .variation_stats import VariationStats, variation_stats
+
+__all__ = [
+    "AUTOCOMPLETE",
+    "CAS_IDENTIFIER",
+    "CID_IDENTIFIER",
+    "IDENTIFIER",
+    "INCHIKEY_IDENTIFIER",
+    "PROPERTY_NAMES",
+    "SMILES_IDENTIFIER",
+    "TERM",
+    "CompoundCache",
+    "LRUCache",
+    "LatencyTracker",
+    "LocalCompoundIndex",
+    "Priority",
+    "PropertyStore",
+    "PubChemError",
+    "PubChemThrottledError",
+    "RequestScheduler",
+    "SingleFlight",
+    "TokenBucket",
+    "VariationStats",
+    "close_client",
+    "compound_cache",
+    "compound_property_store",
+    "get_client",
+    "has_full_properties",
+    "local_compound_index",
+    "may_be_name",
+    "normalize_term",
+    "open_client",
+    "parse_identifier",
+    "pubchem_scheduler",
+    "pubchem_singleflight",
+    "variation_stats",
+]
@@ -0,0 +1,234 @@
+"""Two-tier cache for PubChem lookups: an in-process LRU in front of Postgres."""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+from db import CompoundCacheEntry, get_session
+
+logger = logging.getLogger(__name__)
+
+# Lookup kinds stored in the cache and their default time-to-live in seconds.
+AUTOCOMPLETE = "autocomplete"
+TERM = "term"
+IDENTIFIER = "identifier"
+
+CACHE_TTL_SECONDS: dict[str, float] = {
+    AUTOCOMPLETE: float(os.getenv("PUBCHEM_CACHE_AUTOCOMPLETE_TTL", "604800")),
+    TERM: float(os.getenv("PUBCHEM_CACHE_TERM_TTL", "2592000")),
+    IDENTIFIER: float(os.getenv("PUBCHEM_CACHE_IDENTIFIER_TTL", "2592000")),
+}
+CACHE_NEGATIVE_TTL = float(os.getenv("PUBCHEM_CACHE_NEGATIVE_TTL", "86400"))
+CACHE_MEMORY_MAX_ENTRIES = int(os.getenv("PUBCHEM_CACHE_MEMORY_MAX_ENTRIES", "5000"))
+CACHE_PERSISTENT_MAX_ROWS = int(os.getenv("PUBCHEM_CACHE_MAX_ROWS", "200000"))
+CACHE_PERSISTENT = os.getenv("PUBCHEM_CACHE_PERSISTENT", "true").lower() == "true"
+CACHE_EVICT_INTERVAL = float(os.getenv("PUBCHEM_CACHE_EVICT_INTERVAL", "3600"))
+
+
+def normalize_term(term: str) -> str:
+    """Normalize a search term for cache keys (PubChem names are case-insensitive)."""
+    return " ".join(term.split()).lower()
+
+
+class LRUCache:
+    """A size-bounded LRU mapping whose entries expire after a per-entry TTL."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Any) -> tuple[bool, Any]:
+        """Return (found, value), dropping the entry if it has expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: Any, value: Any, expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class CompoundCache:
+    """Cache of PubChem autocomplete, name->CID and identifier->CID lookups.
+
+    Reads check the in-process LRU first, then the ``compound_cache`` table.
+    Postgres errors are logged and treated as misses so a database hiccup
+    never breaks a compound lookup.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = CACHE_MEMORY_MAX_ENTRIES,
+        persistent: bool = CACHE_PERSISTENT,
+        max_rows: int = CACHE_PERSISTENT_MAX_ROWS,
+        evict_interval: float = CACHE_EVICT_INTERVAL,
+    ) -> None:
+        self.memory = LRUCache(max_entries)
+        self.persistent = persistent
+        self.max_rows = max_rows
+        self.evict_interval = evict_interval
+        self._evictor: asyncio.Task | None = None
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    def _ttl_for(self, kind: str, value: Any) -> float:
+        return CACHE_TTL_SECONDS[kind] if value else CACHE_NEGATIVE_TTL
+
+    async def get_many(self, kind: str, keys: list[str]) -> dict[str, Any]:
+        """Return cached values for the given keys; missing keys are omitted."""
+        found: dict[str, Any] = {}
+        missing: list[str] = []
+        for key in dict.fromkeys(keys):
+            hit, value = self.memory.get((kind, key))
+            if hit:
+                found[key] = value
+                self.memory_hits += 1
+            else:
+                missing.append(key)
+
+        if missing and self.persistent:
+            try:
+                async with get_session() as session:
+                    result = await session.execute(
+                        select(CompoundCacheEntry).where(
+                            CompoundCacheEntry.kind == kind,
+                            CompoundCacheEntry.key.in_(missing),
+                            CompoundCacheEntry.expires_at > datetime.utcnow(),
+                        )
+                    )
+                    rows = result.scalars().all()
+            except Exception:
+                logger.warning("Compound cache read failed", exc_info=True)
+                rows = []
+
+            for row in rows:
+                found[row.key] = row.value
+                expires_at = row.expires_at.replace(tzinfo=None)
+                self.memory.set(
+                    (kind, row.key),
+                    row.value,
+                    time.time() + (expires_at - datetime.utcnow()).total_seconds(),
+                )
+                self.persistent_hits += 1
+
+        self.misses += sum(1 for key in missing if key not in found)
+        return found
+
+    async def set_many(self, kind: str, values: dict[str, Any]) -> None:
+        """Store values in both tiers, using the negative TTL for empty results."""
+        if not values:
+            return
+
+        now = datetime.utcnow()
+        rows = []
+        for key, value in values.items():
+            ttl = self._ttl_for(kind, value)
+            self.memory.set((kind, key), value, time.time() + ttl)
+            rows.append(
+                {
+                    "kind": kind,
+                    "key": key,
+                    "value": value,
+                    "created_at": now,
+                    "expires_at": now + timedelta(seconds=ttl),
+                }
+            )
+
+        if not self.persistent:
+            return
+
+        table = CompoundCacheEntry.__table__
+        statement = insert(table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.kind, table.c.key],
+            set_={
+                "value": statement.excluded.value,
+                "created_at": statement.excluded.created_at,
+                "expires_at": statement.excluded.expires_at,
+            },
+        )
+        try:
+            async with get_session() as session:
+                await session.execute(statement)
+        except Exception:
+            logger.warning("Compound cache write failed", exc_info=True)
+
+    async def evict(self) -> int:
+        """Delete expired rows, then the oldest rows beyond ``max_rows``."""
+        if not self.persistent:
+            return 0
+
+        table = CompoundCacheEntry.__table__
+        try:
+            async with get_session() as session:
+                expired = await session.execute(
+                    delete(table).where(table.c.expires_at <= datetime.utcnow())
+                )
+                overflow_keys = (
+                    select(table.c.kind, table.c.key)
+                    .order_by(table.c.created_at.desc())
+                    .offset(self.max_rows)
+                )
+                overflow = await session.execute(
+                    delete(table).where(
+                        tuple_(table.c.kind, table.c.key).in_(overflow_keys)
+                    )
+                )
+                return expired.rowcount + overflow.rowcount
+        except Exception:
+            logger.warning("Compound cache eviction failed", exc_info=True)
+            return 0
+
+    def start(self) -> None:
+        """Evict now and then every ``evict_interval`` seconds, until stopped."""
+        if self._evictor is None or self._evictor.done():
+            self._evictor = asyncio.create_task(self._evict_periodically())
+
+    async def stop(self) -> None:
+        if self._evictor is not None:
+            self._evictor.cancel()
+            try:
+                await self._evictor
+            except asyncio.CancelledError:
+                pass
+            self._evictor = None
+
+    async def _evict_periodically(self) -> None:
+        while True:
+            evicted = await self.evict()
+            if evicted:
+                logger.info("Evicted %d compound cache rows", evicted)
+            await asyncio.sleep(self.evict_interval)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "memory_entries": len(self.memory),
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+        }
+
+
+compound_cache = CompoundCache()
@@ -0,0 +1,63 @@
+"""Shared, pooled HTTP client for PubChem, owned by the server lifespan."""
+
+import importlib.util
+import logging
+import os
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+PUBCHEM_MAX_CONNECTIONS = int(os.getenv("PUBCHEM_MAX_CONNECTIONS", "20"))
+PUBCHEM_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.getenv("PUBCHEM_MAX_KEEPALIVE_CONNECTIONS", "10")
+)
+PUBCHEM_KEEPALIVE_EXPIRY = float(os.getenv("PUBCHEM_KEEPALIVE_EXPIRY", "60"))
+PUBCHEM_CONNECT_TIMEOUT = float(os.getenv("PUBCHEM_CONNECT_TIMEOUT", "5"))
+PUBCHEM_HTTP2 = os.getenv("PUBCHEM_HTTP2", "false").lower() == "true"
+
+_client: httpx.AsyncClient | None = None
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional ``h2`` package (``pip install httpx[http2]``)."""
+    return importlib.util.find_spec("h2") is not None
+
+
+async def open_client() -> httpx.AsyncClient:
+    """Create the shared client. Call once from the server lifespan."""
+    global _client
+    if _client is not None:
+        return _client
+
+    http2 = PUBCHEM_HTTP2
+    if http2 and not _http2_available():
+        logger.warning("PUBCHEM_HTTP2 is set but h2 is not installed; using HTTP/1.1")
+        http2 = False
+
+    _client = httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=PUBCHEM_MAX_CONNECTIONS,
+            max_keepalive_connections=PUBCHEM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=PUBCHEM_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(15.0, connect=PUBCHEM_CONNECT_TIMEOUT),
+        headers={"User-Agent": "labasi-mcp/0.1"},
+    )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client and its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared client opened by the server lifespan."""
+    if _client is None:
+        raise RuntimeError("PubChem HTTP client is not open. Call open_client() first.")
+    return _client
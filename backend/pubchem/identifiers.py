@@ -0,0 +1,68 @@
+"""Recognize structured compound identifiers typed in place of a name.
+
+CIDs, InChIKeys, SMILES strings and CAS registry numbers can each be
+resolved by PubChem in one request, so ``search_compound`` sends them
+straight to the matching endpoint instead of through name variations and
+autocomplete.
+"""
+
+import re
+
+# Identifier kinds, also used in the canonical-identifier cache keys
+CID_IDENTIFIER = "cid"
+INCHIKEY_IDENTIFIER = "inchikey"
+SMILES_IDENTIFIER = "smiles"
+CAS_IDENTIFIER = "cas"
+
+_CID_RE = re.compile(r"(?:cid\s*:?\s*)?(\d{1,10})", re.IGNORECASE)
+_INCHIKEY_RE = re.compile(r"(?:inchikey=)?([A-Z]{14}-[A-Z]{10}-[A-Z])", re.IGNORECASE)
+_CAS_RE = re.compile(r"(?:cas\s*:?\s*)?(\d{2,7})-(\d{2})-(\d)", re.IGNORECASE)
+# One SMILES token: a bracket atom, an organic-subset atom, a bond, a branch
+# or a ring closure
+_SMILES_TOKEN = r"\[[^\[\]\s]+\]|Br|Cl|[BCNOPSFI]|[bcnops]|[-=#$:/\\.()+@*]|%\d{2}|\d"
+_SMILES_RE = re.compile(rf"(?:{_SMILES_TOKEN})+")
+_SMILES_STRUCTURE = set("()[]=#$@/\\%.0123456789")
+
+
+def _is_cas(digits: str, check: str) -> bool:
+    """Validate a CAS number's check digit."""
+    total = sum(int(d) * i for i, d in enumerate(reversed(digits), start=1))
+    return total % 10 == int(check)
+
+
+def _looks_like_smiles(text: str) -> bool:
+    """A SMILES string: only SMILES tokens, and not something a name could be.
+
+    Letters-only strings such as "CO", "NOS" or "CNS" are names and acronyms
+    far more often than SMILES, so at least one bond, branch, ring or bracket
+    is required.
+    """
+    if not _SMILES_RE.fullmatch(text) or not any(c.isalpha() for c in text):
+        return False
+    return bool(_SMILES_STRUCTURE & set(text))
+
+
+def parse_identifier(text: str) -> tuple[str, str] | None:
+    """Return (kind, canonical value) if ``text`` is a structured identifier."""
+    text = text.strip()
+    if match := _CID_RE.fullmatch(text):
+        return CID_IDENTIFIER, str(int(match.group(1)))
+    if match := _INCHIKEY_RE.fullmatch(text):
+        return INCHIKEY_IDENTIFIER, match.group(1).upper()
+    if (match := _CAS_RE.fullmatch(text)) and _is_cas(
+        match.group(1) + match.group(2), match.group(3)
+    ):
+        return CAS_IDENTIFIER, "-".join(match.groups())
+    if " " not in text and _looks_like_smiles(text):
+        return SMILES_IDENTIFIER, text
+    return None
+
+
+def may_be_name(text: str) -> bool:
+    """True if ``text`` may be a name even though it parses as an identifier.
+
+    SMILES strings and bare numbers (a CID without the "CID" prefix) are
+    searched as names too when PubChem does not know them as identifiers.
+    """
+    text = text.strip()
+    return text.isdigit() or parse_identifier(text) == (SMILES_IDENTIFIER, text)
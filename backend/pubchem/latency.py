@@ -0,0 +1,86 @@
+"""Per-endpoint latency tracking for adaptive timeouts and hedged requests.
+
+The scheduler records how long each PubChem endpoint takes to answer. Once
+an endpoint has enough samples, its timeout follows the observed tail
+(p99 times a safety factor, clamped to a range) instead of a fixed value,
+and a request that is still running after the endpoint's p95 is hedged:
+a duplicate is sent and whichever answers first wins.
+"""
+
+import math
+import os
+from collections import deque
+
+PUBCHEM_ADAPTIVE_TIMEOUTS = (
+    os.getenv("PUBCHEM_ADAPTIVE_TIMEOUTS", "true").lower() == "true"
+)
+PUBCHEM_TIMEOUT_MIN = float(os.getenv("PUBCHEM_TIMEOUT_MIN", "2"))
+PUBCHEM_TIMEOUT_MAX = float(os.getenv("PUBCHEM_TIMEOUT_MAX", "15"))
+PUBCHEM_TIMEOUT_FACTOR = float(os.getenv("PUBCHEM_TIMEOUT_FACTOR", "3"))
+PUBCHEM_HEDGE_PERCENTILE = float(os.getenv("PUBCHEM_HEDGE_PERCENTILE", "95"))
+PUBCHEM_LATENCY_WINDOW = int(os.getenv("PUBCHEM_LATENCY_WINDOW", "200"))
+PUBCHEM_LATENCY_MIN_SAMPLES = int(os.getenv("PUBCHEM_LATENCY_MIN_SAMPLES", "20"))
+
+
+def percentile(samples: list[float], p: float) -> float:
+    """Nearest-rank percentile of ``samples`` (which must not be empty)."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class LatencyTracker:
+    """Sliding window of response times per endpoint."""
+
+    def __init__(
+        self,
+        window: int = PUBCHEM_LATENCY_WINDOW,
+        min_samples: int = PUBCHEM_LATENCY_MIN_SAMPLES,
+        adaptive: bool = PUBCHEM_ADAPTIVE_TIMEOUTS,
+    ) -> None:
+        self.window = window
+        self.min_samples = min_samples
+        self.adaptive = adaptive
+        self._samples: dict[str, deque[float]] = {}
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        samples = self._samples.get(endpoint)
+        if samples is None:
+            samples = self._samples[endpoint] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def percentile(self, endpoint: str, p: float) -> float | None:
+        """Latency percentile, or None until the endpoint has enough samples."""
+        samples = self._samples.get(endpoint)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        return percentile(list(samples), p)
+
+    def timeout(self, endpoint: str, default: float | None) -> float | None:
+        """Timeout for the next request: ``default`` until enough samples exist."""
+        p99 = self.percentile(endpoint, 99) if self.adaptive else None
+        if p99 is None:
+            return default
+        return min(
+            max(p99 * PUBCHEM_TIMEOUT_FACTOR, PUBCHEM_TIMEOUT_MIN), PUBCHEM_TIMEOUT_MAX
+        )
+
+    def hedge_delay(self, endpoint: str) -> float | None:
+        """Seconds after which a still-running request is hedged (None: don't)."""
+        return self.percentile(endpoint, PUBCHEM_HEDGE_PERCENTILE)
+
+    def stats(self) -> dict[str, dict]:
+        stats = {}
+        for endpoint, samples in sorted(self._samples.items()):
+            values = list(samples)
+            timeout = self.timeout(endpoint, None)
+            hedge_after = self.hedge_delay(endpoint)
+            stats[endpoint] = {
+                "samples": len(values),
+                "p50_seconds": round(percentile(values, 50), 4),
+                "p95_seconds": round(percentile(values, 95), 4),
+                "p99_seconds": round(percentile(values, 99), 4),
+                "timeout_seconds": timeout and round(timeout, 4),
+                "hedge_after_seconds": hedge_after and round(hedge_after, 4),
+            }
+        return stats
@@ -0,0 +1,123 @@
+"""Offline compound index, checked before PubChem is contacted.
+
+The index lives in the ``compound_index`` and ``compound_synonyms`` tables
+and is filled by ``import_compounds.py`` from PubChem dump files or a
+curated reagent list. Lookups never raise: if the database is unavailable
+the index reports no matches and the caller falls back to PubChem.
+"""
+
+import logging
+import os
+
+from sqlalchemy import func, select
+
+from db import CompoundIndexEntry, CompoundSynonym, get_session
+
+from .cache import normalize_term
+
+logger = logging.getLogger(__name__)
+
+LOCAL_INDEX_ENABLED = os.getenv("PUBCHEM_LOCAL_INDEX", "true").lower() == "true"
+LOCAL_INDEX_FUZZY_THRESHOLD = float(os.getenv("PUBCHEM_LOCAL_INDEX_FUZZY", "0.45"))
+LOCAL_INDEX_MAX_MATCHES = 3
+
+
+class LocalCompoundIndex:
+    """Exact, prefix and trigram matching over locally indexed compound names."""
+
+    def __init__(self, enabled: bool = LOCAL_INDEX_ENABLED) -> None:
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    async def _rows(self, statement) -> list:
+        try:
+            async with get_session() as session:
+                result = await session.execute(statement)
+                return list(result.all())
+        except Exception:
+            logger.warning("Local compound index lookup failed", exc_info=True)
+            return []
+
+    def _synonym_query(self):
+        return select(
+            CompoundSynonym.name,
+            CompoundSynonym.display_name,
+            CompoundSynonym.cid,
+            CompoundIndexEntry,
+        ).outerjoin(CompoundIndexEntry, CompoundIndexEntry.cid == CompoundSynonym.cid)
+
+    async def find_exact(self, names: list[str]) -> dict[str, list[dict]]:
+        """Return property records of compounds whose name or synonym equals a name."""
+        if not self.enabled:
+            return {}
+
+        keys = {normalize_term(name): name for name in names}
+        rows = await self._rows(
+            self._synonym_query()
+            .where(CompoundSynonym.name.in_(keys))
+            .order_by(CompoundSynonym.cid)
+        )
+
+        matches: dict[str, list[dict]] = {}
+        for key, _, cid, entry in rows:
+            records = matches.setdefault(keys[key], [])
+            if len(records) < LOCAL_INDEX_MAX_MATCHES:
+                records.append(entry.to_properties() if entry else {"CID": cid})
+
+        self.hits += len(matches)
+        self.misses += len(keys) - len(matches)
+        return matches
+
+    async def find_similar(self, name: str, limit: int = 5) -> list[tuple[str, dict]]:
+        """Return (matched name, properties) for prefix matches, else trigram matches."""
+        if not self.enabled:
+            return []
+
+        key = normalize_term(name)
+        escaped = key.replace("\\", "\\\\").replace("%", r"\%").replace("_", r"\_")
+        rows = await self._rows(
+            self._synonym_query()
+            .where(CompoundSynonym.name.like(f"{escaped}%"))
+            .order_by(func.length(CompoundSynonym.name))
+            .limit(limit)
+        )
+        if not rows:
+            similarity = func.similarity(CompoundSynonym.name, key)
+            rows = await self._rows(
+                self._synonym_query()
+                .where(CompoundSynonym.name.op("%")(key))
+                .where(similarity >= LOCAL_INDEX_FUZZY_THRESHOLD)
+                .order_by(similarity.desc())
+                .limit(limit)
+            )
+        return [
+            (display_name, entry.to_properties() if entry else {"CID": cid})
+            for _, display_name, cid, entry in rows
+        ]
+
+    async def by_cids(self, cids: list[int]) -> dict[int, dict]:
+        """Return indexed properties for the given CIDs."""
+        if not self.enabled or not cids:
+            return {}
+        rows = await self._rows(
+            select(CompoundIndexEntry).where(CompoundIndexEntry.cid.in_(cids))
+        )
+        return {entry.cid: entry.to_properties() for (entry,) in rows}
+
+    async def by_inchikey(self, inchi_key: str) -> list[dict]:
+        """Return indexed compounds with the given InChIKey."""
+        if not self.enabled:
+            return []
+        rows = await self._rows(
+            select(CompoundIndexEntry).where(
+                CompoundIndexEntry.inchi_key == inchi_key.upper()
+            )
+        )
+        return [entry.to_properties() for (entry,) in rows]
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+local_compound_index = LocalCompoundIndex()
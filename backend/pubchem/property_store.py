@@ -0,0 +1,157 @@
+"""Durable per-CID store of full PubChem property records.
+
+A compound's computed properties (weight, XLogP, TPSA, hydrogen bond
+counts, ...) practically never change, so every record fetched from
+PubChem is kept in ``compound_properties`` and served from there, with an
+in-process LRU in front. Follow-up property questions about a compound
+that was looked up before, in this or an earlier session, therefore need
+no PubChem request.
+"""
+
+import logging
+import math
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from db import CompoundProperties, get_session
+
+from .cache import CACHE_MEMORY_MAX_ENTRIES, CACHE_PERSISTENT, LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Properties requested from PubChem for every compound, in one call
+PROPERTY_NAMES = (
+    "Title",
+    "IUPACName",
+    "MolecularFormula",
+    "MolecularWeight",
+    "ExactMass",
+    "SMILES",
+    "InChIKey",
+    "XLogP",
+    "TPSA",
+    "HBondDonorCount",
+    "HBondAcceptorCount",
+    "RotatableBondCount",
+    "HeavyAtomCount",
+    "Charge",
+    "Complexity",
+)
+# PubChem computes these for every compound, so a record without them came
+# from a partial source (the offline index or an older, smaller property set)
+REQUIRED_PROPERTIES = ("MolecularWeight", "HBondDonorCount", "HBondAcceptorCount")
+
+PROPERTY_STORE_MAX_AGE_DAYS = float(
+    os.getenv("PUBCHEM_PROPERTY_STORE_MAX_AGE_DAYS", "365")
+)
+
+
+def has_full_properties(record: dict) -> bool:
+    """True if ``record`` is a full property record, not a partial one."""
+    return all(name in record for name in REQUIRED_PROPERTIES)
+
+
+class PropertyStore:
+    """Full property records by CID: an in-process LRU in front of Postgres.
+
+    Records older than ``max_age_days`` are treated as missing so they are
+    refreshed. Postgres errors are logged and treated as misses.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = CACHE_MEMORY_MAX_ENTRIES,
+        persistent: bool = CACHE_PERSISTENT,
+        max_age_days: float = PROPERTY_STORE_MAX_AGE_DAYS,
+    ) -> None:
+        self.memory = LRUCache(max_entries)
+        self.persistent = persistent
+        self.max_age_days = max_age_days
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    async def get_many(self, cids: list[int]) -> dict[int, dict]:
+        """Return stored records for the given CIDs; missing CIDs are omitted."""
+        found: dict[int, dict] = {}
+        missing: list[int] = []
+        for cid in dict.fromkeys(cids):
+            hit, record = self.memory.get(cid)
+            if hit:
+                found[cid] = record
+                self.memory_hits += 1
+            else:
+                missing.append(cid)
+
+        if missing and self.persistent:
+            oldest = datetime.utcnow() - timedelta(days=self.max_age_days)
+            try:
+                async with get_session() as session:
+                    result = await session.execute(
+                        select(CompoundProperties).where(
+                            CompoundProperties.cid.in_(missing),
+                            CompoundProperties.fetched_at > oldest,
+                        )
+                    )
+                    rows = result.scalars().all()
+            except Exception:
+                logger.warning("Compound property store read failed", exc_info=True)
+                rows = []
+
+            for row in rows:
+                found[row.cid] = row.properties
+                self.memory.set(row.cid, row.properties, math.inf)
+                self.persistent_hits += 1
+
+        self.misses += sum(1 for cid in missing if cid not in found)
+        return found
+
+    async def put_many(self, records: dict[int, dict]) -> None:
+        """Store full property records; partial records are ignored."""
+        records = {
+            cid: record
+            for cid, record in records.items()
+            if has_full_properties(record)
+        }
+        if not records:
+            return
+
+        for cid, record in records.items():
+            self.memory.set(cid, record, math.inf)
+        if not self.persistent:
+            return
+
+        now = datetime.utcnow()
+        table = CompoundProperties.__table__
+        statement = insert(table).values(
+            [
+                {"cid": cid, "properties": record, "fetched_at": now}
+                for cid, record in records.items()
+            ]
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.cid],
+            set_={
+                "properties": statement.excluded.properties,
+                "fetched_at": statement.excluded.fetched_at,
+            },
+        )
+        try:
+            async with get_session() as session:
+                await session.execute(statement)
+        except Exception:
+            logger.warning("Compound property store write failed", exc_info=True)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "memory_entries": len(self.memory),
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+        }
+
+
+compound_property_store = PropertyStore()
@@ -0,0 +1,422 @@
+"""Central scheduler for PubChem requests: rate limiting, priorities and retries.
+
+PubChem allows roughly 5 requests per second per client and answers bursts
+above that with HTTP 503 (PUGREST.ServerBusy). Every PubChem request goes
+through ``pubchem_scheduler`` so that concurrent tool calls share one token
+bucket, important requests jump the queue and throttled requests are retried
+instead of being reported as "not found".
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+import httpx
+
+from telemetry import pubchem_request_duration, pubchem_requests, span
+
+from .http import get_client
+from .latency import LatencyTracker
+from .singleflight import pubchem_singleflight
+
+logger = logging.getLogger(__name__)
+
+PUBCHEM_RATE_LIMIT = float(os.getenv("PUBCHEM_RATE_LIMIT", "5"))
+PUBCHEM_BURST = int(os.getenv("PUBCHEM_BURST", "5"))
+PUBCHEM_MAX_CONCURRENT = int(os.getenv("PUBCHEM_MAX_CONCURRENT", "10"))
+PUBCHEM_MAX_RETRIES = int(os.getenv("PUBCHEM_MAX_RETRIES", "3"))
+PUBCHEM_BACKOFF_BASE = float(os.getenv("PUBCHEM_BACKOFF_BASE", "0.5"))
+PUBCHEM_BACKOFF_MAX = float(os.getenv("PUBCHEM_BACKOFF_MAX", "8"))
+# Seconds one request may take in total, with its queueing, retries and backoff
+PUBCHEM_REQUEST_BUDGET = float(os.getenv("PUBCHEM_REQUEST_BUDGET", "20"))
+PUBCHEM_HEDGE = os.getenv("PUBCHEM_HEDGE", "true").lower() == "true"
+PUBCHEM_HEDGE_MAX_RATIO = float(os.getenv("PUBCHEM_HEDGE_MAX_RATIO", "0.1"))
+
+RETRY_STATUS_CODES = {429, 503}
+
+
+class Priority(IntEnum):
+    """Request priority; lower values are sent first."""
+
+    PROPERTIES = 0
+    EXACT = 1
+    AUTOCOMPLETE = 2
+    VARIATION = 3
+
+
+class PubChemError(Exception):
+    """Base error for PubChem requests that could not be completed."""
+
+
+class PubChemThrottledError(PubChemError):
+    """PubChem kept throttling (or failing) a request after all retries."""
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate`` tokens per second."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for a while, e.g. after a throttling response."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+    def delay(self) -> float:
+        """Seconds until a token is available (0 if one is available now)."""
+        self._refill()
+        pause = self.paused_until - time.monotonic()
+        if pause > 0:
+            return pause
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self._refill()
+        self.tokens -= 1
+
+
+@dataclass(order=True)
+class _QueuedRequest:
+    priority: int
+    sequence: int
+    enqueued_at: float = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+@dataclass
+class SchedulerStats:
+    requests: int = 0
+    retries: int = 0
+    throttled: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+    max_queue_depth: int = 0
+    total_wait_seconds: float = 0.0
+
+
+class RequestScheduler:
+    """Dispatches PubChem requests through a priority queue and token bucket."""
+
+    def __init__(
+        self,
+        rate: float = PUBCHEM_RATE_LIMIT,
+        burst: int = PUBCHEM_BURST,
+        max_concurrent: int = PUBCHEM_MAX_CONCURRENT,
+        max_retries: int = PUBCHEM_MAX_RETRIES,
+        hedge: bool = PUBCHEM_HEDGE,
+        hedge_max_ratio: float = PUBCHEM_HEDGE_MAX_RATIO,
+        request_budget: float = PUBCHEM_REQUEST_BUDGET,
+    ) -> None:
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.request_budget = request_budget
+        self.hedge = hedge
+        self.hedge_max_ratio = hedge_max_ratio
+        self.latency = LatencyTracker()
+        self.stats_counters = SchedulerStats()
+        self._concurrency = asyncio.Semaphore(max_concurrent)
+        self._queue: list[_QueuedRequest] = []
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._dispatcher: asyncio.Task | None = None
+        self._in_flight = 0
+
+    def start(self) -> None:
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def stop(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+        for queued in self._queue:
+            queued.future.cancel()
+        self._queue.clear()
+
+    async def _dispatch(self) -> None:
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            delay = self.bucket.delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            queued = heapq.heappop(self._queue)
+            if queued.future.done():
+                continue
+            self.bucket.take()
+            self.stats_counters.total_wait_seconds += (
+                time.monotonic() - queued.enqueued_at
+            )
+            queued.future.set_result(None)
+
+    async def _acquire(self, priority: Priority) -> None:
+        """Wait until the dispatcher grants this request a token."""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._queue,
+            _QueuedRequest(priority, next(self._sequence), time.monotonic(), future),
+        )
+        self.stats_counters.max_queue_depth = max(
+            self.stats_counters.max_queue_depth, len(self._queue)
+        )
+        self._wakeup.set()
+        await future
+
+    def _backoff(self, attempt: int, response: httpx.Response | None) -> float:
+        retry_after = response.headers.get("Retry-After") if response else None
+        if retry_after:
+            try:
+                return min(float(retry_after), PUBCHEM_BACKOFF_MAX)
+            except ValueError:
+                pass
+        delay = min(PUBCHEM_BACKOFF_BASE * 2**attempt, PUBCHEM_BACKOFF_MAX)
+        return delay * (0.5 + random.random() / 2)
+
+    def _observe_load(self, response: httpx.Response) -> None:
+        """Slow down when PubChem reports it is close to throttling us."""
+        # PubChem reports load as e.g. "Request Count status: Yellow (60%), ..."
+        control = response.headers.get("X-Throttling-Control", "")
+        if "Black" in control:
+            self.bucket.pause(PUBCHEM_BACKOFF_MAX)
+        elif "Red" in control:
+            self.bucket.pause(1.0)
+
+    async def _attempt(
+        self,
+        method: str,
+        url: str,
+        endpoint: str,
+        priority: Priority,
+        sent: asyncio.Event | None = None,
+        **kwargs,
+    ) -> httpx.Response | None:
+        """Send one request once a token is granted; None on a transport error.
+
+        ``sent`` is set when the request leaves, after the token and a
+        connection slot were granted.
+        """
+        with span(f"pubchem {endpoint}", method=method, url=url) as attempt:
+            queued = time.monotonic()
+            await self._acquire(priority)
+            async with self._concurrency:
+                self._in_flight += 1
+                self.stats_counters.requests += 1
+                started = time.monotonic()
+                if attempt is not None:
+                    attempt.set(queue_wait_ms=round((started - queued) * 1000, 3))
+                if sent is not None:
+                    sent.set()
+                try:
+                    response = await get_client().request(method, url, **kwargs)
+                except httpx.TimeoutException:
+                    self.stats_counters.timeouts += 1
+                    # Record the timeout itself so a slow endpoint's timeout grows
+                    elapsed = time.monotonic() - started
+                    self.latency.record(endpoint, elapsed)
+                    pubchem_request_duration.observe(elapsed, endpoint=endpoint)
+                    pubchem_requests.inc(endpoint=endpoint, status="timeout")
+                    if attempt is not None:
+                        attempt.set(status="timeout")
+                    return None
+                except httpx.TransportError:
+                    pubchem_requests.inc(endpoint=endpoint, status="transport_error")
+                    if attempt is not None:
+                        attempt.set(status="transport_error")
+                    return None
+                finally:
+                    self._in_flight -= 1
+            elapsed = time.monotonic() - started
+            self.latency.record(endpoint, elapsed)
+            pubchem_request_duration.observe(elapsed, endpoint=endpoint)
+            pubchem_requests.inc(endpoint=endpoint, status=str(response.status_code))
+            if attempt is not None:
+                attempt.set(status=response.status_code)
+            return response
+
+    def _may_hedge(self) -> bool:
+        counters = self.stats_counters
+        return self.hedge and counters.hedged < counters.requests * self.hedge_max_ratio
+
+    async def _send(
+        self, method: str, url: str, endpoint: str, priority: Priority, **kwargs
+    ) -> httpx.Response | None:
+        """Send a request, hedging it if it runs past the endpoint's p95 latency.
+
+        The hedge delay counts from when the primary request is sent, so time
+        spent waiting for a token is never hedged. The first usable response
+        wins and the other attempt is cancelled. Hedges are capped at
+        ``hedge_max_ratio`` of all requests and take a token like any other
+        request, so they cannot break the rate limit.
+        """
+        hedge_after = self.latency.hedge_delay(endpoint)
+        if hedge_after is None or not self._may_hedge():
+            return await self._attempt(method, url, endpoint, priority, **kwargs)
+
+        sent = asyncio.Event()
+        primary = asyncio.create_task(
+            self._attempt(method, url, endpoint, priority, sent=sent, **kwargs)
+        )
+        sending = asyncio.create_task(sent.wait())
+        pending = {primary, sending}
+        fallback: httpx.Response | None = None
+        try:
+            await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            sending.cancel()
+            pending = {primary}
+            done, _ = await asyncio.wait(pending, timeout=hedge_after)
+            if done:
+                return primary.result()
+
+            self.stats_counters.hedged += 1
+            hedge = asyncio.create_task(
+                self._attempt(method, url, endpoint, priority, **kwargs)
+            )
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    response = task.result()
+                    if response is None:
+                        continue
+                    if response.status_code in RETRY_STATUS_CODES:
+                        fallback = response
+                        continue
+                    if task is hedge:
+                        self.stats_counters.hedge_wins += 1
+                    return response
+            return fallback
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        priority: Priority = Priority.VARIATION,
+        endpoint: str = "default",
+        timeout: float | None = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """Send a request once the scheduler allows it, retrying throttled attempts.
+
+        Throttled responses pause the shared token bucket, so every queued
+        request backs off, not just the one that was rejected. ``timeout``
+        is used until ``endpoint`` has enough latency samples; after that the
+        timeout adapts to the endpoint's observed tail latency. Queueing,
+        attempts and backoff together are limited to ``request_budget``
+        seconds. Raises PubChemThrottledError when PubChem is still
+        throttling or unreachable after ``max_retries`` retries or when the
+        budget runs out.
+        """
+        response: httpx.Response | None = None
+        give_up_at = time.monotonic() + self.request_budget
+
+        for attempt in range(self.max_retries + 1):
+            remaining = give_up_at - time.monotonic()
+            if remaining <= 0:
+                break
+            if attempt:
+                self.stats_counters.retries += 1
+
+            adaptive_timeout = self.latency.timeout(endpoint, timeout)
+            if adaptive_timeout is not None:
+                kwargs["timeout"] = min(adaptive_timeout, remaining)
+            try:
+                async with asyncio.timeout(remaining):
+                    response = await self._send(
+                        method, url, endpoint, priority, **kwargs
+                    )
+            except TimeoutError:
+                response = None
+                break
+            if response is None:
+                delay = self._backoff(attempt, None)
+                if time.monotonic() + delay >= give_up_at:
+                    break
+                await asyncio.sleep(delay)
+                continue
+
+            self._observe_load(response)
+            if response.status_code not in RETRY_STATUS_CODES:
+                return response
+
+            self.stats_counters.throttled += 1
+            self.bucket.pause(self._backoff(attempt, response))
+
+        self.stats_counters.failures += 1
+        status = response.status_code if response is not None else "no response"
+        logger.warning("PubChem request gave up (%s): %s", status, url)
+        raise PubChemThrottledError(
+            f"PubChem request failed after {attempt} retries ({status}): {url}"
+        )
+
+    async def get(
+        self, url: str, *, priority: Priority = Priority.VARIATION, **kwargs
+    ) -> httpx.Response:
+        """GET a URL; concurrent GETs of the same URL share one upstream request."""
+        return await pubchem_singleflight.do(
+            ("GET", url),
+            lambda: self.request("GET", url, priority=priority, **kwargs),
+        )
+
+    async def post(
+        self, url: str, *, priority: Priority = Priority.VARIATION, **kwargs
+    ) -> httpx.Response:
+        return await self.request("POST", url, priority=priority, **kwargs)
+
+    def stats(self) -> dict[str, float | int]:
+        counters = self.stats_counters
+        granted = counters.requests or 1
+        return {
+            "queue_depth": len(self._queue),
+            "max_queue_depth": counters.max_queue_depth,
+            "in_flight": self._in_flight,
+            "requests": counters.requests,
+            "retries": counters.retries,
+            "throttled": counters.throttled,
+            "failures": counters.failures,
+            "timeouts": counters.timeouts,
+            "hedged": counters.hedged,
+            "hedge_wins": counters.hedge_wins,
+            "avg_queue_wait_seconds": round(counters.total_wait_seconds / granted, 4),
+        }
+
+
+pubchem_scheduler = RequestScheduler()
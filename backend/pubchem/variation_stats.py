@@ -0,0 +1,171 @@
+"""Hit statistics per kind of search-term variation, used to budget the fan-out.
+
+Each term ``search_compound`` sends is labelled with the kind of variation
+that produced it ("original", "autocomplete", "upper", "word", ...). Terms
+of kinds that historically resolve to CIDs are sent first, kinds that
+almost never do are dropped and the total is capped at a budget. A dropped
+kind is still sent now and then, so its hit rate can recover if the
+queries change. Counts
+are kept in memory and periodically added to ``search_variation_stats``
+so they survive restarts and are shared between replicas.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from db import SearchVariationStat, get_session
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TERM_BUDGET = int(os.getenv("PUBCHEM_SEARCH_TERM_BUDGET", "12"))
+VARIATION_MIN_HIT_RATE = float(os.getenv("PUBCHEM_VARIATION_MIN_HIT_RATE", "0.05"))
+VARIATION_MIN_SAMPLES = int(os.getenv("PUBCHEM_VARIATION_MIN_SAMPLES", "30"))
+# Chance that a plan still sends the terms of a pruned kind
+VARIATION_EXPLORE_RATE = float(os.getenv("PUBCHEM_VARIATION_EXPLORE_RATE", "0.05"))
+VARIATION_FLUSH_INTERVAL = float(os.getenv("PUBCHEM_VARIATION_FLUSH_INTERVAL", "60"))
+
+# Kinds that are always sent: the user's own names and PubChem's suggestions
+ALWAYS_SEND = {"original", "autocomplete"}
+
+
+class VariationStats:
+    """Per-kind attempt and hit counters with a persisted running total."""
+
+    def __init__(
+        self,
+        budget: int = SEARCH_TERM_BUDGET,
+        min_hit_rate: float = VARIATION_MIN_HIT_RATE,
+        min_samples: int = VARIATION_MIN_SAMPLES,
+        explore_rate: float = VARIATION_EXPLORE_RATE,
+    ) -> None:
+        self.budget = budget
+        self.min_hit_rate = min_hit_rate
+        self.min_samples = min_samples
+        self.explore_rate = explore_rate
+        self.attempts: dict[str, int] = {}
+        self.hits: dict[str, int] = {}
+        self.pruned = 0
+        self._pending: dict[str, tuple[int, int]] = {}
+        self._flushed_at = time.monotonic()
+        self._flush_task: asyncio.Task | None = None
+
+    def hit_rate(self, kind: str) -> float:
+        """Smoothed hit rate; unseen kinds start at 0.5 so they get tried."""
+        return (self.hits.get(kind, 0) + 1) / (self.attempts.get(kind, 0) + 2)
+
+    def plan(self, terms: list[tuple[str, str]]) -> list[tuple[str, str]]:
+        """Order (term, kind) pairs by expected hit rate, prune and cap to the budget.
+
+        Kinds in ALWAYS_SEND keep their place at the front. A kind is only
+        pruned once it has ``min_samples`` attempts, so new kinds are explored,
+        and each pruned kind is still sent, ahead of the others, with
+        probability ``explore_rate``, so it is not pruned for good.
+        """
+        always = [t for t in terms if t[1] in ALWAYS_SEND]
+        candidates = [t for t in terms if t[1] not in ALWAYS_SEND]
+        explored = {
+            kind
+            for kind in {kind for _, kind in candidates}
+            if self.attempts.get(kind, 0) >= self.min_samples
+            and self.hit_rate(kind) < self.min_hit_rate
+            and random.random() < self.explore_rate
+        }
+        kept = [
+            t
+            for t in candidates
+            if self.attempts.get(t[1], 0) < self.min_samples
+            or self.hit_rate(t[1]) >= self.min_hit_rate
+            or t[1] in explored
+        ]
+        # Explored terms go first, or the budget would cut them every time
+        kept.sort(key=lambda t: (t[1] not in explored, -self.hit_rate(t[1])))
+        planned = (always + kept)[: self.budget]
+        self.pruned += len(terms) - len(planned)
+        return planned
+
+    def record(self, kind: str, hit: bool) -> None:
+        self.attempts[kind] = self.attempts.get(kind, 0) + 1
+        self.hits[kind] = self.hits.get(kind, 0) + int(hit)
+        attempts, hits = self._pending.get(kind, (0, 0))
+        self._pending[kind] = (attempts + 1, hits + int(hit))
+
+        if time.monotonic() - self._flushed_at >= VARIATION_FLUSH_INTERVAL and (
+            self._flush_task is None or self._flush_task.done()
+        ):
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def load(self) -> None:
+        """Load persisted totals. Call once on startup."""
+        try:
+            async with get_session() as session:
+                result = await session.execute(select(SearchVariationStat))
+                rows = result.scalars().all()
+        except Exception:
+            logger.warning("Could not load search variation stats", exc_info=True)
+            return
+        for row in rows:
+            self.attempts[row.kind] = self.attempts.get(row.kind, 0) + row.attempts
+            self.hits[row.kind] = self.hits.get(row.kind, 0) + row.hits
+
+    async def flush(self) -> None:
+        """Add the counts recorded since the last flush to the persisted totals."""
+        self._flushed_at = time.monotonic()
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        table = SearchVariationStat.__table__
+        statement = insert(table).values(
+            [
+                {
+                    "kind": kind,
+                    "attempts": attempts,
+                    "hits": hits,
+                    "updated_at": datetime.utcnow(),
+                }
+                for kind, (attempts, hits) in pending.items()
+            ]
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.kind],
+            set_={
+                "attempts": table.c.attempts + statement.excluded.attempts,
+                "hits": table.c.hits + statement.excluded.hits,
+                "updated_at": statement.excluded.updated_at,
+            },
+        )
+        try:
+            async with get_session() as session:
+                await session.execute(statement)
+        except Exception:
+            logger.warning("Could not persist search variation stats", exc_info=True)
+            # Keep the counts for the next flush
+            for kind, (attempts, hits) in pending.items():
+                new_attempts, new_hits = self._pending.get(kind, (0, 0))
+                self._pending[kind] = (attempts + new_attempts, hits + new_hits)
+
+    def stats(self) -> dict:
+        return {
+            "budget": self.budget,
+            "pruned_terms": self.pruned,
+            "kinds": {
+                kind: {
+                    "attempts": attempts,
+                    "hits": self.hits.get(kind, 0),
+                    "hit_rate": round(self.hit_rate(kind), 3),
+                }
+                for kind, attempts in sorted(
+                    self.attempts.items(), key=lambda item: -self.hit_rate(item[0])
+                )
+            },
+        }
+
+
+variation_stats = VariationStats()
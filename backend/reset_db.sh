@@ -1,6 +1,6 @@
 #!/bin/bash
 # Reset the database by dropping and recreating it
-# The next server startup will run init_db() which seeds demo data
+# Run migrate_db.py --seed (or restart docker compose) to recreate the schema and demo data
 
 set -e
 
@@ -15,4 +15,4 @@ docker compose exec postgres psql -U labasi -d postgres -c "
 docker compose exec postgres psql -U labasi -d postgres -c "DROP DATABASE IF EXISTS labasi;"
 docker compose exec postgres psql -U labasi -d postgres -c "CREATE DATABASE labasi;"
 
-echo "Database reset complete. Restart the backend to seed demo data."
+echo "Database reset complete. Run migrations (docker compose up migrate) to recreate the schema and demo data."
@@ -0,0 +1,120 @@
+"""Bulk-load fixtures or synthetic production-sized data into the database.
+
+Rows are streamed into Postgres with COPY (see db/bulk.py), so millions of
+messages load in seconds. Fixture directories hold one JSON array or NDJSON
+file (optionally gzipped) per table, named after the table: projects,
+conversation_sessions, conversation_messages, notes, note_revisions, todos,
+todo_revisions.
+
+Usage:
+  uv run python seed_data.py load demo_data/
+  uv run python seed_data.py generate --projects 20 --sessions 500 --messages 100
+  uv run python seed_data.py generate --projects 20 --out fixtures/   # write NDJSON.gz
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+
+from db import (
+    SyntheticDataset,
+    analyze_tables,
+    copy_records,
+    get_session,
+    load_fixtures,
+)
+
+
+def _json_default(value):
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def write_fixtures(dataset: SyntheticDataset, directory: Path) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    for table, records in dataset.tables().items():
+        path = directory / f"{table}.ndjson.gz"
+        count = 0
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, default=_json_default) + "\n")
+                count += 1
+        print(f"  {path}: {count} rows")
+
+
+async def load_dataset(dataset: SyntheticDataset) -> None:
+    async with get_session() as session:
+        for table, records in dataset.tables().items():
+            started = time.perf_counter()
+            count = await copy_records(session, table, records)
+            print(f"  {table}: {count} rows in {time.perf_counter() - started:.1f}s")
+        await analyze_tables(session, dataset.tables())
+
+
+async def load_directory(directory: Path) -> None:
+    async with get_session() as session:
+        counts = await load_fixtures(session, directory)
+        for table, count in counts.items():
+            print(f"  {table}: {count} rows")
+        await analyze_tables(session, counts)
+
+
+async def run(args: argparse.Namespace) -> None:
+    started = time.perf_counter()
+    if args.command == "load":
+        print(f"Loading fixtures from {args.directory}...")
+        await load_directory(args.directory)
+    else:
+        dataset = SyntheticDataset(
+            projects=args.projects,
+            sessions_per_project=args.sessions,
+            messages_per_session=args.messages,
+            notes_per_project=args.notes,
+            revisions_per_note=args.revisions,
+            todos_per_project=args.todos,
+            days=args.days,
+            seed=args.seed,
+        )
+        print(f"Generating {dataset.message_count} messages...")
+        if args.out:
+            write_fixtures(dataset, args.out)
+        else:
+            await load_dataset(dataset)
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    load = commands.add_parser("load", help="Load a directory of fixture files")
+    load.add_argument("directory", type=Path)
+
+    generate = commands.add_parser(
+        "generate", help="Generate synthetic data and load it (or write fixtures)"
+    )
+    generate.add_argument("--projects", type=int, default=10)
+    generate.add_argument("--sessions", type=int, default=20, help="Per project")
+    generate.add_argument("--messages", type=int, default=30, help="Per session")
+    generate.add_argument("--notes", type=int, default=50, help="Per project")
+    generate.add_argument("--revisions", type=int, default=2, help="Per note")
+    generate.add_argument("--todos", type=int, default=100, help="Per project")
+    generate.add_argument("--days", type=int, default=365, help="Time span covered")
+    generate.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Same seed, same data; use a new seed to add another dataset",
+    )
+    generate.add_argument(
+        "--out", type=Path, help="Write NDJSON.gz fixtures here instead of loading"
+    )
+
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+from .database import describe_statement, instrument_engine
+from .metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    Registry,
+    metrics_registry,
+    pubchem_lookup_errors,
+    pubchem_request_duration,
+    pubchem_requests,
+)
+from .middleware import ToolMetricsMiddleware
+from .tracing import (
+    HANDLER_SPAN,
+    Span,
+    Tracer,
+    TracingMiddleware,
+    span,
+    start_span,
+    traced,
+    traced_handler,
+    tracer,
+)
+
+__all__ = [
+    "HANDLER_SPAN",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "Registry",
+    "Span",
+    "ToolMetricsMiddleware",
+    "Tracer",
+    "TracingMiddleware",
+    "describe_statement",
+    "instrument_engine",
+    "metrics_registry",
+    "pubchem_lookup_errors",
+    "pubchem_request_duration",
+    "pubchem_requests",
+    "span",
+    "start_span",
+    "traced",
+    "traced_handler",
+    "tracer",
+]
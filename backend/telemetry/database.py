@@ -0,0 +1,96 @@
+"""SQL statement timing and connection pool gauges for the metrics.
+
+Statements are timed with SQLAlchemy's cursor events and labelled by their
+type and the first table they name, which keeps the label set as small as
+the schema. Inside a traced tool call, each statement is also a span. The
+pool's state is read at each scrape.
+"""
+
+import functools
+import re
+import time
+from collections.abc import Callable
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .metrics import (
+    db_pool_checkouts,
+    db_pool_connections,
+    db_pool_timeouts,
+    db_pool_wait,
+    db_query_duration,
+    db_query_errors,
+    metrics_registry,
+)
+from .tracing import start_span
+
+_STARTED = "metrics_query_started"
+# Statement text kept on a span
+_SPAN_STATEMENT_LENGTH = 1000
+_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE|JOIN|TABLE)\s+"?([A-Za-z_]\w*)', re.I)
+_POOL_STATES = ("size", "checked_out", "checked_in", "overflow", "max_overflow")
+
+
+@functools.lru_cache(maxsize=1024)
+def describe_statement(statement: str) -> tuple[str, str]:
+    """The statement's type (its first keyword) and the first table it names."""
+    words = statement.split(None, 1)
+    kind = words[0].upper() if words else ""
+    match = _TABLE.search(statement)
+    return kind, match.group(1).lower() if match else ""
+
+
+def instrument_engine(
+    engine: Engine, get_pool_stats: Callable[[], dict[str, int | float]]
+) -> None:
+    """Time the engine's statements and export its pool stats at each scrape.
+
+    ``engine`` is the sync engine behind an async one; ``get_pool_stats``
+    returns the counters of ``db.get_pool_stats``.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        kind, table = describe_statement(statement)
+        span = start_span(
+            f"sql {kind} {table}".rstrip(),
+            statement=statement[:_SPAN_STATEMENT_LENGTH],
+        )
+        conn.info.setdefault(_STARTED, []).append((time.perf_counter(), span))
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started, span = conn.info[_STARTED].pop()
+        kind, table = describe_statement(statement)
+        db_query_duration.observe(
+            time.perf_counter() - started, statement=kind, table=table
+        )
+        if span is not None:
+            span.set(rows=cursor.rowcount)
+            span.finish()
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        conn = context.connection
+        if conn is not None and conn.info.get(_STARTED):
+            _, span = conn.info[_STARTED].pop()
+            if span is not None:
+                span.finish(context.original_exception)
+        kind, table = describe_statement(context.statement or "")
+        db_query_errors.inc(
+            statement=kind,
+            table=table,
+            error=type(context.original_exception).__name__,
+        )
+
+    def collect() -> None:
+        stats = get_pool_stats()
+        for state in _POOL_STATES:
+            if state in stats:
+                db_pool_connections.set(stats[state], state=state)
+        db_pool_checkouts.set(stats["checkouts"])
+        db_pool_timeouts.set(stats["timeouts"])
+        db_pool_wait.set(stats["wait_seconds"])
+
+    metrics_registry.add_collector(collect)
@@ -0,0 +1,236 @@
+"""Process metrics in the Prometheus text exposition format.
+
+Counters, gauges and histograms with labels, rendered for the server's
+/metrics route by ``metrics_registry.render()``. The server runs in one
+event loop, so updates need no locking. Values counted elsewhere (like the database pool
+counters) are copied in by collectors that run at each scrape.
+"""
+
+import math
+from collections.abc import Callable, Iterable
+
+# Seconds; spans fast cache hits to searches that wait out PubChem throttling
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)
+    )
+    return f"{{{pairs}}}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """A named metric with one value (or histogram) per combination of labels."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames=()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        return "\n".join(
+            [
+                f"# HELP {self.name} {self.documentation}",
+                f"# TYPE {self.name} {self.type}",
+                *self.samples(),
+            ]
+        )
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames=()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set the total, for counts kept elsewhere and copied in by a collector."""
+        self._values[self._key(labels)] = value
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterable[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames=(),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: a count per bucket (not cumulative), then sum and count
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        values = self._values.get(key)
+        if values is None:
+            values = self._values[key] = [0] * (len(self.buckets) + 2)
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                values[index] += 1
+                break
+        values[-2] += value
+        values[-1] += 1
+
+    def samples(self) -> Iterable[str]:
+        names = (*self.labelnames, "le")
+        for key, values in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, values, strict=False):
+                cumulative += count
+                labels = _labels(names, (*key, _number(bound)))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _labels(names, (*key, "+Inf"))
+            yield f"{self.name}_bucket{labels} {int(values[-1])}"
+            labels = _labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_number(values[-2])}"
+            yield f"{self.name}_count{labels} {int(values[-1])}"
+
+
+class Registry:
+    """The metrics of the process, in registration order."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+        self._collectors: list[Callable[[], None]] = []
+
+    def register[M: Metric](self, metric: M) -> M:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames=(),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collect: Callable[[], None]) -> None:
+        """Call ``collect`` before each render, to update metrics kept elsewhere."""
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        for collect in self._collectors:
+            collect()
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+metrics_registry = Registry()
+
+tool_duration = metrics_registry.histogram(
+    "mcp_tool_duration_seconds",
+    "Time to handle an MCP tool call, by tool and operation.",
+    ("tool", "operation"),
+)
+tool_errors = metrics_registry.counter(
+    "mcp_tool_errors_total",
+    "MCP tool calls that raised, by tool, operation and exception type.",
+    ("tool", "operation", "error"),
+)
+pubchem_requests = metrics_registry.counter(
+    "pubchem_requests_total",
+    "PubChem HTTP attempts by endpoint and outcome (HTTP status, timeout or "
+    "transport_error); retries and hedges count separately.",
+    ("endpoint", "status"),
+)
+pubchem_request_duration = metrics_registry.histogram(
+    "pubchem_request_duration_seconds",
+    "Time PubChem HTTP attempts took, including timed-out ones, by endpoint.",
+    ("endpoint",),
+)
+pubchem_lookup_errors = metrics_registry.counter(
+    "pubchem_lookup_errors_total",
+    "PubChem lookups that failed and were treated as no result, by endpoint "
+    "and exception type.",
+    ("endpoint", "error"),
+)
+db_query_duration = metrics_registry.histogram(
+    "db_query_duration_seconds",
+    "Time to execute a SQL statement, by statement type and first table.",
+    ("statement", "table"),
+)
+db_query_errors = metrics_registry.counter(
+    "db_query_errors_total",
+    "SQL statements that failed, by statement type, first table and exception type.",
+    ("statement", "table", "error"),
+)
+db_pool_connections = metrics_registry.gauge(
+    "db_pool_connections",
+    "Database pool connections by state (checked_out, checked_in, overflow) "
+    "and the configured size and max_overflow.",
+    ("state",),
+)
+db_pool_checkouts = metrics_registry.counter(
+    "db_pool_checkouts_total", "Connections checked out of the database pool."
+)
+db_pool_timeouts = metrics_registry.counter(
+    "db_pool_timeouts_total",
+    "Checkouts that gave up waiting for a database pool connection.",
+)
+db_pool_wait = metrics_registry.counter(
+    "db_pool_wait_seconds_total",
+    "Total time spent waiting for database pool connections.",
+)
@@ -0,0 +1,34 @@
+"""FastMCP middleware timing each tool call for the metrics."""
+
+import time
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+from .metrics import tool_duration, tool_errors
+
+
+def _operation(arguments: dict | None) -> str:
+    # The note and todo tools take an operation; labels stay short even if
+    # a client sends something else
+    operation = (arguments or {}).get("operation")
+    return operation[:32] if isinstance(operation, str) else ""
+
+
+class ToolMetricsMiddleware(Middleware):
+    """Record each tool call's duration, and its exception type if it raised."""
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        tool = context.message.name
+        operation = _operation(context.message.arguments)
+        started = time.perf_counter()
+        try:
+            return await call_next(context)
+        except Exception as exc:
+            # FastMCP wraps what the tool raised in a ToolError
+            error = type(exc.__cause__ or exc).__name__
+            tool_errors.inc(tool=tool, operation=operation, error=error)
+            raise
+        finally:
+            tool_duration.observe(
+                time.perf_counter() - started, tool=tool, operation=operation
+            )
@@ -0,0 +1,403 @@
+"""Opt-in span trees of slow tool calls.
+
+With TRACE_ENABLED=true, a sampled share of tool calls (TRACE_SAMPLE_RATE)
+records a tree of spans: the handler, variation generation, each PubChem
+lookup and HTTP attempt (with its queue wait), each SQL statement and the
+conversion of the result. Calls that took at least TRACE_THRESHOLD_MS are
+exported, either as one JSON line per call to a rotating file
+(TRACE_FILE) or to an OpenTelemetry collector over OTLP/HTTP JSON
+(TRACE_OTLP_ENDPOINT).
+
+The current span lives in a context variable, so tasks started during a
+call (parallel lookups, hedged requests) attach their spans to it. Code
+outside a sampled call only reads that variable, which keeps the cost of
+instrumentation negligible while tracing is off.
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import random
+import secrets
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+
+import httpx
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+logger = logging.getLogger(__name__)
+
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "false").lower() in ("1", "true", "yes")
+# Share of tool calls traced while enabled
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1"))
+# Traced calls at least this slow are exported
+TRACE_THRESHOLD_MS = float(os.getenv("TRACE_THRESHOLD_MS", "1000"))
+# Spans kept per call; a search under heavy throttling can make many attempts
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "500"))
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+TRACE_FILE_MAX_BYTES = int(os.getenv("TRACE_FILE_MAX_BYTES", str(10 * 1024 * 1024)))
+TRACE_FILE_BACKUPS = int(os.getenv("TRACE_FILE_BACKUPS", "5"))
+# e.g. http://localhost:4318; traces go to {endpoint}/v1/traces instead of the file
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "")
+
+# Spans whose gap to the end of the call is the result's conversion
+HANDLER_SPAN = "handler"
+
+
+@dataclass
+class Span:
+    """A timed step of a traced call; times are perf_counter nanoseconds."""
+
+    name: str
+    trace: "Trace"
+    span_id: str
+    parent_id: str | None
+    start: int
+    end: int | None = None
+    attributes: dict = field(default_factory=dict)
+    error: str | None = None
+    children: list["Span"] = field(default_factory=list)
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def finish(self, error: BaseException | None = None, end: int | None = None):
+        self.end = end or time.perf_counter_ns()
+        if error is not None:
+            self.error = type(error).__name__
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.perf_counter_ns()) - self.start) / 1e6
+
+    def to_dict(self) -> dict:
+        """The span and its children, with times relative to the call's start."""
+        return {
+            "name": self.name,
+            "start_ms": round((self.start - self.trace.root.start) / 1e6, 3),
+            "duration_ms": round(self.duration_ms, 3),
+            **({"attributes": self.attributes} if self.attributes else {}),
+            **({"error": self.error} if self.error else {}),
+            **(
+                {"children": [child.to_dict() for child in self.children]}
+                if self.children
+                else {}
+            ),
+        }
+
+
+@dataclass
+class Trace:
+    trace_id: str
+    # Wall clock and perf_counter at the start, to convert span times
+    started_unix_ns: int
+    started_perf_ns: int
+    root: Span = None  # type: ignore[assignment]
+    span_count: int = 0
+    dropped_spans: int = 0
+
+    def unix_ns(self, perf_ns: int) -> int:
+        return self.started_unix_ns + perf_ns - self.started_perf_ns
+
+    def spans(self) -> Iterator[Span]:
+        stack = [self.root]
+        while stack:
+            span = stack.pop()
+            yield span
+            stack.extend(reversed(span.children))
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "started_at": datetime.fromtimestamp(
+                self.started_unix_ns / 1e9, UTC
+            ).isoformat(),
+            "duration_ms": round(self.root.duration_ms, 3),
+            "dropped_spans": self.dropped_spans,
+            "root": self.root.to_dict(),
+        }
+
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def start_span(name: str, **attributes) -> Span | None:
+    """Start a child of the current span; None outside a sampled call.
+
+    The span is not made current; use ``span()`` for that. Finish it with
+    ``Span.finish()``.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    trace = parent.trace
+    if trace.span_count >= TRACE_MAX_SPANS:
+        trace.dropped_spans += 1
+        return None
+    trace.span_count += 1
+    child = Span(
+        name,
+        trace,
+        secrets.token_hex(8),
+        parent.span_id,
+        time.perf_counter_ns(),
+        attributes=attributes,
+    )
+    parent.children.append(child)
+    return child
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span | None]:
+    """Record the block as a child of the current span (a no-op when not traced)."""
+    child = start_span(name, **attributes)
+    if child is None:
+        yield None
+        return
+    token = _current_span.set(child)
+    error = None
+    try:
+        yield child
+    except BaseException as exc:
+        error = exc
+        raise
+    finally:
+        child.finish(error)
+        _current_span.reset(token)
+
+
+def traced(name: str, attributes: Callable[..., dict] | None = None) -> Callable:
+    """Decorate a coroutine function to record each call as a span.
+
+    ``attributes``, called with the function's arguments, gives the span's
+    attributes.
+    """
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return await fn(*args, **kwargs)
+            with span(name, **(attributes(*args, **kwargs) if attributes else {})):
+                return await fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+# Marks a tool function's body, so its end separates the handler from the
+# conversion of its result
+traced_handler = traced(HANDLER_SPAN)
+
+
+# =============================================================================
+# Exporters
+# =============================================================================
+
+
+class FileExporter:
+    """Appends each trace as a JSON line to a size-rotated file."""
+
+    def __init__(self, path: str, max_bytes: int, backups: int) -> None:
+        self._logger = logging.getLogger(f"{__name__}.file")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._logger.addHandler(handler)
+
+    def export(self, trace: Trace) -> None:
+        self._logger.info(json.dumps(trace.to_dict(), default=str))
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OTLPExporter:
+    """Posts traces to an OpenTelemetry collector as OTLP/HTTP JSON.
+
+    Posting runs in the background so a slow collector never delays a
+    response; failures are logged and the trace is dropped.
+    """
+
+    def __init__(self, endpoint: str, service_name: str = "labasi-mcp") -> None:
+        self.url = f"{endpoint.rstrip('/')}/v1/traces"
+        self.service_name = service_name
+        self._tasks: set[asyncio.Task] = set()
+
+    def _payload(self, trace: Trace) -> dict:
+        spans = [
+            {
+                "traceId": trace.trace_id,
+                "spanId": span.span_id,
+                **({"parentSpanId": span.parent_id} if span.parent_id else {}),
+                "name": span.name,
+                # Server for the tool call itself, internal for its steps
+                "kind": 2 if span is trace.root else 1,
+                "startTimeUnixNano": str(trace.unix_ns(span.start)),
+                "endTimeUnixNano": str(trace.unix_ns(span.end or span.start)),
+                "attributes": [
+                    {"key": key, "value": _otlp_value(value)}
+                    for key, value in span.attributes.items()
+                ],
+                "status": (
+                    {"code": 2, "message": span.error} if span.error else {"code": 1}
+                ),
+            }
+            for span in trace.spans()
+        ]
+        resource = {
+            "attributes": [
+                {"key": "service.name", "value": {"stringValue": self.service_name}}
+            ]
+        }
+        return {
+            "resourceSpans": [
+                {
+                    "resource": resource,
+                    "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+                }
+            ]
+        }
+
+    async def _post(self, payload: dict) -> None:
+        try:
+            async with httpx.AsyncClient(timeout=10) as client:
+                response = await client.post(self.url, json=payload)
+                response.raise_for_status()
+        except httpx.HTTPError as exc:
+            logger.warning("Could not export trace to %s: %s", self.url, exc)
+
+    def export(self, trace: Trace) -> None:
+        task = asyncio.get_running_loop().create_task(self._post(self._payload(trace)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+# =============================================================================
+# Tracer
+# =============================================================================
+
+
+class Tracer:
+    """Samples tool calls, records their span trees and exports the slow ones."""
+
+    def __init__(
+        self,
+        enabled: bool = TRACE_ENABLED,
+        sample_rate: float = TRACE_SAMPLE_RATE,
+        threshold_ms: float = TRACE_THRESHOLD_MS,
+    ) -> None:
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.threshold_ms = threshold_ms
+        self._exporter: FileExporter | OTLPExporter | None = None
+        self.traced = 0
+        self.exported = 0
+
+    @property
+    def exporter(self) -> FileExporter | OTLPExporter:
+        # Created on first use, so the trace file only appears when tracing is on
+        if self._exporter is None:
+            self._exporter = (
+                OTLPExporter(TRACE_OTLP_ENDPOINT)
+                if TRACE_OTLP_ENDPOINT
+                else FileExporter(TRACE_FILE, TRACE_FILE_MAX_BYTES, TRACE_FILE_BACKUPS)
+            )
+        return self._exporter
+
+    def sampled(self) -> bool:
+        return self.enabled and random.random() < self.sample_rate
+
+    def start(self, name: str, **attributes) -> Span:
+        """Start the root span of a call."""
+        trace = Trace(secrets.token_hex(16), time.time_ns(), time.perf_counter_ns())
+        trace.root = Span(
+            name,
+            trace,
+            secrets.token_hex(8),
+            None,
+            trace.started_perf_ns,
+            attributes=attributes,
+        )
+        trace.span_count = 1
+        self.traced += 1
+        return trace.root
+
+    def finish(self, root: Span, error: BaseException | None = None) -> None:
+        """End the call; export its trace if it was slow."""
+        root.finish(error)
+        # What happened after the handler returned is FastMCP converting the
+        # result to MCP content
+        handler = next(
+            (child for child in reversed(root.children) if child.name == HANDLER_SPAN),
+            None,
+        )
+        if handler is not None and handler.end is not None:
+            conversion = Span(
+                "serialize_result",
+                root.trace,
+                secrets.token_hex(8),
+                root.span_id,
+                handler.end,
+                end=root.end,
+            )
+            root.children.append(conversion)
+        if root.duration_ms >= self.threshold_ms:
+            self.exported += 1
+            try:
+                self.exporter.export(root.trace)
+            except Exception:
+                logger.exception("Could not export trace %s", root.trace.trace_id)
+
+    def stats(self) -> dict[str, bool | float | int]:
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "threshold_ms": self.threshold_ms,
+            "traced": self.traced,
+            "exported": self.exported,
+        }
+
+
+tracer = Tracer()
+
+
+class TracingMiddleware(Middleware):
+    """Trace sampled tool calls, with the tool and operation on the root span."""
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        if not tracer.sampled():
+            return await call_next(context)
+        arguments = context.message.arguments or {}
+        attributes = {"tool": context.message.name}
+        if isinstance(arguments.get("operation"), str):
+            attributes["operation"] = arguments["operation"]
+        root = tracer.start(f"tool {context.message.name}", **attributes)
+        token = _current_span.set(root)
+        error = None
+        try:
+            return await call_next(context)
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            _current_span.reset(token)
+            tracer.finish(root, error)
@@ -0,0 +1,76 @@
+"""Batch edits of notes and todos are one statement."""
+
+import unittest
+import uuid
+from unittest import mock
+
+import mcp_server
+from db import TodoStatus
+
+
+class Result:
+    def __init__(self, rows: list[dict]) -> None:
+        self.rows = rows
+
+    def mappings(self) -> list[dict]:
+        return self.rows
+
+
+class BatchEditTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.project_id = uuid.uuid4()
+        self.ids = [uuid.uuid4(), uuid.uuid4()]
+        self.session = mock.AsyncMock()
+
+    async def test_note_edits_are_one_statement(self) -> None:
+        self.session.execute.return_value = Result(
+            [{"id": id, "title": "Run", "content": "- ok"} for id in self.ids]
+        )
+        items = [
+            mcp_server.NoteItem(note_id=str(id), content="- ok") for id in self.ids
+        ]
+
+        result, changed = await mcp_server._note_batch(
+            self.session, self.project_id, items, "report"
+        )
+
+        self.assertTrue(changed)
+        self.assertEqual(
+            [item.id for item in result.items], [str(id) for id in self.ids]
+        )
+        self.session.execute.assert_awaited_once()
+
+    async def test_todo_edits_are_one_statement(self) -> None:
+        self.session.execute.return_value = Result(
+            [
+                {"id": id, "content": "Order resist", "status": TodoStatus.done}
+                for id in self.ids
+            ]
+        )
+        items = [mcp_server.TodoItem(todo_id=str(id), status="done") for id in self.ids]
+
+        result, _ = await mcp_server._todo_batch(
+            self.session, self.project_id, items, "report"
+        )
+
+        self.assertEqual(len(result.items), 2)
+        self.session.execute.assert_awaited_once()
+
+    async def test_missing_note_is_reported(self) -> None:
+        self.session.execute.return_value = Result([])
+        items = [mcp_server.NoteItem(note_id=str(self.ids[0]), title="Run")]
+        with self.assertRaisesRegex(ValueError, "not found"):
+            await mcp_server._note_batch(self.session, self.project_id, items, "report")
+
+    async def test_repeated_id_is_rejected(self) -> None:
+        items = [
+            mcp_server.TodoItem(todo_id=str(self.ids[0]), status="done"),
+            mcp_server.TodoItem(todo_id=str(self.ids[0]), content="Reworded"),
+        ]
+        with self.assertRaisesRegex(ValueError, "more than once"):
+            await mcp_server._todo_batch(self.session, self.project_id, items, "report")
+        self.session.execute.assert_not_awaited()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,25 @@
+"""The compound cache evicts persistent rows for as long as it runs."""
+
+import asyncio
+import unittest
+from unittest import mock
+
+from pubchem.cache import CompoundCache
+
+
+class PeriodicEvictionTest(unittest.IsolatedAsyncioTestCase):
+    async def test_evicts_until_stopped(self) -> None:
+        cache = CompoundCache(evict_interval=0.01)
+        with mock.patch.object(cache, "evict", mock.AsyncMock(return_value=0)):
+            cache.start()
+            await asyncio.sleep(0.05)
+            await cache.stop()
+            calls = cache.evict.await_count
+            await asyncio.sleep(0.03)
+
+            self.assertGreater(calls, 1)
+            self.assertEqual(cache.evict.await_count, calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
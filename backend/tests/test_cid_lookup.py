@@ -0,0 +1,54 @@
+"""CID lookups tell a PubChem failure apart from an unknown CID."""
+
+import unittest
+from unittest import mock
+
+import httpx
+
+import mcp_server
+
+
+def _response(status_code: int, json=None) -> httpx.Response:
+    request = httpx.Request("POST", "https://pubchem.invalid/")
+    return httpx.Response(status_code, json=json, request=request)
+
+
+class CidLookupTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        # Nothing cached, so every lookup goes to the patched scheduler
+        store = mcp_server.compound_property_store
+        for patcher in (
+            mock.patch.object(store, "get_many", mock.AsyncMock(return_value={})),
+            mock.patch.object(store, "put_many", mock.AsyncMock()),
+            mock.patch.object(
+                mcp_server.compound_cache, "get_many", mock.AsyncMock(return_value={})
+            ),
+            mock.patch.object(mcp_server.compound_cache, "set_many", mock.AsyncMock()),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _post(self, response: httpx.Response):
+        return mock.patch.object(
+            mcp_server.pubchem_scheduler, "post", mock.AsyncMock(return_value=response)
+        )
+
+    async def test_throttled_fetch_is_a_failure(self) -> None:
+        with self._post(_response(503, {"Fault": {"Code": "PUGREST.ServerBusy"}})):
+            records = await mcp_server._resolve_identifier("cid", "2244")
+        self.assertIsNone(records)
+
+    async def test_unknown_cid_is_not_found(self) -> None:
+        with self._post(_response(404, {"Fault": {"Code": "PUGREST.NotFound"}})):
+            records = await mcp_server._resolve_identifier("cid", "2244")
+        self.assertEqual(records, [])
+
+    async def test_search_reports_unavailable_pubchem(self) -> None:
+        with self._post(_response(503, {"Fault": {"Code": "PUGREST.ServerBusy"}})):
+            result = await mcp_server.search_compound(["2244"])
+        self.assertEqual(result.matches, [])
+        self.assertIn("busy or unreachable", result.recommendation)
+
+
+if __name__ == "__main__":
+    unittest.main()
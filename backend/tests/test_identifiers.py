@@ -0,0 +1,34 @@
+"""Structured identifiers are told apart from names and acronyms."""
+
+import unittest
+
+from pubchem.identifiers import may_be_name, parse_identifier
+
+
+class ParseIdentifierTest(unittest.TestCase):
+    def test_identifiers(self) -> None:
+        self.assertEqual(parse_identifier("CID 2244"), ("cid", "2244"))
+        self.assertEqual(parse_identifier("2244"), ("cid", "2244"))
+        self.assertEqual(
+            parse_identifier("BSYNRYMUTXBXSQ-UHFFFAOYSA-N"),
+            ("inchikey", "BSYNRYMUTXBXSQ-UHFFFAOYSA-N"),
+        )
+        self.assertEqual(parse_identifier("50-78-2"), ("cas", "50-78-2"))
+        self.assertEqual(
+            parse_identifier("CC(=O)OC1=CC=CC=C1C(=O)O"),
+            ("smiles", "CC(=O)OC1=CC=CC=C1C(=O)O"),
+        )
+
+    def test_acronyms_are_names(self) -> None:
+        for name in ("NOS", "CNS", "SOS", "CO", "aspirin"):
+            self.assertIsNone(parse_identifier(name), name)
+
+    def test_may_be_name(self) -> None:
+        self.assertTrue(may_be_name("2244"))
+        self.assertTrue(may_be_name("C1CCCCC1"))
+        self.assertFalse(may_be_name("CID 2244"))
+        self.assertFalse(may_be_name("50-78-2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""PubChem request hedging and retry limits."""
+
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+import httpx
+
+from pubchem.scheduler import Priority, PubChemThrottledError, RequestScheduler
+
+
+class SlowClient:
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.sent = 0
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        self.sent += 1
+        await asyncio.sleep(self.latency)
+        return httpx.Response(200, request=httpx.Request(method, url))
+
+
+class HedgeTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.scheduler = RequestScheduler(hedge=True, hedge_max_ratio=1.0)
+        # Pretend earlier requests were sent, so the hedge budget allows one
+        self.scheduler.stats_counters.requests = 10
+        self.scheduler.latency.hedge_delay = lambda endpoint: 0.05
+        self.addAsyncCleanup(self.scheduler.stop)
+
+    async def _send(self, client: SlowClient) -> httpx.Response | None:
+        with mock.patch("pubchem.scheduler.get_client", return_value=client):
+            return await self.scheduler._send(
+                "GET", "https://pubchem.invalid/", "test", Priority.EXACT
+            )
+
+    async def test_token_wait_is_not_hedged(self) -> None:
+        client = SlowClient(latency=0.01)
+        self.scheduler.bucket.pause(0.2)
+
+        response = await self._send(client)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(client.sent, 1)
+        self.assertEqual(self.scheduler.stats_counters.hedged, 0)
+
+    async def test_slow_request_is_hedged(self) -> None:
+        client = SlowClient(latency=0.2)
+
+        response = await self._send(client)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(client.sent, 2)
+        self.assertEqual(self.scheduler.stats_counters.hedged, 1)
+
+
+class BudgetTest(unittest.IsolatedAsyncioTestCase):
+    async def test_hung_request_gives_up_within_budget(self) -> None:
+        scheduler = RequestScheduler(hedge=False, max_retries=5, request_budget=0.2)
+        self.addAsyncCleanup(scheduler.stop)
+        client = SlowClient(latency=5)
+
+        started = time.monotonic()
+        with mock.patch("pubchem.scheduler.get_client", return_value=client):
+            with self.assertRaises(PubChemThrottledError):
+                await scheduler.request(
+                    "GET", "https://pubchem.invalid/", endpoint="test"
+                )
+
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(client.sent, 1)
+        self.assertEqual(scheduler.stats_counters.failures, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""search_compound answers what it can without waiting on PubChem."""
+
+import unittest
+from unittest import mock
+
+import mcp_server
+from pubchem.property_store import REQUIRED_PROPERTIES
+
+ASPIRIN = {"CID": 2244, "Title": "aspirin", "MolecularFormula": "C9H8O4"}
+CAFFEINE = {"CID": 2519, "Title": "caffeine", "MolecularFormula": "C8H10N4O2"}
+
+
+def full_record(record: dict) -> dict:
+    return dict.fromkeys(REQUIRED_PROPERTIES, 1) | record
+
+
+STORED = {2244: full_record(ASPIRIN), 2519: full_record(CAFFEINE)}
+
+
+class SearchCompoundTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        index = mcp_server.local_compound_index
+        store = mcp_server.compound_property_store
+        self.post = mock.AsyncMock(side_effect=AssertionError("PubChem was called"))
+        self.find_exact = mock.AsyncMock(return_value={})
+        for patcher in (
+            mock.patch.object(
+                store,
+                "get_many",
+                mock.AsyncMock(
+                    side_effect=lambda cids: {c: STORED[c] for c in cids if c in STORED}
+                ),
+            ),
+            mock.patch.object(store, "put_many", mock.AsyncMock()),
+            mock.patch.object(index, "by_cids", mock.AsyncMock(return_value={})),
+            mock.patch.object(index, "find_exact", self.find_exact),
+            mock.patch.object(
+                mcp_server.compound_cache, "get_many", mock.AsyncMock(return_value={})
+            ),
+            mock.patch.object(mcp_server.compound_cache, "set_many", mock.AsyncMock()),
+            mock.patch.object(mcp_server.pubchem_scheduler, "post", self.post),
+            mock.patch.object(mcp_server.pubchem_scheduler, "get", self.post),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def test_local_index_match_is_answered_offline(self) -> None:
+        self.find_exact.return_value = {"aspirin": [ASPIRIN]}
+        result = await mcp_server.search_compound(["aspirin"])
+
+        self.assertEqual([match.cid for match in result.matches], [2244])
+        self.post.assert_not_called()
+
+    async def test_identifiers_and_names_are_both_searched(self) -> None:
+        with (
+            mock.patch.object(
+                mcp_server,
+                "_get_autocomplete_suggestions",
+                mock.AsyncMock(return_value=[]),
+            ),
+            mock.patch.object(
+                mcp_server,
+                "_search_single_term",
+                mock.AsyncMock(
+                    side_effect=lambda term, priority=None: (
+                        [STORED[2519]] if term.lower() == "caffeine" else []
+                    )
+                ),
+            ),
+        ):
+            result = await mcp_server.search_compound(["2244", "caffeine"])
+
+        self.assertEqual([match.cid for match in result.matches], [2244, 2519])
+        self.assertEqual(result.search_terms_tried[:2], ["2244", "caffeine"])
+
+    async def test_identifier_and_local_index_name(self) -> None:
+        self.find_exact.return_value = {"caffeine": [CAFFEINE]}
+        result = await mcp_server.search_compound(["2244", "caffeine"])
+
+        self.assertEqual([match.cid for match in result.matches], [2244, 2519])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""Tool calls through the MCP server record and export span trees."""
+
+import unittest
+
+from fastmcp.exceptions import ToolError
+
+import mcp_server
+from telemetry import tracer
+
+
+class CapturingExporter:
+    def __init__(self) -> None:
+        self.traces = []
+
+    def export(self, trace) -> None:
+        self.traces.append(trace)
+
+
+class TracedToolCallTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.exporter = CapturingExporter()
+        saved = (tracer.enabled, tracer.sample_rate, tracer.threshold_ms)
+        saved_exporter = tracer._exporter
+        tracer.enabled, tracer.sample_rate, tracer.threshold_ms = True, 1.0, 0.0
+        tracer._exporter = self.exporter
+
+        def restore() -> None:
+            tracer.enabled, tracer.sample_rate, tracer.threshold_ms = saved
+            tracer._exporter = saved_exporter
+
+        self.addCleanup(restore)
+
+    async def test_tool_call_exports_trace(self) -> None:
+        # Without an X-Project-ID header the tool fails before touching the
+        # database, which is still a traced call
+        with self.assertRaises(ToolError):
+            await mcp_server.mcp.call_tool("project_overview", {})
+
+        self.assertEqual(len(self.exporter.traces), 1)
+        root = self.exporter.traces[0].root
+        self.assertEqual(root.name, "tool project_overview")
+        self.assertEqual(root.attributes, {"tool": "project_overview"})
+        self.assertIsNotNone(root.end)
+        self.assertEqual(root.error, "ToolError")
+        handler = next(c for c in root.children if c.name == "handler")
+        self.assertEqual(handler.error, "ValueError")
+
+    async def test_disabled_tracer_exports_nothing(self) -> None:
+        tracer.enabled = False
+        with self.assertRaises(ToolError):
+            await mcp_server.mcp.call_tool("project_overview", {})
+        self.assertEqual(self.exporter.traces, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
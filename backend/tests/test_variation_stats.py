@@ -0,0 +1,44 @@
+"""Variation stats prune kinds that rarely hit, but keep measuring them."""
+
+import unittest
+from unittest import mock
+
+from pubchem.variation_stats import VariationStats
+
+TERMS = [("Aspirin", "original"), ("ASPIRIN", "upper"), ("asp", "word")]
+
+
+class PlanTest(unittest.IsolatedAsyncioTestCase):
+    def stats(self, explore_rate: float) -> VariationStats:
+        stats = VariationStats(min_samples=10, explore_rate=explore_rate)
+        stats._flushed_at = float("inf")  # No flushes to the database
+        for _ in range(30):
+            stats.record("upper", hit=False)
+            stats.record("word", hit=True)
+        return stats
+
+    async def test_prunes_kinds_that_miss(self) -> None:
+        stats = self.stats(explore_rate=0.0)
+        self.assertEqual(stats.plan(TERMS), [TERMS[0], TERMS[2]])
+
+    async def test_explores_pruned_kinds(self) -> None:
+        stats = self.stats(explore_rate=1.0)
+        self.assertEqual(stats.plan(TERMS), [TERMS[0], TERMS[1], TERMS[2]])
+        stats.budget = 2
+        self.assertEqual(stats.plan(TERMS), [TERMS[0], TERMS[1]])
+
+
+class FlushTest(unittest.IsolatedAsyncioTestCase):
+    async def test_failed_flush_keeps_counts(self) -> None:
+        stats = VariationStats()
+        stats._flushed_at = float("inf")
+        stats.record("upper", hit=True)
+        with mock.patch(
+            "pubchem.variation_stats.get_session", side_effect=OSError("down")
+        ):
+            await stats.flush()
+        self.assertEqual(stats._pending, {"upper": (1, 1)})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,7 +10,7 @@ export async function GET(_request: NextRequest, { params }: RouteParams) {
 
     const result = await query(
       `SELECT id, project_id, title, content, created_at, modified
-       FROM notes
+       FROM notes_with_history
        WHERE id = $1`,
       [id]
     )
@@ -41,34 +41,31 @@ export async function PUT(request: NextRequest, { params }: RouteParams) {
     const { id } = await params
     const { title, content } = await request.json()
 
-    // First get the current note to preserve modification history
-    const currentResult = await query(
-      `SELECT title, content, modified FROM notes WHERE id = $1`,
-      [id]
+    // Keep the current state as a revision and update the note in one statement
+    const updated = await query(
+      `WITH revision AS (
+         INSERT INTO note_revisions (id, item_id, title, content, modified_at)
+         SELECT gen_random_uuid(), id, title, content, NOW() AT TIME ZONE 'UTC'
+         FROM notes WHERE id = $1
+         RETURNING item_id
+       )
+       UPDATE notes
+       SET title = COALESCE($2, title),
+           content = COALESCE($3, content)
+       WHERE id IN (SELECT item_id FROM revision)
+       RETURNING id`,
+      [id, title, content]
     )
 
-    if (currentResult.rows.length === 0) {
+    if (updated.rows.length === 0) {
       return NextResponse.json({ error: "Note not found" }, { status: 404 })
     }
 
-    const current = currentResult.rows[0]
-    const modified = current.modified || []
-
-    // Add current state to modification history
-    modified.push({
-      title: current.title,
-      content: current.content,
-      modifiedAt: new Date().toISOString(),
-    })
-
     const result = await query(
-      `UPDATE notes
-       SET title = COALESCE($2, title),
-           content = COALESCE($3, content),
-           modified = $4
-       WHERE id = $1
-       RETURNING id, project_id, title, content, created_at, modified`,
-      [id, title, content, JSON.stringify(modified)]
+      `SELECT id, project_id, title, content, created_at, modified
+       FROM notes_with_history
+       WHERE id = $1`,
+      [id]
     )
 
     const note = result.rows[0]
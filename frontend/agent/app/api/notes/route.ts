@@ -9,7 +9,7 @@ export async function GET(request: NextRequest) {
 
     let notesQuery = `
       SELECT id, project_id, title, content, created_at, modified
-      FROM notes
+      FROM notes_with_history
     `
     const queryParams: string[] = []
 
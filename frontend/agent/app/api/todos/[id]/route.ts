@@ -10,7 +10,7 @@ export async function GET(_request: NextRequest, { params }: RouteParams) {
 
     const result = await query(
       `SELECT id, project_id, content, created_at, modified, status
-       FROM todos
+       FROM todos_with_history
        WHERE id = $1`,
       [id]
     )
@@ -45,34 +45,31 @@ export async function PUT(request: NextRequest, { params }: RouteParams) {
       return NextResponse.json({ error: "status must be 'open' or 'done'" }, { status: 400 })
     }
 
-    // First get the current todo to preserve modification history
-    const currentResult = await query(
-      `SELECT content, status, modified FROM todos WHERE id = $1`,
-      [id]
+    // Keep the current state as a revision and update the todo in one statement
+    const updated = await query(
+      `WITH revision AS (
+         INSERT INTO todo_revisions (id, item_id, content, status, modified_at)
+         SELECT gen_random_uuid(), id, content, status::text, NOW() AT TIME ZONE 'UTC'
+         FROM todos WHERE id = $1
+         RETURNING item_id
+       )
+       UPDATE todos
+       SET content = COALESCE($2, content),
+           status = COALESCE($3, status)
+       WHERE id IN (SELECT item_id FROM revision)
+       RETURNING id`,
+      [id, content, status]
     )
 
-    if (currentResult.rows.length === 0) {
+    if (updated.rows.length === 0) {
       return NextResponse.json({ error: "Todo not found" }, { status: 404 })
     }
 
-    const current = currentResult.rows[0]
-    const modified = current.modified || []
-
-    // Add current state to modification history
-    modified.push({
-      content: current.content,
-      status: current.status,
-      modifiedAt: new Date().toISOString(),
-    })
-
     const result = await query(
-      `UPDATE todos
-       SET content = COALESCE($2, content),
-           status = COALESCE($3, status),
-           modified = $4
-       WHERE id = $1
-       RETURNING id, project_id, content, created_at, modified, status`,
-      [id, content, status, JSON.stringify(modified)]
+      `SELECT id, project_id, content, created_at, modified, status
+       FROM todos_with_history
+       WHERE id = $1`,
+      [id]
     )
 
     const todo = result.rows[0]
@@ -10,7 +10,7 @@ export async function GET(request: NextRequest) {
 
     let todosQuery = `
       SELECT id, project_id, content, created_at, modified, status
-      FROM todos
+      FROM todos_with_history
     `
     const conditions: string[] = []
     const queryParams: string[] = []